@@ -0,0 +1,293 @@
+"""
+Benchmarks of model introspection, assertions and test case generation.
+
+Declarative models of configurable width and count are synthesized and
+every benchmark is run for each combination. Results are written as JSON
+for regression tracking::
+
+    python -m benchmarks.benchmark --models 10 100 --width 10 100 \\
+        --repeat 5 --output results.json
+
+Every result holds the best and mean duration of a run in seconds and the
+best duration per operation, for example per model or per assertion.
+"""
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+
+import sqlalchemy as sa
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test import (
+    clear_introspection_cache,
+    generate_test_case,
+    ModelTestCase,
+    TestCaseGenerator
+)
+from sqlalchemy_test.conventions import find_convention_violations
+
+
+def _column(number, models):
+    """
+    Return the column of given number, cycling through the kinds of
+    columns the assertions and the generator handle differently.
+    """
+    kind = number % 6
+    if kind == 0:
+        return sa.Column(sa.Unicode(255), nullable=False, index=True)
+    elif kind == 1:
+        return sa.Column(sa.Integer, default=0, server_default='0')
+    elif kind == 2:
+        return sa.Column(sa.Unicode(100), unique=True)
+    elif kind == 3:
+        return sa.Column(sa.Boolean, default=False, nullable=False)
+    elif kind == 4 and models:
+        return sa.Column(
+            sa.Integer,
+            sa.ForeignKey(models[-1].id, ondelete='CASCADE'),
+            index=True
+        )
+    return sa.Column(sa.DateTime, server_default=sa.func.now())
+
+
+def make_models(count, width):
+    """
+    Return `count` declarative models with `width` columns each, every
+    model referring to the previous one with foreign keys.
+    """
+    base = declarative_base()
+    models = []
+    for number in range(count):
+        attributes = {
+            '__tablename__': 'model%d' % number,
+            'id': sa.Column(sa.Integer, primary_key=True),
+        }
+        for column_number in range(width - 1):
+            attributes['column%d' % column_number] = _column(
+                column_number, models
+            )
+        models.append(type('Model%d' % number, (base, ), attributes))
+    sa.orm.configure_mappers()
+    return base, models
+
+
+def test_cases(models):
+    return [
+        type('Test%s' % model.__name__, (ModelTestCase, ), {'model': model})()
+        for model in models
+    ]
+
+
+def _column_assertions(test_case, name, column):
+    """
+    Yield (assertion name, callable) pairs of the assertions that hold for
+    given column.
+    """
+    yield 'assert_has', lambda: test_case.assert_has(name)
+    yield 'assert_type', lambda: test_case.assert_type(
+        name, type(column.type)
+    )
+    if column.nullable:
+        yield 'assert_nullable', lambda: test_case.assert_nullable(name)
+    else:
+        yield 'assert_not_nullable', (
+            lambda: test_case.assert_not_nullable(name)
+        )
+    if getattr(column.type, 'length', None):
+        yield 'assert_length', lambda: test_case.assert_length(
+            name, column.type.length
+        )
+    if column.primary_key:
+        yield 'assert_primary_key', (
+            lambda: test_case.assert_primary_key(name)
+        )
+    if column.unique:
+        yield 'assert_unique', lambda: test_case.assert_unique(name)
+    if column.index:
+        yield 'assert_index', lambda: test_case.assert_index(name)
+    if column.default is not None:
+        yield 'assert_default', lambda: test_case.assert_default(
+            name, column.default.arg
+        )
+    if column.server_default is not None:
+        yield 'assert_server_default', (
+            lambda: test_case.assert_server_default(
+                name, column.server_default.arg
+            )
+        )
+    for fk in column.foreign_keys:
+        yield 'assert_foreign_key', lambda: test_case.assert_foreign_key(
+            name, sa.ForeignKey(fk.target_fullname, ondelete=fk.ondelete)
+        )
+    yield 'assert_columns', lambda: test_case.assert_columns({
+        name: {'nullable': column.nullable, 'index': column.index}
+    })
+
+
+def assertions(cases):
+    """
+    Return the assertions that hold for the columns of given test cases,
+    grouped by assertion name.
+    """
+    grouped = {}
+    for test_case in cases:
+        for name, column in sorted(test_case.columns.items()):
+            for assertion, call in _column_assertions(
+                test_case, name, column
+            ):
+                grouped.setdefault(assertion, []).append(call)
+    return grouped
+
+
+def measure(function, repeat, setup=None):
+    """
+    Run given function `repeat` times, calling `setup` before each run
+    without timing it, and return the durations in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = timeit.default_timer()
+        function()
+        durations.append(timeit.default_timer() - start)
+    return durations
+
+
+def _result(name, count, width, operations, durations):
+    return {
+        'name': name,
+        'models': count,
+        'width': width,
+        'operations': operations,
+        'best': min(durations),
+        'mean': sum(durations) / len(durations),
+        'best_per_operation': min(durations) / operations,
+    }
+
+
+def run_benchmarks(count, width, repeat):
+    """
+    Run every benchmark for `count` synthesized models of `width` columns
+    and return the results.
+    """
+    base, models = make_models(count, width)
+    cases = test_cases(models)
+    results = []
+
+    def access_columns():
+        for test_case in cases:
+            test_case.columns
+            test_case.foreign_keys
+
+    def clear_cache():
+        for model in models:
+            clear_introspection_cache(model)
+
+    results.append(_result(
+        'columns_cold', count, width, count,
+        measure(access_columns, repeat, setup=clear_cache)
+    ))
+    results.append(_result(
+        'columns_warm', count, width, count,
+        measure(access_columns, repeat)
+    ))
+
+    def run_all(calls):
+        def run():
+            for call in calls:
+                call()
+        return run
+
+    for assertion, calls in sorted(assertions(cases).items()):
+        results.append(_result(
+            assertion, count, width, len(calls),
+            measure(run_all(calls), repeat)
+        ))
+
+    def assert_schemas():
+        for test_case in cases:
+            test_case.assert_description(test_case.introspection.describe())
+
+    results.append(_result(
+        'assert_description', count, width, count,
+        measure(assert_schemas, repeat)
+    ))
+
+    results.append(_result(
+        'find_convention_violations', count, width, count * width,
+        measure(lambda: find_convention_violations(base), repeat)
+    ))
+
+    for compact in (False, True):
+        def process_columns():
+            for model in models:
+                TestCaseGenerator(model, compact=compact).process_columns()
+
+        results.append(_result(
+            'process_columns_%s' % ('compact' if compact else 'verbose'),
+            count, width, count,
+            measure(process_columns, repeat)
+        ))
+
+    directory = tempfile.mkdtemp()
+    try:
+        def generate():
+            for model in models:
+                generate_test_case(model, directory + '/', force=True)
+
+        results.append(_result(
+            'generate_test_case', count, width, count,
+            measure(generate, repeat)
+        ))
+    finally:
+        shutil.rmtree(directory)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--models', type=int, nargs='+', default=[10, 100],
+        help='Numbers of models to synthesize.'
+    )
+    parser.add_argument(
+        '--width', type=int, nargs='+', default=[10, 100],
+        help='Numbers of columns of every model.'
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='Number of runs of every benchmark.'
+    )
+    parser.add_argument(
+        '--output', help='File the JSON results are written to.'
+    )
+    args = parser.parse_args(argv)
+
+    report = {
+        'python': platform.python_version(),
+        'sqlalchemy': sa.__version__,
+        'repeat': args.repeat,
+        'results': [],
+    }
+    for count in args.models:
+        for width in args.width:
+            report['results'].extend(
+                run_benchmarks(count, width, args.repeat)
+            )
+
+    if args.output:
+        with open(args.output, 'w') as file_:
+            json.dump(report, file_, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    return report
+
+
+if __name__ == '__main__':
+    main()
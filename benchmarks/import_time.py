@@ -0,0 +1,104 @@
+"""
+Benchmark of the import time of sqlalchemy_test.
+
+Every import is timed in a fresh interpreter, after SQLAlchemy itself is
+imported, so only the cost added by this package is measured. Results are
+written as JSON for regression tracking::
+
+    python -m benchmarks.import_time --repeat 20 --output imports.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+
+import sqlalchemy as sa
+
+
+#: Statements timed in a fresh interpreter, by benchmark name.
+statements = {
+    'import_package': 'import sqlalchemy_test',
+    'import_model_test_case': 'from sqlalchemy_test import ModelTestCase',
+    'import_generator': 'from sqlalchemy_test import TestCaseGenerator',
+    'import_pytest_plugin': 'import sqlalchemy_test.pytest_plugin',
+}
+
+#: Modules whose presence after the import is reported.
+heavy_modules = (
+    'inflection',
+    'multiprocessing',
+    'sqlalchemy.orm',
+    'sqlalchemy_test.generator',
+)
+
+_script = '''
+import json, sys, timeit
+import sqlalchemy
+start = timeit.default_timer()
+%s
+duration = timeit.default_timer() - start
+json.dump({
+    'duration': duration,
+    'modules': [name for name in %r if name in sys.modules],
+}, sys.stdout)
+'''
+
+
+def time_import(statement):
+    """
+    Return the duration of given import statement in a fresh interpreter
+    and the heavy modules it imported.
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-c', _script % (statement, heavy_modules)]
+    )
+    result = json.loads(output.decode('utf-8'))
+    return result['duration'], result['modules']
+
+
+def run_benchmarks(repeat):
+    results = []
+    for name, statement in sorted(statements.items()):
+        durations = []
+        for _ in range(repeat):
+            duration, modules = time_import(statement)
+            durations.append(duration)
+        results.append({
+            'name': name,
+            'statement': statement,
+            'best': min(durations),
+            'mean': sum(durations) / len(durations),
+            'modules': modules,
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--repeat', type=int, default=10,
+        help='Number of fresh interpreters every import is timed in.'
+    )
+    parser.add_argument(
+        '--output', help='File the JSON results are written to.'
+    )
+    args = parser.parse_args(argv)
+
+    report = {
+        'python': platform.python_version(),
+        'sqlalchemy': sa.__version__,
+        'repeat': args.repeat,
+        'results': run_benchmarks(args.repeat),
+    }
+    if args.output:
+        with open(args.output, 'w') as file_:
+            json.dump(report, file_, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    return report
+
+
+if __name__ == '__main__':
+    main()
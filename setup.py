@@ -36,9 +36,12 @@ setup(
     include_package_data=True,
     platforms='any',
     install_requires=[
-        'SQLAlchemy>=0.7',
+        'SQLAlchemy>=1.1,<1.4',
         'inflection>=0.1.2'
     ],
+    entry_points={
+        'pytest11': ['sqlalchemy_test = sqlalchemy_test.pytest_plugin']
+    },
     cmdclass={'test': PyTest},
     classifiers=[
         'Environment :: Web Environment',
@@ -1,30 +1,602 @@
-import os
-from inflection import underscore
-from sqlalchemy.sql.expression import _False, _True
-from sqlalchemy.orm.properties import ColumnProperty
+import re
+import sys
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+
+from sqlalchemy_test.column_types import (
+    describe_type,
+    expected_ddl,
+    type_matches
+)
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+
+_introspection_cache = {}
+
+#: Names of :mod:`sqlalchemy_test.generator` that can be imported from this
+#: package. The generator and its dependencies are imported on first use,
+#: or with the package before Python 3.7, which lacks module __getattr__.
+_generator_names = (
+    'FINGERPRINT_PREFIX',
+    'GENERATOR_VERSION',
+    'TestCaseGenerator',
+    'generate_test_case',
+    'generate_test_cases',
+    'read_fingerprint',
+    'test_case_filename',
+    'write_test_case',
+)
+
+
+def __getattr__(name):
+    if name in _generator_names:
+        from sqlalchemy_test import generator
+        return getattr(generator, name)
+    raise AttributeError(
+        'module %r has no attribute %r' % (__name__, name)
+    )
+
+
+def _canonical_value(value):
+    if value is None or isinstance(value, (bool, int, float, string_types)):
+        return value
+    elif isinstance(value, sa.sql.expression.ClauseElement):
+        return str(value)
+    elif callable(value):
+        return 'callable:%s.%s' % (
+            getattr(value, '__module__', None),
+            getattr(value, '__name__', value.__class__.__name__)
+        )
+    return repr(value)
+
+
+def _single_column_indexes(column):
+    return [
+        index for index in getattr(column.table, 'indexes', ())
+        if list(index.expressions) == [column]
+    ]
+
+
+def column_is_indexed(column):
+    """
+    Return whether given column is indexed, with ``index=True`` or with a
+    single column index declared on its table.
+    """
+    return bool(column.index) or bool(_single_column_indexes(column))
+
+
+def column_is_unique(column):
+    """
+    Return whether given column is unique, with ``unique=True`` or with a
+    single column unique constraint or unique index of its table.
+    """
+    return bool(column.unique) or any(
+        isinstance(constraint, sa.UniqueConstraint) and
+        list(constraint.columns) == [column]
+        for constraint in getattr(column.table, 'constraints', ())
+    ) or any(index.unique for index in _single_column_indexes(column))
+
+
+def describe_column(column):
+    """
+    Return a canonical, JSON serializable description of given column.
+    """
+    return {
+        'type': repr(column.type),
+        'length': getattr(column.type, 'length', None),
+        'nullable': bool(column.nullable),
+        'primary_key': bool(column.primary_key),
+        'unique': column_is_unique(column),
+        'index': column_is_indexed(column),
+        'autoincrement': _canonical_value(column.autoincrement),
+        'default': _canonical_value(
+            column.default.arg if column.default is not None else None
+        ),
+        'server_default': _canonical_value(
+            column.server_default.arg
+            if column.server_default is not None else None
+        ),
+        'foreign_keys': dict(
+            (fk.target_fullname, {
+                'ondelete': fk.ondelete,
+                'onupdate': fk.onupdate,
+                'deferrable': _canonical_value(fk.deferrable),
+                'initially': fk.initially,
+                'name': fk.name,
+            })
+            for fk in column.foreign_keys
+        ),
+        'check_constraints': sorted(
+            str(constraint.sqltext)
+            for constraint in column.constraints
+            if hasattr(constraint, 'sqltext')
+        ),
+    }
+
+
+def describe_relationship(prop):
+    """
+    Return a canonical, JSON serializable description of given
+    relationship property.
+    """
+    return {
+        'target': prop.mapper.class_.__name__,
+        'direction': prop.direction.name,
+        'lazy': _canonical_value(prop.lazy),
+        'uselist': bool(prop.uselist),
+        'cascade': sorted(prop.cascade),
+        'backref': sorted(
+            reverse.key for reverse in prop._reverse_property
+        ),
+    }
+
+
+def _expression_name(expression):
+    return getattr(expression, 'name', None) or str(expression)
+
+
+def describe_index(index):
+    """
+    Return a canonical, JSON serializable description of given index.
+    """
+    return {
+        'columns': [
+            _expression_name(expression) for expression in index.expressions
+        ],
+        'unique': bool(index.unique),
+    }
+
+
+class ModelIntrospection(object):
+    """
+    Column, foreign key, index, constraint, default and relationship
+    information of a mapped model, gathered with a single walk over the
+    model's configured mapper, and the composite primary key, unique
+    constraints, indexes and table level check constraints of its tables.
+
+    `columns` maps column names to the column of the most specific table,
+    `table_columns` maps (table name, column name) pairs to the columns of
+    every table of the inheritance hierarchy.
+    """
+
+    def __init__(self, model):
+        from sqlalchemy.orm import configure_mappers
+        from sqlalchemy.orm.properties import (
+            ColumnProperty,
+            RelationshipProperty
+        )
+
+        self.model = model
+        configure_mappers()
+        mapper = sa.inspect(model)
+        # Depth of the tables of the inheritance hierarchy, the table of
+        # the model being the deepest.
+        depth = dict(
+            (inherited.local_table, -i)
+            for i, inherited in enumerate(mapper.iterate_to_root())
+        )
+        self.columns = {}
+        self.table_columns = {}
+        self.relationships = {}
+        for field in set(model._sa_class_manager.values()):
+            prop = field.property
+            if isinstance(prop, ColumnProperty):
+                column = prop.columns[0]
+                if not isinstance(column, sa.Column):
+                    # SQL expressions, such as column_property(a * 2).
+                    continue
+                current = self.columns.get(column.name)
+                if current is None or (
+                    depth.get(column.table, float('-inf')) >
+                    depth.get(current.table, float('-inf'))
+                ):
+                    self.columns[column.name] = column
+                for column in prop.columns:
+                    if isinstance(column, sa.Column):
+                        self.table_columns[
+                            (column.table.fullname, column.name)
+                        ] = column
+            elif isinstance(prop, RelationshipProperty):
+                self.relationships[prop.key] = prop
+
+        # Columns of the hierarchy that the column of the same name in a
+        # more specific table hides, keyed by their qualified name.
+        unqualified = set(self.columns.values())
+        self.shadowed_columns = dict(
+            ('%s.%s' % key, column)
+            for key, column in self.table_columns.items()
+            if column not in unqualified
+        )
+
+        self.foreign_keys = {}
+        self.indexes = {}
+        self.constraints = {}
+        self.defaults = {}
+        self.server_defaults = {}
+        for name, column in self.columns.items():
+            if column.foreign_keys:
+                self.foreign_keys[name] = list(column.foreign_keys)
+            self.indexes[name] = column_is_indexed(column)
+            self.constraints[name] = list(column.constraints)
+            self.defaults[name] = column.default
+            self.server_defaults[name] = column.server_default
+
+        self.primary_key = [column.name for column in mapper.primary_key]
+        self.unique_constraints = []
+        self.composite_indexes = {}
+        self.table_check_constraints = []
+        for table in mapper.tables:
+            for constraint in table.constraints:
+                if (
+                    isinstance(constraint, sa.UniqueConstraint) and
+                    len(constraint.columns) > 1
+                ):
+                    self.unique_constraints.append(
+                        [column.name for column in constraint.columns]
+                    )
+                elif (
+                    isinstance(constraint, sa.CheckConstraint) and
+                    not getattr(constraint, '_type_bound', False)
+                ):
+                    # Type bound constraints, such as the ones of Boolean
+                    # and Enum columns, are part of the column type.
+                    self.table_check_constraints.append(
+                        str(constraint.sqltext)
+                    )
+            for index in table.indexes:
+                if len(index.expressions) > 1:
+                    name = index.name or '_'.join(
+                        describe_index(index)['columns']
+                    )
+                    self.composite_indexes[name] = index
+        self._description = None
+        self._fingerprint = None
+
+    def column(self, name, table=None):
+        """
+        Return the column of given name. The name may be qualified with
+        the name of a table of the inheritance hierarchy, as in
+        'entity.id', or the table may be given as `table`. Unqualified
+        names refer to the column of the most specific table.
+        """
+        if table is None and '.' in name:
+            table, name = name.rsplit('.', 1)
+        if table is None:
+            return self.columns[name]
+        return self.table_columns[(getattr(table, 'fullname', table), name)]
+
+    def has_column(self, name, table=None):
+        try:
+            self.column(name, table)
+        except KeyError:
+            return False
+        return True
+
+    def all_columns(self):
+        """
+        Return the columns by name followed by the shadowed columns by
+        qualified name, as sorted (name, column) pairs.
+        """
+        return (
+            sorted(self.columns.items()) +
+            sorted(self.shadowed_columns.items())
+        )
+
+    def describe(self):
+        """
+        Return a canonical, JSON serializable description of the model's
+        table name, columns, relationships and table level constraints.
+        The description is built once and shared, it must not be modified.
+        When a shared cache is enabled, the description written by the
+        controlling process is used instead.
+        """
+        if self._description is None:
+            from sqlalchemy_test.shared import shared_description
+
+            self._description = shared_description(self.model)
+        if self._description is None:
+            self._description = {
+                'table_name': getattr(self.model, '__tablename__', None),
+                'columns': dict(
+                    (name, describe_column(column))
+                    for name, column in self.all_columns()
+                ),
+                'relationships': dict(
+                    (name, describe_relationship(prop))
+                    for name, prop in self.relationships.items()
+                ),
+                'table': {
+                    'primary_key': self.primary_key,
+                    'unique_constraints': sorted(self.unique_constraints),
+                    'indexes': dict(
+                        (name, describe_index(index))
+                        for name, index in self.composite_indexes.items()
+                    ),
+                    'check_constraints': sorted(
+                        self.table_check_constraints
+                    ),
+                },
+            }
+        return self._description
+
+    @property
+    def fingerprint(self):
+        """
+        Stable hash of the model's schema description.
+        """
+        if self._fingerprint is None:
+            import hashlib
+            import json
+
+            self._fingerprint = hashlib.sha1(
+                json.dumps(self.describe(), sort_keys=True).encode('utf-8')
+            ).hexdigest()
+        return self._fingerprint
+
+
+def compare_descriptions(expected, actual):
+    """
+    Compare two model descriptions as returned by
+    :meth:`ModelIntrospection.describe` and return a list of human readable
+    differences.
+    """
+    differences = []
+    if expected.get('table_name') != actual.get('table_name'):
+        differences.append('table name is %r, expected %r' % (
+            actual.get('table_name'), expected.get('table_name')
+        ))
+    kinds = (('columns', 'column'), ('relationships', 'relationship'))
+    for key, kind in kinds:
+        expected_items = expected.get(key, {})
+        actual_items = actual.get(key, {})
+        for name in sorted(set(expected_items) | set(actual_items)):
+            if name not in actual_items:
+                differences.append('%r: %s does not exist' % (name, kind))
+                continue
+            if name not in expected_items:
+                differences.append('%r: unexpected %s' % (name, kind))
+                continue
+            _compare_values(
+                repr(name),
+                expected_items[name],
+                actual_items[name],
+                differences
+            )
+    _compare_values(
+        'table', expected.get('table', {}), actual.get('table', {}),
+        differences
+    )
+    return differences
+
+
+def _compare_values(path, expected, actual, differences):
+    for key in sorted(set(expected) | set(actual)):
+        if key not in actual:
+            differences.append('%s: %s is missing' % (path, key))
+        elif key not in expected:
+            differences.append('%s: unexpected %s' % (path, key))
+        elif (
+            isinstance(expected[key], dict) and
+            isinstance(actual[key], dict)
+        ):
+            _compare_values(
+                '%s: %s' % (path, key), expected[key], actual[key],
+                differences
+            )
+        elif expected[key] != actual[key]:
+            differences.append('%s: %s is %r, expected %r' % (
+                path, key, actual[key], expected[key]
+            ))
+
+
+def introspect(model):
+    """
+    Return the cached :class:`ModelIntrospection` of given model, building
+    it on first use.
+    """
+    try:
+        return _introspection_cache[model]
+    except KeyError:
+        _listen_for_mapper_configuration()
+        introspection = ModelIntrospection(model)
+        _introspection_cache[model] = introspection
+        return introspection
+
+
+def clear_introspection_cache(model=None):
+    """
+    Invalidate the cached introspection of given model and its subclasses.
+    If no model is given the whole cache is cleared.
+    """
+    if model is None:
+        _introspection_cache.clear()
+        return
+    for cached_model in list(_introspection_cache):
+        if issubclass(cached_model, model):
+            del _introspection_cache[cached_model]
+
+
+def _invalidate_instrumented_class(class_, key, instrumented_attribute):
+    clear_introspection_cache(class_)
+
+
+def _listen_for_mapper_configuration():
+    # Registered when the first model is introspected, so that importing
+    # this package does not import the ORM. Configuring new mappers can add
+    # backrefs to any model, so the whole cache is dropped then. Attributes
+    # added to a configured model, such as columns assigned to a
+    # declarative class, only invalidate that model.
+    from sqlalchemy.orm import Mapper
+
+    if not sa.event.contains(
+        Mapper, 'after_configured', clear_introspection_cache
+    ):
+        sa.event.listen(Mapper, 'after_configured', clear_introspection_cache)
+        sa.event.listen(
+            object, 'attribute_instrument', _invalidate_instrumented_class
+        )
+
+
+def _server_defaults_equal(column_default, default):
+    if default.__class__ == column_default.__class__:
+        if isinstance(
+            default, (sa.sql.expression.False_, sa.sql.expression.True_)
+        ):
+            return True
+    return column_default == default
+
+
+def _check_type(introspection, name, type_, dialect=None):
+    column_type = introspection.column(name).type
+    if not type_matches(column_type, type_, dialect):
+        if isinstance(type_, type):
+            expected = type_.__name__
+        else:
+            expected = repr(expected_ddl(type_, dialect))
+        return 'type is %s, expected %s%s' % (
+            describe_type(column_type, dialect),
+            expected,
+            '' if dialect is None else ' on %s' % dialect
+        )
+
+
+def _check_length(introspection, name, length):
+    column_length = getattr(introspection.column(name).type, 'length', None)
+    if column_length != length:
+        return 'length is %r, expected %r' % (column_length, length)
+
+
+def _check_flag(attr):
+    def check(introspection, name, expected):
+        value = bool(getattr(introspection.column(name), attr))
+        if value != bool(expected):
+            return '%s is %r, expected %r' % (attr, value, bool(expected))
+    return check
+
+
+def _check_index(introspection, name, expected):
+    index = column_is_indexed(introspection.column(name))
+    if index != bool(expected):
+        return 'index is %r, expected %r' % (index, bool(expected))
+
+
+def _check_unique(introspection, name, expected):
+    unique = column_is_unique(introspection.column(name))
+    if unique != bool(expected):
+        return 'unique is %r, expected %r' % (unique, bool(expected))
+
+
+def _check_default(introspection, name, default):
+    column_default = introspection.column(name).default
+    value = column_default.arg if column_default is not None else None
+    if value != default:
+        return 'default is %r, expected %r' % (value, default)
+
+
+def _check_server_default(introspection, name, default):
+    column_default = introspection.column(name).server_default
+    if column_default is None or default is None:
+        if column_default is not None or default is not None:
+            return 'server default is %r, expected %r' % (
+                column_default, default
+            )
+    elif not _server_defaults_equal(column_default.arg, default):
+        return 'server default is %r, expected %r' % (
+            column_default.arg, default
+        )
+
+
+def _check_foreign_keys(introspection, name, foreign_keys):
+    errors = []
+    fks = dict(
+        (fk.target_fullname, fk)
+        for fk in introspection.column(name).foreign_keys
+    )
+    for foreign_key in foreign_keys:
+        fk = fks.get(foreign_key.target_fullname)
+        if fk is None:
+            errors.append(
+                'no foreign key to %r' % foreign_key.target_fullname
+            )
+            continue
+        for attr in ('deferrable', 'ondelete', 'onupdate', 'initially'):
+            if getattr(fk, attr) != getattr(foreign_key, attr):
+                errors.append('foreign key to %r has %s %r, expected %r' % (
+                    fk.target_fullname,
+                    attr,
+                    getattr(fk, attr),
+                    getattr(foreign_key, attr)
+                ))
+    return '; '.join(errors) or None
+
+
+def _normalize_sql(sql):
+    return re.sub(r'\s+', ' ', str(sql)).strip().lower()
+
+
+def _check_constraint_sql(constraint):
+    """
+    Return the normalized SQL of given check constraint or SQL string.
+    """
+    return _normalize_sql(getattr(constraint, 'sqltext', constraint))
+
+
+def _check_check_constraints(introspection, name, check_constraints):
+    texts = set(
+        _check_constraint_sql(constraint)
+        for constraint in introspection.column(name).constraints
+        if hasattr(constraint, 'sqltext')
+    )
+    missing = [
+        str(getattr(constraint, 'sqltext', constraint))
+        for constraint in check_constraints
+        if _check_constraint_sql(constraint) not in texts
+    ]
+    if missing:
+        return 'missing check constraints %r' % missing
+
+
+_column_checks = {
+    'type': _check_type,
+    'length': _check_length,
+    'nullable': _check_flag('nullable'),
+    'primary_key': _check_flag('primary_key'),
+    'unique': _check_unique,
+    'autoincrement': _check_flag('autoincrement'),
+    'index': _check_index,
+    'default': _check_default,
+    'server_default': _check_server_default,
+    'foreign_keys': _check_foreign_keys,
+    'check_constraints': _check_check_constraints,
+}
 
 
 class ModelTestCase(object):
     model = None
 
+    @property
+    def introspection(self):
+        return introspect(self.model)
+
     @property
     def columns(self):
-        fields = set(self.model._sa_class_manager.values())
-        columns = {}
-        for field in fields:
-            prop = field.property
-            if isinstance(prop, ColumnProperty):
-                column = prop.columns[0]
-                columns[column.name] = column
-        return columns
+        return self.introspection.columns
 
     @property
     def foreign_keys(self):
-        foreign_keys = {}
-        for name, column in self.columns.items():
-            if column.foreign_keys:
-                foreign_keys[name] = list(column.foreign_keys)
-        return foreign_keys
+        return self.introspection.foreign_keys
+
+    def column(self, column_name, table=None):
+        """
+        Return the column of given name, optionally qualified with the name
+        of a table of the inheritance hierarchy, as in 'entity.id'.
+        """
+        return self.introspection.column(column_name, table)
 
     def test_has_primary_key(self):
         assert any(column.primary_key for column in self.columns.values())
@@ -38,25 +610,31 @@ class ModelTestCase(object):
             "The model has the following columns: %s" % (
                 self.model.__name__,
                 column_name,
-                [column for column in self.columns]
+                [name for name, column in self.introspection.all_columns()]
             )
         )
-        assert column_name in self.columns, msg
+        assert self.introspection.has_column(column_name), msg
 
-    def assert_type(self, column_name, type_):
-        assert isinstance(self.columns[column_name].type, type_)
+    def assert_type(self, column_name, type_, dialect=None):
+        """
+        Assert the type of given column is an instance of given type class,
+        directly or through the type a TypeDecorator is stored as. On given
+        dialect, or dialect name such as 'postgresql', `type_` may also be
+        a type instance or a DDL string compared with the compiled type.
+        """
+        error = _check_type(self.introspection, column_name, type_, dialect)
+        assert not error, '%r: %s' % (column_name, error)
 
     def assert_length(self, column_name, length):
-        assert self.columns[column_name].type.length == length
+        assert self.column(column_name).type.length == length
 
     def assert_primary_key(self, column_name):
-        assert self.columns[column_name].primary_key
+        assert self.column(column_name).primary_key
 
     def assert_check_constraint(self, column_name, check_constraint):
-        found = False
-        for constraint in self.columns[column_name].constraints:
-            if constraint.sqltext.text == check_constraint.sqltext.text:
-                found = True
+        found = _check_check_constraints(
+            self.introspection, column_name, [check_constraint]
+        ) is None
 
         if not found:
             assert False, "Column %s did not have check constraint %r" % (
@@ -64,7 +642,7 @@ class ModelTestCase(object):
             )
 
     def assert_foreign_key(self, column_name, foreign_key):
-        fks = self.foreign_keys[column_name]
+        fks = self.column(column_name).foreign_keys
         for fk in fks:
             if fk.target_fullname == foreign_key.target_fullname:
                 assert fk.deferrable == foreign_key.deferrable
@@ -74,222 +652,418 @@ class ModelTestCase(object):
                 assert fk.name == foreign_key.name
 
     def assert_unique(self, column_name):
-        assert self.columns[column_name].unique
+        assert column_is_unique(self.column(column_name))
 
     def assert_index(self, column_name):
-        assert self.columns[column_name].index
+        assert column_is_indexed(self.column(column_name))
 
     def assert_default(self, column_name, default):
-        assert self.columns[column_name].default.arg == default
+        assert self.column(column_name).default.arg == default
 
     def assert_server_default(self, column_name, default):
-        column_default = self.columns[column_name].server_default.arg
-        if default.__class__ == column_default.__class__:
-            if isinstance(default, _False) or isinstance(default, _True):
-                return True
-
-        assert column_default == default
+        column_default = self.column(column_name).server_default.arg
+        assert _server_defaults_equal(column_default, default)
 
     def assert_nullable(self, column_name):
-        assert self.columns[column_name].nullable
+        assert self.column(column_name).nullable
 
     def assert_not_nullable(self, column_name):
-        assert not self.columns[column_name].nullable
+        assert not self.column(column_name).nullable
 
     def assert_autoincrement(self, column_name):
-        assert self.columns[column_name].autoincrement
+        assert self.column(column_name).autoincrement
 
     def assert_not_autoincrement(self, column_name):
-        assert not self.columns[column_name].autoincrement
+        assert not self.column(column_name).autoincrement
 
+    def assert_composite_primary_key(self, column_names):
+        primary_key = self.introspection.primary_key
+        assert primary_key == list(column_names), (
+            'Primary key of model %r is %r, expected %r' % (
+                self.model.__name__, primary_key, list(column_names)
+            )
+        )
 
-def generate_test_case(model, path):
-    file_ = open('%stest_%s.py' % (path, underscore(model.__name__)), 'w+')
+    def assert_composite_unique(self, column_names):
+        unique_constraints = self.introspection.unique_constraints
+        assert sorted(column_names) in [
+            sorted(constraint) for constraint in unique_constraints
+        ], (
+            'Model %r does not have a unique constraint on %r. The model '
+            'has the following composite unique constraints: %r' % (
+                self.model.__name__, list(column_names), unique_constraints
+            )
+        )
 
-    generator = TestCaseGenerator(model)
-    generator.process_columns()
+    def assert_composite_index(self, column_names, unique=None):
+        indexes = [
+            describe_index(index)
+            for index in self.introspection.composite_indexes.values()
+        ]
+        for index in indexes:
+            if index['columns'] == list(column_names):
+                break
+        else:
+            assert False, (
+                'Model %r does not have an index on %r. The model has the '
+                'following composite indexes: %r' % (
+                    self.model.__name__, list(column_names),
+                    [index['columns'] for index in indexes]
+                )
+            )
+        if unique is not None:
+            assert index['unique'] == bool(unique), (
+                'Index on %r is unique: %r, expected %r' % (
+                    list(column_names), index['unique'], bool(unique)
+                )
+            )
 
-    file_.writelines(
-        map(lambda a: a + os.linesep, generator.imports + generator.lines)
-    )
+    def assert_composite_check_constraint(self, check_constraint):
+        sqltext = str(getattr(check_constraint, 'sqltext', check_constraint))
+        assert _normalize_sql(sqltext) in set(
+            _normalize_sql(constraint)
+            for constraint in self.introspection.table_check_constraints
+        ), (
+            'Model %r does not have a table check constraint %r' % (
+                self.model.__name__, sqltext
+            )
+        )
 
+    def assert_columns(self, spec):
+        """
+        Assert the columns of the model match given spec in one pass and
+        report every mismatch at once. The spec maps column names to dicts
+        with any of the keys 'type', 'length', 'nullable', 'primary_key',
+        'unique', 'autoincrement', 'index', 'default', 'server_default',
+        'foreign_keys' and 'check_constraints'.
+        """
+        errors = []
+        introspection = self.introspection
+        for column_name, expected in spec.items():
+            if not introspection.has_column(column_name):
+                errors.append('%r: column does not exist' % column_name)
+                continue
+            for key, value in expected.items():
+                try:
+                    check = _column_checks[key]
+                except KeyError:
+                    raise ValueError(
+                        'Unknown column property %r in spec of %r.' % (
+                            key, column_name
+                        )
+                    )
+                error = check(introspection, column_name, value)
+                if error:
+                    errors.append('%r: %s' % (column_name, error))
 
-class TestCaseGenerator(object):
-    def __init__(self, model):
-        fields = set(model._sa_class_manager.values())
-        self.columns = {}
-        for field in fields:
-            prop = field.property
-            if isinstance(prop, ColumnProperty):
-                column = prop.columns[0]
-                self.columns[column.name] = column
+        assert not errors, 'Model %r does not match the spec:\n  %s' % (
+            self.model.__name__, '\n  '.join(errors)
+        )
 
-        self.imports = [
-            'import sqlalchemy as sa',
-            'from sqlalchemy_test import ModelTestCase',
-            'from %s import %s' % (model.__module__, model.__name__),
-        ]
+    def assert_schema(self, spec):
+        """
+        Assert the model matches given schema spec, a dict with an optional
+        'table_name', a 'columns' spec as accepted by
+        :meth:`assert_columns`, a 'relationships' spec as accepted by
+        :meth:`assert_relationships` and a 'table' spec as accepted by
+        :meth:`assert_table`.
+        """
+        if 'table_name' in spec:
+            self.assert_table_name(spec['table_name'])
+        self.assert_columns(spec.get('columns', {}))
+        self.assert_relationships(spec.get('relationships', {}))
+        if 'table' in spec:
+            self.assert_table(spec['table'])
 
-        self.lines = [
-            os.linesep,
-            'class Test%s(ModelTestCase):' % model.__name__,
-            '    model = %s%s' % (model.__name__, os.linesep)
-        ]
+    def assert_table(self, spec):
+        """
+        Assert the table level constraints of the model match given spec,
+        a dict with any of the keys 'primary_key', 'unique_constraints',
+        'indexes' and 'check_constraints' as described by
+        :meth:`ModelIntrospection.describe`.
+        """
+        actual = self.introspection.describe()['table']
+        expected = {}
+        for key, value in spec.items():
+            if key not in actual:
+                raise ValueError('Unknown table property %r in spec.' % key)
+            if key in ('unique_constraints', 'check_constraints'):
+                value = sorted(value)
+            expected[key] = value
+        differences = []
+        _compare_values(
+            'table',
+            expected,
+            dict((key, actual[key]) for key in expected),
+            differences
+        )
+        assert not differences, 'Model %r does not match the spec:\n  %s' % (
+            self.model.__name__, '\n  '.join(differences)
+        )
 
-    def process_columns(self):
-        lines = []
-        for name, column in self.columns.items():
-            lines.extend(self.has_column_test(name))
-            lines.extend(self.type_test(name, column.type))
-            if column.nullable:
-                lines.extend(self.nullable_test(name))
-            else:
-                lines.extend(self.not_nullable_test(name))
-            if hasattr(column.type, 'length') and column.type.length:
-                lines.extend(self.length_test(name, column.type.length))
-            if column.primary_key:
-                lines.extend(self.primary_key_test(name))
-            if column.foreign_keys:
-                counter = 1
-                for fk in column.foreign_keys:
-                    lines.extend(self.foreign_key_test(name, fk, counter))
-                    counter += 1
-            if column.default:
-                lines.extend(self.default_test(name, column.default.arg))
-            if column.server_default:
-                lines.extend(
-                    self.server_default_test(name, column.server_default.arg)
+    def _relationship_errors(self, name, expected):
+        prop = self.introspection.relationships.get(name)
+        if prop is None:
+            return ['%r: relationship does not exist' % name]
+        actual = describe_relationship(prop)
+        errors = []
+        for key, value in sorted(expected.items()):
+            if key not in actual:
+                raise ValueError(
+                    'Unknown relationship property %r in spec of %r.' % (
+                        key, name
+                    )
                 )
-            if column.unique:
-                lines.extend(self.unique_test(name))
-        self.lines += lines
-
-    def has_column_test(self, name):
-        return [
-            "    def test_has_%s(self):" % name.lower(),
-            "        self.assert_has('%s')%s" % (name.lower(), os.linesep)
-        ]
+            if key == 'target' and isinstance(value, type):
+                value = value.__name__
+            elif key == 'direction':
+                value = getattr(value, 'name', value)
+            elif key == 'cascade':
+                from sqlalchemy.orm.util import CascadeOptions
 
-    def nullable_test(self, name):
-        return [
-            "    def test_%s_is_nullable(self):" % name.lower(),
-            "        self.assert_nullable('%s')%s" % (name.lower(), os.linesep)
-        ]
+                value = sorted(CascadeOptions(value))
+            elif key == 'backref':
+                if isinstance(value, string_types):
+                    value = [value]
+                value = sorted(value)
+            elif key == 'uselist':
+                value = bool(value)
+            if actual[key] != value:
+                errors.append('%r: %s is %r, expected %r' % (
+                    name, key, actual[key], value
+                ))
+        return errors
 
-    def not_nullable_test(self, name):
-        return [
-            "    def test_%s_is_not_nullable(self):" % name.lower(),
-            "        self.assert_not_nullable('%s')%s" % (
-                name.lower(), os.linesep
-            )
-        ]
+    def assert_relationship(self, name, **expected):
+        """
+        Assert the model has given relationship, optionally checking its
+        'target' model, 'direction' (such as 'MANYTOONE'), 'lazy' loading
+        strategy, 'uselist', 'cascade' and 'backref'.
+        """
+        errors = self._relationship_errors(name, expected)
+        assert not errors, '\n'.join(errors)
 
-    def length_test(self, name, length):
-        return [
-            "    def test_%s_length_is_%d(self):" % (name.lower(), length),
-            "        self.assert_length('%s', %d)%s" % (
-                name.lower(), length, os.linesep
-            )
-        ]
+    def assert_relationships(self, spec):
+        """
+        Assert the relationships of the model match given spec, mapping
+        relationship names to the keyword arguments of
+        :meth:`assert_relationship`, and report every mismatch at once.
+        """
+        errors = []
+        for name, expected in sorted(spec.items()):
+            errors.extend(self._relationship_errors(name, expected))
+        assert not errors, 'Model %r does not match the spec:\n  %s' % (
+            self.model.__name__, '\n  '.join(errors)
+        )
 
-    def type_test(self, name, type_):
-        if type_.__module__ == 'sqlalchemy.types':
-            class_name = 'sa.' + type_.__class__.__name__
+    def _seed_relationship(self, factory, prop):
+        model = self.model
+        target = prop.mapper.class_
+        direction = prop.direction.name
+        if direction == 'MANYTOONE':
+            related = factory.create_batch(target, 1)[0]
+            parent = factory.create_batch(model, 1, **dict(
+                (local.name, related[remote.name])
+                for local, remote in prop.local_remote_pairs
+            ))[0]
+        elif direction == 'ONETOMANY':
+            parent = factory.create_batch(model, 1)[0]
+            factory.create_batch(target, 2, **dict(
+                (remote.name, parent[local.name])
+                for local, remote in prop.local_remote_pairs
+            ))
         else:
-            class_name = type_.__class__.__name__
-            import_line = 'from %s import %s' % (type_.__module__, class_name)
-            if import_line not in self.imports:
-                self.imports.append(
-                    import_line
-                )
+            parent = factory.create_batch(model, 1)[0]
+            related = factory.create_batch(target, 1)[0]
+            row = {}
+            for local, remote in prop.synchronize_pairs:
+                row[remote.name] = parent[local.name]
+            for local, remote in prop.secondary_synchronize_pairs:
+                row[remote.name] = related[local.name]
+            factory.session.connection().execute(prop.secondary.insert(), row)
+        return parent
 
-        return [
-            "    def test_%s_is_%s(self):" % (
-                name.lower(), type_.__class__.__name__.lower()
-            ),
-            "        self.assert_type('%s', %s)%s" % (
-                name.lower(), class_name, os.linesep
-            )
+    def assert_no_n_plus_one(self, name, session=None):
+        """
+        Assert loading given relationship for a set of parents with its
+        configured loading strategy issues the same number of queries
+        regardless of the number of parents.
+        """
+        session = session or self.session
+        prop = self.introspection.relationships[name]
+        primary_key = sa.orm.class_mapper(self.model).primary_key[0]
+        from sqlalchemy_test.factory import ModelFactory
+        from sqlalchemy_test.queries import QueryRecorder
+
+        factory = ModelFactory(session)
+        ids = [
+            self._seed_relationship(factory, prop)[primary_key.name]
+            for _ in range(4)
         ]
 
-    def primary_key_test(self, name):
-        return [
-            "    def test_%s_is_primary_key(self):" % name.lower(),
-            "        self.assert_primary_key('%s')%s" % (
-                name.lower(), os.linesep
+        recorders = []
+        for count in (2, 4):
+            session.expunge_all()
+            with QueryRecorder(session.connection()) as recorder:
+                parents = session.query(self.model).filter(
+                    primary_key.in_(ids[:count])
+                ).all()
+                for parent in parents:
+                    value = getattr(parent, name)
+                    if prop.uselist:
+                        list(value)
+            recorders.append(recorder)
+
+        assert len(recorders[0].queries) == len(recorders[1].queries), (
+            'Loading %r of %d parents with lazy=%r took %d queries, '
+            'loading it of %d parents took %d:\n%s' % (
+                name, 2, prop.lazy, len(recorders[0].queries), 4,
+                len(recorders[1].queries), recorders[1].format()
             )
-        ]
+        )
 
-    def foreign_key_test(self, name, fk, counter):
-        lines = [
-            "    def test_%s_fk%d(self):" % (name.lower(), counter),
-            "        self.assert_foreign_key(",
-            "            '%s'," % name.lower(),
-            "            sa.ForeignKey(",
-            "                'Address.id',",
-        ]
-        if fk.deferrable:
-            lines.append(
-                "                deferrable=True,"
+    def _engine(self, engine):
+        engine = engine or getattr(self, 'engine', None)
+        if engine is None:
+            raise ValueError(
+                'No engine given and the test case has no engine attribute.'
             )
-        if fk.ondelete:
-            lines.append(
-                "                ondelete='%s'," % fk.ondelete
+        return engine
+
+    @contextmanager
+    def assert_max_queries(self, count, engine=None):
+        """
+        Assert at most `count` statements are executed within the block.
+        """
+        from sqlalchemy_test.queries import QueryRecorder
+
+        with QueryRecorder(self._engine(engine)) as recorder:
+            yield recorder
+        assert len(recorder.queries) <= count, (
+            'Expected at most %d queries, %d were executed:\n%s' % (
+                count, len(recorder.queries), recorder.format()
             )
-        if fk.onupdate:
-            lines.append(
-                "                onupdate='%s'," % fk.onupdate
+        )
+
+    @contextmanager
+    def assert_sql_time_under(self, milliseconds, engine=None):
+        """
+        Assert the statements executed within the block take less than
+        given number of milliseconds in total.
+        """
+        from sqlalchemy_test.queries import QueryRecorder
+
+        with QueryRecorder(self._engine(engine)) as recorder:
+            yield recorder
+        assert recorder.duration * 1000 < milliseconds, (
+            'Expected queries to take under %s ms, took %.2f ms:\n%s' % (
+                milliseconds, recorder.duration * 1000, recorder.format()
             )
+        )
+
+    def _plan(self, query, engine):
+        session = getattr(query, 'session', None)
+        if engine is None and session is not None:
+            engine = session.connection()
+        from sqlalchemy_test.plans import explain
+
+        return explain(query, self._engine(engine))
 
-        lines.extend([
-            "            )",
-            "        )" + os.linesep,
-        ])
-        return lines
-
-    def autoincrement_test(self, name):
-        return [
-            "    def test_%s_is_autoincremented(self):" % name.lower(),
-            "        self.assert_autoincrement('%s')%s" % (
-                name.lower(), os.linesep
+    def assert_uses_index(self, query, index_name, engine=None):
+        """
+        Assert the plan of given query reads a table with given index. The
+        query is explained with given engine or connection, the connection
+        of the query's session or the test case's engine.
+        """
+        from sqlalchemy_test.plans import format_plan
+
+        steps = self._plan(query, engine)
+        assert any(step.index == index_name for step in steps), (
+            'Expected the query to use index %r, the plan is:\n%s' % (
+                index_name, format_plan(steps)
             )
-        ]
+        )
 
-    def default_test(self, name, default):
-        if isinstance(default, basestring):
-            default = "'%s'" % default
-        elif callable(default):
-            return []
+    def assert_no_full_scan(self, query, engine=None):
+        """
+        Assert the plan of given query does not scan any table fully.
+        """
+        from sqlalchemy_test.plans import format_plan
 
-        lines = [
-            "    def test_default_of_%s(self):" % name.lower(),
-            "        self.assert_default('%s', %s)%s" % (
-                name.lower(), default, os.linesep
+        steps = self._plan(query, engine)
+        scanned = [step.table for step in steps if step.full_scan]
+        assert not scanned, (
+            'Expected the query not to scan full tables, it scans %s:\n%s' % (
+                ', '.join(scanned), format_plan(steps)
             )
-        ]
-        return lines
-
-    def server_default_test(self, name, default):
-        if isinstance(default, basestring):
-            default = "'%s'" % default
-        elif isinstance(default, _False):
-            default = 'sa.sql.expression.false()'
-        elif isinstance(default, _True):
-            default = 'sa.sql.expression.true()'
-        elif callable(default):
-            return []
-        elif isinstance(default, object):
-            return []
-
-        return [
-            "    def test_server_default_of_%s(self):" % name.lower(),
-            "        self.assert_server_default('%s', %s)%s" % (
-                name.lower(), default, os.linesep
+        )
+
+    def assert_description(self, description):
+        """
+        Assert the model matches given canonical description, for example
+        one stored in a schema snapshot.
+        """
+        differences = compare_descriptions(
+            description, self.introspection.describe()
+        )
+        assert not differences, (
+            'Model %r does not match the description:\n  %s' % (
+                self.model.__name__, '\n  '.join(differences)
             )
-        ]
+        )
 
-    def unique_test(self, name):
-        return [
-            "    def test_%s_is_unique(self):" % name.lower(),
-            "        self.assert_unique('%s')%s" % (name.lower(), os.linesep)
-        ]
+
+def _subclasses(class_):
+    classes = []
+    pending = [class_]
+    seen = set()
+    while pending:
+        for subclass in type.__subclasses__(pending.pop()):
+            if subclass not in seen:
+                seen.add(subclass)
+                classes.append(subclass)
+                pending.append(subclass)
+    return classes
+
+
+def mapped_classes(base_or_metadata):
+    """
+    Return all classes mapped to tables of given declarative base or
+    MetaData, sorted by name. The subclasses of a declarative base are
+    searched, for a MetaData every class is.
+    """
+    from sqlalchemy.orm import Mapper
+
+    metadata = getattr(base_or_metadata, 'metadata', base_or_metadata)
+    if isinstance(base_or_metadata, type):
+        root = base_or_metadata
+    else:
+        root = object
+    classes = []
+    for class_ in _subclasses(root):
+        mapper = sa.inspect(class_, raiseerr=False)
+        if (
+            isinstance(mapper, Mapper) and
+            mapper.class_ is class_ and
+            getattr(mapper.local_table, 'metadata', None) is metadata
+        ):
+            classes.append(class_)
+    return sorted(classes, key=lambda class_: class_.__name__)
+
+
+def mapped_tables(base_or_metadata):
+    """
+    Return the tables of all classes mapped to given declarative base or
+    MetaData, sorted by name.
+    """
+    tables = set()
+    for model in mapped_classes(base_or_metadata):
+        tables.update(sa.inspect(model).tables)
+    return sorted(tables, key=lambda table: table.fullname)
+
+
+if sys.version_info < (3, 7):
+    from sqlalchemy_test import generator as _generator
+
+    for _name in _generator_names:
+        globals()[_name] = getattr(_generator, _name)
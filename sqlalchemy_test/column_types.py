@@ -0,0 +1,89 @@
+"""
+Comparison of column types across type decorators and dialects.
+
+A :class:`~sqlalchemy.types.TypeDecorator` matches both its own class and
+the class of the type it is stored as. Types compared on a dialect are
+compared by the DDL they compile to there. Dialects are created once per
+name, compiling a type with them is cheaper than any cache key would be.
+"""
+import re
+
+import sqlalchemy as sa
+
+
+_dialects = {}
+
+
+def resolve_type(type_):
+    """
+    Return the type given type is stored as, the implementation of a
+    :class:`~sqlalchemy.types.TypeDecorator`.
+    """
+    while isinstance(type_, sa.types.TypeDecorator):
+        type_ = type_.impl
+    return type_
+
+
+def get_dialect(dialect):
+    """
+    Return the dialect of given name, such as 'postgresql'. Dialect
+    instances are returned as is.
+    """
+    if isinstance(dialect, sa.engine.Dialect):
+        return dialect
+    try:
+        return _dialects[dialect]
+    except KeyError:
+        from sqlalchemy.dialects import registry
+
+        _dialects[dialect] = registry.load(dialect)()
+        return _dialects[dialect]
+
+
+def normalize_type(type_string):
+    return re.sub(r'\s+', ' ', type_string).strip().lower()
+
+
+def compile_type(type_, dialect):
+    """
+    Return the normalized DDL of given type instance on given dialect or
+    dialect name.
+    """
+    return normalize_type(type_.compile(dialect=get_dialect(dialect)))
+
+
+def expected_ddl(type_, dialect):
+    if isinstance(type_, sa.types.TypeEngine):
+        return compile_type(type_, dialect)
+    return normalize_type(type_)
+
+
+def type_matches(column_type, type_, dialect=None):
+    """
+    Return whether given column type matches given type class, type
+    instance or DDL string.
+
+    Without a dialect only type classes are accepted, and the column type
+    matches when it or the type a decorator is stored as is an instance of
+    the class. On a dialect a class is matched the same way against the
+    dialect implementation as well, while instances and strings match
+    when they compile to the same DDL as the column type.
+    """
+    if isinstance(type_, type):
+        types = [column_type, resolve_type(column_type)]
+        if dialect is not None:
+            types.append(types[1].dialect_impl(get_dialect(dialect)))
+        return any(isinstance(candidate, type_) for candidate in types)
+    if dialect is None:
+        raise TypeError(
+            'Type instances and strings can only be compared on a dialect.'
+        )
+    return compile_type(column_type, dialect) == expected_ddl(
+        type_, dialect
+    )
+
+
+def describe_type(column_type, dialect=None):
+    if dialect is None:
+        return repr(column_type)
+    return repr(compile_type(column_type, dialect))
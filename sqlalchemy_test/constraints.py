@@ -0,0 +1,168 @@
+"""
+Assertions proving that the database enforces the constraints of a model.
+
+Every check inserts a violating row inside a SAVEPOINT and expects an
+IntegrityError. All checks of a model run over a single connection, inside
+the transaction of the test.
+"""
+import sqlalchemy as sa
+
+from sqlalchemy_test import column_is_unique, ModelTestCase
+from sqlalchemy_test.database import DatabaseTestCase
+from sqlalchemy_test.factory import RowBuilder
+
+
+class ConstraintChecker(object):
+    """
+    Checks that the database behind `connection` enforces constraints of
+    given model.
+    """
+
+    def __init__(self, model, connection, values=None):
+        self.model = model
+        self.connection = connection
+        self.columns = dict(
+            (column.name, column)
+            for column in model.__mapper__.columns
+        )
+        self.builder = RowBuilder(connection, dict(
+            ((self.columns[name].table.name, name), value)
+            for name, value in (values or {}).items()
+        ))
+
+    def violate_unique(self, column):
+        value = self.builder.value(column)
+        self.builder.insert(column.table, {column.name: value})
+        return column.table.insert(), self.builder.row(
+            column.table, {column.name: value}
+        )
+
+    def violate_not_null(self, column):
+        return column.table.insert(), self.builder.row(
+            column.table, {column.name: None}
+        )
+
+    def violate_check(self, column, invalid_value):
+        return column.table.insert(), self.builder.row(
+            column.table, {column.name: invalid_value}
+        )
+
+    def violate_foreign_key(self, column):
+        missing = {}
+        for fk in column.foreign_keys:
+            missing[column.name] = self.connection.execute(
+                sa.select([sa.func.max(fk.column)])
+            ).scalar()
+            missing[column.name] = (missing[column.name] or 0) + 1
+        return column.table.insert(), self.builder.row(column.table, missing)
+
+    def is_enforced(self, column_name, constraint, argument):
+        """
+        Return whether inserting a row violating given constraint of given
+        column raises an IntegrityError.
+        """
+        column = self.columns[column_name]
+        savepoint = self.connection.begin_nested()
+        try:
+            if constraint == 'check':
+                statement, row = self.violate_check(column, argument)
+            else:
+                statement, row = getattr(self, 'violate_%s' % constraint)(
+                    column
+                )
+            try:
+                self.connection.execute(statement, row)
+            except sa.exc.IntegrityError:
+                return True
+            return False
+        finally:
+            savepoint.rollback()
+
+    def check(self, spec):
+        """
+        Check every constraint of given spec, which maps column names to
+        dicts with any of the keys 'unique', 'not_null', 'foreign_key' (a
+        boolean) and 'check' (a value violating a check constraint).
+        Returns a list of the constraints that are not enforced.
+        """
+        failures = []
+        for column_name, constraints in sorted(spec.items()):
+            if column_name not in self.columns:
+                failures.append('%r: column does not exist' % column_name)
+                continue
+            for constraint, argument in sorted(constraints.items()):
+                if constraint not in (
+                    'unique', 'not_null', 'foreign_key', 'check'
+                ):
+                    raise ValueError(
+                        'Unknown constraint %r in spec of %r.' % (
+                            constraint, column_name
+                        )
+                    )
+                if argument is False:
+                    continue
+                if not self.is_enforced(column_name, constraint, argument):
+                    failures.append('%r: %s constraint is not enforced' % (
+                        column_name, constraint.replace('_', ' ')
+                    ))
+        return failures
+
+    def declared_constraints(self):
+        """
+        Return a spec of the unique, not null and foreign key constraints
+        declared on the model's columns.
+        """
+        spec = {}
+        for name, column in self.columns.items():
+            constraints = {}
+            if column_is_unique(column):
+                constraints['unique'] = True
+            if not column.nullable and not column.primary_key:
+                constraints['not_null'] = True
+            if column.foreign_keys:
+                constraints['foreign_key'] = True
+            if constraints:
+                spec[name] = constraints
+        return spec
+
+
+class ConstraintTestCase(ModelTestCase, DatabaseTestCase):
+    """
+    Model test case with assertions that insert violating rows to prove the
+    database enforces the model's constraints. `valid_values` maps column
+    names to values used for required columns instead of generated ones.
+    """
+    valid_values = {}
+
+    def assert_enforces_constraints(self, spec):
+        checker = ConstraintChecker(
+            self.model, self.session.connection(), self.valid_values
+        )
+        failures = checker.check(spec)
+        assert not failures, (
+            'Database does not enforce constraints of model %r:\n  %s' % (
+                self.model.__name__, '\n  '.join(failures)
+            )
+        )
+
+    def assert_enforces_declared_constraints(self):
+        checker = ConstraintChecker(
+            self.model, self.session.connection(), self.valid_values
+        )
+        self.assert_enforces_constraints(checker.declared_constraints())
+
+    def assert_enforces_unique(self, column_name):
+        self.assert_enforces_constraints({column_name: {'unique': True}})
+
+    def assert_enforces_not_null(self, column_name):
+        self.assert_enforces_constraints({column_name: {'not_null': True}})
+
+    def assert_enforces_check(self, column_name, invalid_value):
+        self.assert_enforces_constraints(
+            {column_name: {'check': invalid_value}}
+        )
+
+    def assert_enforces_foreign_key(self, column_name):
+        self.assert_enforces_constraints(
+            {column_name: {'foreign_key': True}}
+        )
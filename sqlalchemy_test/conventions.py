@@ -0,0 +1,232 @@
+"""
+Validation of mapped models against naming and type conventions.
+
+Every column of every table mapped to a declarative base or MetaData is
+gathered once into a :class:`ColumnTable`, which stores each attribute of
+the columns as a list. Rules then evaluate only the attributes they need,
+row by row over those lists, so validating tens of thousands of columns
+against every rule takes a single gathering pass and a few list scans::
+
+    class TimestampSuffix(ColumnRule):
+        fields = ('name', 'type')
+
+        def violation(self, name, type_):
+            if isinstance(type_, sa.DateTime) and not name.endswith('_at'):
+                return 'datetime column name does not end with _at'
+
+    assert_conventions(Base, default_rules + (TimestampSuffix(), ))
+"""
+import sqlalchemy as sa
+
+from sqlalchemy_test import mapped_tables
+from sqlalchemy_test.column_types import resolve_type
+
+
+class ColumnTable(object):
+    """
+    The columns of given tables stored by attribute. Every field is a list
+    holding one value per column, in the order of :attr:`names`.
+    """
+
+    fields = (
+        'table',
+        'name',
+        'type',
+        'nullable',
+        'primary_key',
+        'foreign_keys',
+        'server_default',
+        'info',
+    )
+
+    def __init__(self, tables):
+        self.data = dict((field, []) for field in self.fields)
+        table_names = self.data['table']
+        names = self.data['name']
+        types = self.data['type']
+        nullables = self.data['nullable']
+        primary_keys = self.data['primary_key']
+        foreign_keys = self.data['foreign_keys']
+        server_defaults = self.data['server_default']
+        infos = self.data['info']
+        #: Names of the tables in the order they were given, including
+        #: tables without columns.
+        self.tables = []
+        for table in tables:
+            self.tables.append(table.fullname)
+            for column in table.columns:
+                table_names.append(table.fullname)
+                names.append(column.name)
+                types.append(resolve_type(column.type))
+                nullables.append(column.nullable)
+                primary_keys.append(column.primary_key)
+                foreign_keys.append(tuple(sorted(
+                    fk.target_fullname for fk in column.foreign_keys
+                )))
+                server_defaults.append(column.server_default is not None)
+                infos.append(column.info)
+        #: Qualified 'table.column' names of the columns.
+        self.names = [
+            '%s.%s' % (table, name) for table, name in zip(table_names, names)
+        ]
+
+    @classmethod
+    def from_models(cls, base_or_metadata):
+        """
+        Return the columns of the tables of the classes mapped to given
+        declarative base or MetaData.
+        """
+        return cls(mapped_tables(base_or_metadata))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, field):
+        return self.data[field]
+
+    def rows(self, *fields):
+        """
+        Return an iterator of the values of given fields of every column.
+        """
+        return zip(*[self.data[field] for field in fields])
+
+
+class Rule(object):
+    """
+    Base class of convention rules.
+    """
+
+    def check(self, columns):
+        """
+        Return a list of the violations of this rule in given
+        :class:`ColumnTable`.
+        """
+        raise NotImplementedError
+
+
+class ColumnRule(Rule):
+    """
+    Rule checked for every column. :meth:`violation` is called with the
+    values of :attr:`fields` of each column and returns a message when the
+    column violates the rule.
+    """
+
+    fields = ()
+
+    def violation(self, *values):
+        raise NotImplementedError
+
+    def check(self, columns):
+        violation = self.violation
+        return [
+            '%r: %s' % (name, message)
+            for name, message in zip(
+                columns.names,
+                (violation(*values) for values in columns.rows(*self.fields))
+            )
+            if message
+        ]
+
+
+class ForeignKeySuffix(ColumnRule):
+    """
+    Names of foreign key columns end with given suffix. Primary keys, such
+    as those of joined table inheritance, are exempt.
+    """
+
+    fields = ('name', 'foreign_keys', 'primary_key')
+
+    def __init__(self, suffix='_id'):
+        self.suffix = suffix
+
+    def violation(self, name, foreign_keys, primary_key):
+        if foreign_keys and not primary_key and not name.endswith(
+            self.suffix
+        ):
+            return 'foreign key column name does not end with %r' % (
+                self.suffix
+            )
+
+
+class MaxUnicodeLength(ColumnRule):
+    """
+    Unicode columns have a length of at most given length. Unicode text
+    columns are exempt.
+    """
+
+    fields = ('type', )
+
+    def __init__(self, max_length=255):
+        self.max_length = max_length
+
+    def violation(self, type_):
+        if isinstance(type_, sa.Unicode):
+            if type_.length is None:
+                return 'Unicode column has no length'
+            if type_.length > self.max_length:
+                return 'Unicode length %d exceeds %d' % (
+                    type_.length, self.max_length
+                )
+
+
+class NullableBooleanServerDefault(ColumnRule):
+    """
+    Nullable boolean columns have a server default.
+    """
+
+    fields = ('type', 'nullable', 'server_default')
+
+    def violation(self, type_, nullable, server_default):
+        if nullable and not server_default and isinstance(type_, sa.Boolean):
+            return 'nullable boolean column has no server default'
+
+
+class PrimaryKey(Rule):
+    """
+    Every table has a primary key.
+    """
+
+    def check(self, columns):
+        keyed = set(
+            table for table, primary_key in columns.rows(
+                'table', 'primary_key'
+            )
+            if primary_key
+        )
+        return [
+            '%r: table has no primary key' % table
+            for table in columns.tables
+            if table not in keyed
+        ]
+
+
+#: Rules checked by default.
+default_rules = (
+    ForeignKeySuffix(),
+    MaxUnicodeLength(),
+    NullableBooleanServerDefault(),
+    PrimaryKey(),
+)
+
+
+def find_convention_violations(base_or_metadata, rules=default_rules):
+    """
+    Return a list of the violations of given rules by the classes mapped
+    to given declarative base or MetaData, sorted by column.
+    """
+    columns = ColumnTable.from_models(base_or_metadata)
+    violations = []
+    for rule in rules:
+        violations.extend(rule.check(columns))
+    return sorted(violations)
+
+
+def assert_conventions(base_or_metadata, rules=default_rules):
+    """
+    Assert the classes mapped to given declarative base or MetaData
+    violate none of given rules, reporting all violations at once.
+    """
+    violations = find_convention_violations(base_or_metadata, rules)
+    assert not violations, 'Convention violations:\n  %s' % (
+        '\n  '.join(violations)
+    )
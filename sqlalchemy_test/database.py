@@ -0,0 +1,142 @@
+"""
+Database fixtures for model tests.
+
+The schema is created once per database URL and metadata. Every test then
+runs inside a transaction that is rolled back afterwards, so tests do not
+pay for DDL and cannot see each other's data.
+"""
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+
+_engines = {}
+
+
+def _configure_sqlite(engine):
+    # pysqlite emits its own BEGIN statements, which breaks SAVEPOINT
+    # handling. Let SQLAlchemy control the transactions instead. SQLite
+    # also needs foreign key enforcement to be turned on per connection.
+    @sa.event.listens_for(engine, 'connect')
+    def connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+    @sa.event.listens_for(engine, 'begin')
+    def begin(connection):
+        getattr(connection, 'exec_driver_sql', connection.execute)('BEGIN')
+
+
+def is_memory_url(url):
+    """
+    Return whether given URL or URL string points to an in-memory SQLite
+    database, which every connection opens empty.
+    """
+    url = sa.engine.url.make_url(url)
+    return (
+        url.get_backend_name() == 'sqlite' and
+        url.database in (None, '', ':memory:')
+    )
+
+
+def create_engine_for_url(url):
+    """
+    Return a new engine for given URL set up for tests.
+
+    An in-memory SQLite engine hands the same connection to every session,
+    since each new connection would open an empty database. It must not be
+    shared between threads. Use a file database for threaded tests.
+    """
+    if is_memory_url(url):
+        engine = sa.create_engine(url, poolclass=StaticPool)
+    else:
+        engine = sa.create_engine(url)
+    if engine.dialect.name == 'sqlite':
+        _configure_sqlite(engine)
+    return engine
+
+
+def create_test_engine(metadata, url='sqlite://'):
+    """
+    Return an engine for given URL with the tables of given metadata
+    created. The engine is created only once per URL and metadata, with
+    :func:`create_engine_for_url`.
+    """
+    key = (url, metadata)
+    try:
+        return _engines[key]
+    except KeyError:
+        engine = create_engine_for_url(url)
+        metadata.create_all(engine)
+        _engines[key] = engine
+        return engine
+
+
+def dispose_test_engines():
+    """
+    Drop the tables of and dispose every engine created with
+    :func:`create_test_engine`.
+    """
+    for (url, metadata), engine in list(_engines.items()):
+        metadata.drop_all(engine)
+        engine.dispose()
+    _engines.clear()
+
+
+class TransactionalSession(object):
+    """
+    ORM session bound to a connection inside a transaction that is rolled
+    back on :meth:`close`. Commits within the session only release a
+    SAVEPOINT, which is restarted automatically.
+    """
+
+    def __init__(self, engine):
+        self.connection = engine.connect()
+        self.transaction = self.connection.begin()
+        self.session = Session(bind=self.connection)
+        self.session.begin_nested()
+        sa.event.listen(
+            self.session, 'after_transaction_end', self._restart_savepoint
+        )
+
+    def _restart_savepoint(self, session, transaction):
+        if transaction.nested and not transaction._parent.nested:
+            session.expire_all()
+            session.begin_nested()
+
+    def close(self):
+        sa.event.remove(
+            self.session, 'after_transaction_end', self._restart_savepoint
+        )
+        self.session.rollback()
+        self.session.close()
+        self.transaction.rollback()
+        self.connection.close()
+
+    def __enter__(self):
+        return self.session
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class DatabaseTestCase(object):
+    """
+    Test case mixin giving every test a `session` whose changes are rolled
+    back after the test. The tables of `metadata`, or of the metadata of
+    `model` when used together with :class:`ModelTestCase`, are created
+    once in the database at `database_url`.
+    """
+    metadata = None
+    database_url = 'sqlite://'
+
+    def setup_method(self, method):
+        metadata = self.metadata
+        if metadata is None:
+            metadata = self.model.metadata
+        self.engine = create_test_engine(metadata, self.database_url)
+        self.transactional_session = TransactionalSession(self.engine)
+        self.session = self.transactional_session.session
+
+    def teardown_method(self, method):
+        self.transactional_session.close()
@@ -0,0 +1,194 @@
+"""
+Factories inserting valid rows for mapped models, generated from the
+column types, nullability, defaults and foreign keys of their tables.
+"""
+import datetime
+import itertools
+
+import sqlalchemy as sa
+from sqlalchemy.orm import class_mapper
+
+
+def sample_value(column, number):
+    """
+    Return a valid value for given column, distinct for every `number`.
+    """
+    type_ = column.type
+    if isinstance(type_, sa.types.TypeDecorator):
+        type_ = type_.impl
+    if isinstance(type_, sa.Enum):
+        return type_.enums[0]
+    if isinstance(type_, sa.Boolean):
+        return False
+    if isinstance(type_, (sa.Integer, sa.Numeric)):
+        return number
+    if isinstance(type_, sa.DateTime):
+        return datetime.datetime(2000, 1, 1) + datetime.timedelta(
+            seconds=number
+        )
+    if isinstance(type_, sa.Date):
+        return datetime.date(2000, 1, 1) + datetime.timedelta(days=number)
+    if isinstance(type_, sa.Time):
+        return datetime.time(number % 24)
+    if isinstance(type_, sa.LargeBinary):
+        return str(number).encode('ascii')
+    if isinstance(type_, sa.String):
+        value = u'%s-%d' % (column.name, number)
+        length = getattr(type_, 'length', None)
+        if length and len(value) > length:
+            value = (u'%d' % number)[-length:]
+        return value
+    raise ValueError(
+        'Cannot generate a value for column %r of type %r.' % (
+            column.name, column.type
+        )
+    )
+
+
+class RowBuilder(object):
+    """
+    Inserts minimal valid rows into tables, creating the rows referenced
+    by required foreign keys first. `values` maps (table name, column name)
+    pairs to the values used instead of generated ones. Integer primary
+    keys count up from the largest id in the table when it is first read
+    after :meth:`reset_ids`.
+    """
+
+    def __init__(self, connection, values=None):
+        self.connection = connection
+        self.values = values or {}
+        self.counter = itertools.count(1)
+        self.next_ids = {}
+
+    def reset_ids(self):
+        """
+        Read the largest ids again, after rows were inserted elsewhere.
+        """
+        self.next_ids = {}
+
+    def next_id(self, column):
+        key = (column.table.name, column.name)
+        if key not in self.next_ids:
+            max_id = self.connection.execute(
+                sa.select([sa.func.max(column)])
+            ).scalar()
+            self.next_ids[key] = itertools.count((max_id or 0) + 1)
+        return next(self.next_ids[key])
+
+    def value(self, column):
+        key = (column.table.name, column.name)
+        if key in self.values:
+            return self.values[key]
+        return sample_value(column, next(self.counter))
+
+    def parent_value(self, column, parents=None):
+        key = (column.table.name, column.name)
+        if parents is not None and key in parents:
+            return parents[key]
+        fk = sorted(
+            column.foreign_keys, key=lambda fk: fk.target_fullname
+        )[0]
+        value = self.insert(fk.column.table)[fk.column.name]
+        if parents is not None:
+            parents[key] = value
+        return value
+
+    def row(self, table, overrides=None, parents=None):
+        """
+        Return a valid row for given table. Rows referenced by required
+        foreign keys are inserted first, once per row or, if a `parents`
+        dict is given, once per foreign key column for all rows sharing
+        that dict.
+        """
+        overrides = overrides or {}
+        row = {}
+        for column in table.columns:
+            if column.name in overrides:
+                row[column.name] = overrides[column.name]
+            elif column.foreign_keys and (
+                column.primary_key or not column.nullable
+            ):
+                row[column.name] = self.parent_value(column, parents)
+            elif column.primary_key and isinstance(column.type, sa.Integer):
+                row[column.name] = self.next_id(column)
+            elif (
+                column.primary_key or
+                (table.name, column.name) in self.values or
+                not (
+                    column.nullable or
+                    column.default is not None or
+                    column.server_default is not None
+                )
+            ):
+                row[column.name] = self.value(column)
+        return row
+
+    def insert(self, table, overrides=None):
+        row = self.row(table, overrides)
+        self.connection.execute(table.insert(), row)
+        return row
+
+
+class ModelFactory(object):
+    """
+    Creates valid instances of mapped models within given session. Values
+    of columns are generated unless given as keyword arguments, and rows
+    referenced by required foreign keys are created as needed.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.builder = RowBuilder(None)
+
+    def _tables(self, model):
+        tables = []
+        for mapper in reversed(list(class_mapper(model).iterate_to_root())):
+            if mapper.local_table not in tables:
+                tables.append(mapper.local_table)
+        return tables
+
+    def create_batch(self, model, count, **values):
+        """
+        Insert `count` rows of given model with one executemany per table
+        and return the inserted rows as dicts. Rows referenced by required
+        foreign keys are created once and shared by the whole batch.
+        """
+        self.session.flush()
+        self.builder.connection = self.session.connection()
+        self.builder.reset_ids()
+        mapper = class_mapper(model)
+        if mapper.polymorphic_on is not None:
+            values.setdefault(
+                mapper.polymorphic_on.name, mapper.polymorphic_identity
+            )
+        parents = {}
+        rows = [{} for _ in range(count)]
+        inserted_tables = []
+        for table in self._tables(model):
+            table_rows = []
+            for row in rows:
+                overrides = dict(
+                    (name, value) for name, value in values.items()
+                    if name in table.columns
+                )
+                for column in table.columns:
+                    for fk in column.foreign_keys:
+                        if fk.column.table in inserted_tables:
+                            overrides[column.name] = row[fk.column.name]
+                table_row = self.builder.row(table, overrides, parents)
+                row.update(table_row)
+                table_rows.append(table_row)
+            if table_rows:
+                self.builder.connection.execute(table.insert(), table_rows)
+            inserted_tables.append(table)
+        return rows
+
+    def create(self, model, **values):
+        """
+        Insert a row of given model and return it loaded as an instance.
+        """
+        row = self.create_batch(model, 1, **values)[0]
+        mapper = class_mapper(model)
+        return self.session.query(model).get(
+            tuple(row[column.name] for column in mapper.primary_key)
+        )
@@ -0,0 +1,583 @@
+"""
+Generation of test modules from mapped models.
+
+This module is imported on first use of one of its names from
+:mod:`sqlalchemy_test`, so test modules that only use
+:class:`~sqlalchemy_test.ModelTestCase` do not pay for it.
+"""
+import hashlib
+import multiprocessing
+import os
+
+import sqlalchemy as sa
+from inflection import underscore
+from sqlalchemy.sql.expression import False_, True_
+
+from sqlalchemy_test import (
+    column_is_indexed,
+    column_is_unique,
+    describe_index,
+    describe_relationship,
+    introspect,
+    mapped_classes,
+    string_types
+)
+from sqlalchemy_test.shared import atomic_open
+
+
+def test_case_filename(model, path):
+    return '%stest_%s.py' % (path, underscore(model.__name__))
+
+
+FINGERPRINT_PREFIX = '# sqlalchemy-test schema fingerprint: '
+
+#: Version of the generated code, part of the fingerprint so that modules
+#: are generated again when it changes. Bump it with every change of the
+#: rendered output.
+GENERATOR_VERSION = 3
+
+
+def read_fingerprint(filename):
+    """
+    Return the schema fingerprint stored in the header of given generated
+    test module or None if the file does not exist or has no fingerprint.
+    """
+    try:
+        with open(filename) as file_:
+            line = file_.readline()
+    except IOError:
+        return None
+    if line.startswith(FINGERPRINT_PREFIX):
+        return line[len(FINGERPRINT_PREFIX):].strip()
+
+
+def write_test_case(generator, file_):
+    """
+    Stream the test module rendered by given generator into a file-like
+    object, such as an open file or ``sys.stdout``.
+    """
+    file_.writelines(line + os.linesep for line in generator.render())
+
+
+def generate_test_case(model, path, compact=None, force=False,
+                       query_checks=False):
+    """
+    Generate the test module of given model. The module is left untouched
+    if its stored fingerprint matches the current schema of the model,
+    unless `force` is True. Returns whether the module was written.
+    """
+    filename = test_case_filename(model, path)
+    generator = TestCaseGenerator(
+        model, compact=compact, query_checks=query_checks
+    )
+    if not force and read_fingerprint(filename) == generator.fingerprint:
+        return False
+
+    with open(filename, 'w+') as file_:
+        write_test_case(generator, file_)
+    return True
+
+
+def _generate_atomically(args):
+    model, path, compact, query_checks = args
+    filename = test_case_filename(model, path)
+    with atomic_open(filename) as file_:
+        write_test_case(
+            TestCaseGenerator(
+                model, compact=compact, query_checks=query_checks
+            ),
+            file_
+        )
+    return filename
+
+
+def generate_test_cases(base_or_metadata, path, workers=None, compact=None,
+                        force=False, query_checks=False):
+    """
+    Generate test cases for every class mapped to given declarative base or
+    MetaData. Models whose schema fingerprint matches the one stored in
+    their test module are skipped unless `force` is True. The remaining
+    test modules are streamed to disk by a pool of `workers` processes
+    (defaults to the number of CPUs) and each file is replaced atomically.
+    Returns the written filenames.
+    """
+    models = [
+        model for model in mapped_classes(base_or_metadata)
+        if force or read_fingerprint(test_case_filename(model, path)) !=
+        TestCaseGenerator(
+            model, compact=compact, query_checks=query_checks
+        ).fingerprint
+    ]
+    args = [(model, path, compact, query_checks) for model in models]
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    if workers > 1 and len(models) > 1:
+        pool = multiprocessing.Pool(min(workers, len(models)))
+        try:
+            return pool.map(_generate_atomically, args)
+        finally:
+            pool.close()
+            pool.join()
+    return [_generate_atomically(arg) for arg in args]
+
+
+#: Names the generated code refers to type classes with, and the import
+#: line they need, by type class.
+_type_names = {}
+
+
+def _resolve_type_name(class_):
+    class_name = class_.__name__
+    if getattr(sa, class_name, None) is class_:
+        return 'sa.' + class_name, None
+    return class_name, 'from %s import %s' % (class_.__module__, class_name)
+
+
+class TestCaseGenerator(object):
+    """
+    Renders the test module of a model. With `query_checks` the test case
+    also runs on a database and asserts that loading every relationship
+    takes the same number of queries regardless of the number of parents.
+    """
+
+    #: Models with more columns than this are generated in compact form
+    #: unless the mode is given explicitly.
+    compact_threshold = 20
+
+    def __init__(self, model, compact=None, query_checks=False):
+        self.model = model
+        self.columns = introspect(model).columns
+        self.relationships = introspect(model).relationships
+        if compact is None:
+            compact = len(self.columns) > self.compact_threshold
+        self.compact = compact
+        self.query_checks = query_checks
+        self.fingerprint = hashlib.sha1(
+            ('%d:%s.%s:%s:%s:%s' % (
+                GENERATOR_VERSION,
+                model.__module__,
+                model.__name__,
+                introspect(model).fingerprint,
+                'compact' if compact else 'verbose',
+                'queries' if query_checks else 'schema'
+            )).encode('utf-8')
+        ).hexdigest()
+
+        self.header = [FINGERPRINT_PREFIX + self.fingerprint]
+
+        self.imports = [
+            'import sqlalchemy as sa',
+            'from sqlalchemy_test import ModelTestCase',
+            'from %s import %s' % (model.__module__, model.__name__),
+        ]
+        if query_checks:
+            self.imports.insert(
+                2, 'from sqlalchemy_test.database import DatabaseTestCase'
+            )
+
+        self.lines = self.class_definition()
+
+    def class_definition(self):
+        bases = 'ModelTestCase'
+        if self.query_checks:
+            bases += ', DatabaseTestCase'
+        return [
+            os.linesep,
+            'class Test%s(%s):' % (self.model.__name__, bases),
+            '    model = %s%s' % (self.model.__name__, os.linesep)
+        ]
+
+    def process_columns(self):
+        self.lines += self.iter_tests()
+
+    def iter_tests(self):
+        """
+        Yield the lines of the test methods one column or relationship at
+        a time.
+        """
+        if self.compact:
+            for line in self.schema_test():
+                yield line
+            if self.query_checks:
+                yield ''
+            for line in self.query_tests():
+                yield line
+            return
+        for name, column in introspect(self.model).all_columns():
+            for line in self.column_tests(name, column):
+                yield line
+        for name, prop in sorted(self.relationships.items()):
+            for line in self.relationship_test(name, prop):
+                yield line
+        for line in self.table_tests():
+            yield line
+        for line in self.query_tests():
+            yield line
+
+    def column_tests(self, name, column):
+        lines = []
+        lines.extend(self.has_column_test(name))
+        lines.extend(self.type_test(name, column.type))
+        if column.nullable:
+            lines.extend(self.nullable_test(name))
+        else:
+            lines.extend(self.not_nullable_test(name))
+        if hasattr(column.type, 'length') and column.type.length:
+            lines.extend(self.length_test(name, column.type.length))
+        if column.primary_key:
+            lines.extend(self.primary_key_test(name))
+        if column.foreign_keys:
+            counter = 1
+            for fk in column.foreign_keys:
+                lines.extend(self.foreign_key_test(name, fk, counter))
+                counter += 1
+        if column.default:
+            lines.extend(self.default_test(name, column.default.arg))
+        if column.server_default:
+            lines.extend(
+                self.server_default_test(name, column.server_default.arg)
+            )
+        if column_is_unique(column):
+            lines.extend(self.unique_test(name))
+        if column_is_indexed(column):
+            lines.extend(self.index_test(name))
+        return lines
+
+    def render(self):
+        """
+        Yield every line of the test module without building the module
+        in memory. Imports are resolved up front since test methods are
+        generated lazily after them.
+        """
+        for name, column in introspect(self.model).all_columns():
+            self.type_name(column.type)
+        for prop in self.relationships.values():
+            self.target_name(prop)
+        for line in self.header + self.imports + self.class_definition():
+            yield line
+        for line in self.iter_tests():
+            yield line
+
+    def method_name(self, name):
+        return name.lower().replace('.', '_')
+
+    def has_column_test(self, name):
+        return [
+            "    def test_has_%s(self):" % self.method_name(name),
+            "        self.assert_has('%s')%s" % (name.lower(), os.linesep)
+        ]
+
+    def nullable_test(self, name):
+        return [
+            "    def test_%s_is_nullable(self):" % self.method_name(name),
+            "        self.assert_nullable('%s')%s" % (name.lower(), os.linesep)
+        ]
+
+    def not_nullable_test(self, name):
+        return [
+            "    def test_%s_is_not_nullable(self):" % self.method_name(name),
+            "        self.assert_not_nullable('%s')%s" % (
+                name.lower(), os.linesep
+            )
+        ]
+
+    def length_test(self, name, length):
+        return [
+            "    def test_%s_length_is_%d(self):" % (
+                self.method_name(name), length
+            ),
+            "        self.assert_length('%s', %d)%s" % (
+                name.lower(), length, os.linesep
+            )
+        ]
+
+    def type_name(self, type_):
+        try:
+            name, import_line = _type_names[type_.__class__]
+        except KeyError:
+            name, import_line = _type_names[type_.__class__] = (
+                _resolve_type_name(type_.__class__)
+            )
+        if import_line is not None and import_line not in self.imports:
+            self.imports.append(import_line)
+        return name
+
+    def type_test(self, name, type_):
+        class_name = self.type_name(type_)
+
+        return [
+            "    def test_%s_is_%s(self):" % (
+                self.method_name(name), type_.__class__.__name__.lower()
+            ),
+            "        self.assert_type('%s', %s)%s" % (
+                name.lower(), class_name, os.linesep
+            )
+        ]
+
+    def primary_key_test(self, name):
+        return [
+            "    def test_%s_is_primary_key(self):" % self.method_name(name),
+            "        self.assert_primary_key('%s')%s" % (
+                name.lower(), os.linesep
+            )
+        ]
+
+    def foreign_key_test(self, name, fk, counter):
+        lines = [
+            "    def test_%s_fk%d(self):" % (self.method_name(name), counter),
+            "        self.assert_foreign_key(",
+            "            '%s'," % name.lower(),
+            "            sa.ForeignKey(",
+            "                'Address.id',",
+        ]
+        if fk.deferrable:
+            lines.append(
+                "                deferrable=True,"
+            )
+        if fk.ondelete:
+            lines.append(
+                "                ondelete='%s'," % fk.ondelete
+            )
+        if fk.onupdate:
+            lines.append(
+                "                onupdate='%s'," % fk.onupdate
+            )
+
+        lines.extend([
+            "            )",
+            "        )" + os.linesep,
+        ])
+        return lines
+
+    def autoincrement_test(self, name):
+        return [
+            "    def test_%s_is_autoincremented(self):" % (
+                self.method_name(name)
+            ),
+            "        self.assert_autoincrement('%s')%s" % (
+                name.lower(), os.linesep
+            )
+        ]
+
+    def default_literal(self, default):
+        """
+        Return the Python source of given default, or None if it is not a
+        literal, such as a callable or a SQL expression.
+        """
+        if isinstance(default, (string_types, bool, int, float)):
+            return repr(default)
+        return None
+
+    def server_default_literal(self, default):
+        if isinstance(default, string_types):
+            return repr(default)
+        elif isinstance(default, False_):
+            return 'sa.sql.expression.false()'
+        elif isinstance(default, True_):
+            return 'sa.sql.expression.true()'
+        return None
+
+    def default_test(self, name, default):
+        default = self.default_literal(default)
+        if default is None:
+            return []
+
+        lines = [
+            "    def test_default_of_%s(self):" % self.method_name(name),
+            "        self.assert_default('%s', %s)%s" % (
+                name.lower(), default, os.linesep
+            )
+        ]
+        return lines
+
+    def server_default_test(self, name, default):
+        default = self.server_default_literal(default)
+        if default is None:
+            return []
+
+        return [
+            "    def test_server_default_of_%s(self):" % (
+                self.method_name(name)
+            ),
+            "        self.assert_server_default('%s', %s)%s" % (
+                name.lower(), default, os.linesep
+            )
+        ]
+
+    def unique_test(self, name):
+        return [
+            "    def test_%s_is_unique(self):" % self.method_name(name),
+            "        self.assert_unique('%s')%s" % (name.lower(), os.linesep)
+        ]
+
+    def index_test(self, name):
+        return [
+            "    def test_%s_is_indexed(self):" % self.method_name(name),
+            "        self.assert_index('%s')%s" % (name.lower(), os.linesep)
+        ]
+
+    def column_spec(self, column):
+        lines = [
+            "            'type': %s," % self.type_name(column.type),
+            "            'nullable': %r," % bool(column.nullable),
+        ]
+        if getattr(column.type, 'length', None):
+            lines.append("            'length': %d," % column.type.length)
+        if column.primary_key:
+            lines.append("            'primary_key': True,")
+        if column_is_unique(column):
+            lines.append("            'unique': True,")
+        if column_is_indexed(column):
+            lines.append("            'index': True,")
+        if column.default:
+            default = self.default_literal(column.default.arg)
+            if default is not None:
+                lines.append("            'default': %s," % default)
+        if column.server_default:
+            default = self.server_default_literal(column.server_default.arg)
+            if default is not None:
+                lines.append("            'server_default': %s," % default)
+        if column.foreign_keys:
+            lines.append("            'foreign_keys': [")
+            for fk in sorted(
+                column.foreign_keys, key=lambda fk: fk.target_fullname
+            ):
+                lines.extend([
+                    "                sa.ForeignKey(",
+                    "                    '%s'," % fk.target_fullname,
+                ])
+                for attr in ('deferrable', 'ondelete', 'onupdate'):
+                    if getattr(fk, attr):
+                        lines.append("                    %s=%r," % (
+                            attr, getattr(fk, attr)
+                        ))
+                lines.append("                ),")
+            lines.append("            ],")
+        return lines
+
+    def target_name(self, prop):
+        target = prop.mapper.class_
+        import_line = 'from %s import %s' % (
+            target.__module__, target.__name__
+        )
+        if import_line not in self.imports:
+            self.imports.append(import_line)
+        return target.__name__
+
+    def relationship_spec(self, prop):
+        description = describe_relationship(prop)
+        spec = [
+            ('target', self.target_name(prop)),
+            ('direction', "'%s'" % description['direction']),
+            ('lazy', repr(description['lazy'])),
+            ('uselist', repr(description['uselist'])),
+            ('cascade', "'%s'" % ', '.join(description['cascade'])),
+        ]
+        if description['backref']:
+            spec.append(('backref', repr(description['backref'])))
+        return spec
+
+    def relationship_test(self, name, prop):
+        lines = [
+            "    def test_%s_relationship(self):" % name.lower(),
+            "        self.assert_relationship(",
+            "            '%s'," % name,
+        ]
+        for item in self.relationship_spec(prop):
+            lines.append("            %s=%s," % item)
+        lines.append("        )" + os.linesep)
+        return lines
+
+    def query_tests(self):
+        if not self.query_checks:
+            return []
+        lines = []
+        for name in sorted(self.relationships):
+            lines.extend([
+                "    def test_%s_without_n_plus_one(self):" % name.lower(),
+                "        self.assert_no_n_plus_one('%s')%s" % (
+                    name, os.linesep
+                )
+            ])
+        return lines
+
+    def table_spec(self):
+        """
+        Return the composite primary key, unique constraints, indexes and
+        table level check constraints of the model as (key, literal)
+        pairs, leaving out the ones the model does not have.
+        """
+        table = introspect(self.model).describe()['table']
+        spec = []
+        if len(table['primary_key']) > 1:
+            spec.append(('primary_key', repr(table['primary_key'])))
+        for key in ('unique_constraints', 'indexes', 'check_constraints'):
+            if table[key]:
+                spec.append((key, repr(table[key])))
+        return spec
+
+    def table_tests(self):
+        introspection = introspect(self.model)
+        lines = []
+        if len(introspection.primary_key) > 1:
+            lines.extend([
+                "    def test_composite_primary_key(self):",
+                "        self.assert_composite_primary_key(%r)%s" % (
+                    introspection.primary_key, os.linesep
+                )
+            ])
+        for column_names in sorted(introspection.unique_constraints):
+            lines.extend([
+                "    def test_%s_are_unique(self):" % '_'.join(
+                    column_names
+                ).lower(),
+                "        self.assert_composite_unique(%r)%s" % (
+                    column_names, os.linesep
+                )
+            ])
+        for name, index in sorted(introspection.composite_indexes.items()):
+            description = describe_index(index)
+            lines.extend([
+                "    def test_%s(self):" % name.lower(),
+                "        self.assert_composite_index(",
+                "            %r," % description['columns'],
+                "            unique=%r" % description['unique'],
+                "        )" + os.linesep
+            ])
+        check_constraints = sorted(introspection.table_check_constraints)
+        for counter, sqltext in enumerate(check_constraints, 1):
+            lines.extend([
+                "    def test_table_check_constraint%d(self):" % counter,
+                "        self.assert_composite_check_constraint(%r)%s" % (
+                    sqltext, os.linesep
+                )
+            ])
+        return lines
+
+    def schema_test(self):
+        yield "    schema = {"
+        yield "        'table_name': '%s'," % self.model.__tablename__
+        yield "        'columns': {"
+        for name, column in introspect(self.model).all_columns():
+            yield "            '%s': {" % name
+            for line in self.column_spec(column):
+                yield '    ' + line
+            yield "            },"
+        yield "        },"
+        yield "        'relationships': {"
+        for name, prop in sorted(self.relationships.items()):
+            yield "            '%s': {" % name
+            for item in self.relationship_spec(prop):
+                yield "                '%s': %s," % item
+            yield "            },"
+        yield "        },"
+        table_spec = self.table_spec()
+        if table_spec:
+            yield "        'table': {"
+            for item in table_spec:
+                yield "            '%s': %s," % item
+            yield "        },"
+        yield "    }" + os.linesep
+        yield "    def test_schema(self):"
+        yield "        self.assert_schema(self.schema)"
@@ -0,0 +1,117 @@
+"""
+Index coverage analysis of mapped models.
+
+A column is covered when it is the leading column of an index, the primary
+key or a unique constraint of its table, since that is what databases use
+to look up rows by the column. A composite foreign key is covered when its
+columns lead one of those together, in any order. Foreign keys without
+such an index make joins slow and every delete or key update of a referred
+row scan the whole referring table.
+"""
+import sqlalchemy as sa
+
+from sqlalchemy_test import mapped_tables
+
+
+def _key_column_names(table):
+    """
+    Return the column names of the indexes, the primary key and the unique
+    constraints of given table, each up to the first expression that is
+    not a column.
+    """
+    expression_lists = [index.expressions for index in table.indexes]
+    for constraint in table.constraints:
+        if isinstance(
+            constraint, (sa.PrimaryKeyConstraint, sa.UniqueConstraint)
+        ):
+            expression_lists.append(list(constraint.columns))
+    key_names = []
+    for expressions in expression_lists:
+        names = []
+        for expression in expressions:
+            if not isinstance(expression, sa.Column):
+                break
+            names.append(expression.name)
+        key_names.append(names)
+    return key_names
+
+
+def covered_columns(table):
+    """
+    Return the names of the columns of given table that lead an index,
+    the primary key or a unique constraint.
+    """
+    return set(names[0] for names in _key_column_names(table) if names)
+
+
+def is_covered(table, column_names):
+    """
+    Return whether given columns of given table lead an index, the primary
+    key or a unique constraint together, in any order.
+    """
+    return _covers(_key_column_names(table), column_names)
+
+
+def _covers(key_names, column_names):
+    column_names = set(column_names)
+    return any(
+        set(names[:len(column_names)]) == column_names
+        for names in key_names
+    )
+
+
+def find_unindexed_columns(base_or_metadata, filtered=()):
+    """
+    Return a list of the foreign key and filtered columns of the tables
+    of classes mapped to given declarative base or MetaData that no index
+    covers. `filtered` holds the 'table.column' names of columns queries
+    filter by, columns declared with ``info={'filtered': True}`` are
+    checked as well.
+    """
+    tables = mapped_tables(base_or_metadata)
+    filtered = set(filtered)
+    unknown = filtered - set(
+        '%s.%s' % (table.fullname, column.name)
+        for table in tables
+        for column in table.columns
+    )
+    if unknown:
+        raise ValueError(
+            'Unknown filtered columns: %s' % ', '.join(sorted(unknown))
+        )
+
+    problems = []
+    for table in tables:
+        key_names = _key_column_names(table)
+        unindexed = {}
+        for constraint in table.foreign_key_constraints:
+            if not _covers(
+                key_names, [fk.parent.name for fk in constraint.elements]
+            ):
+                for fk in constraint.elements:
+                    unindexed.setdefault(fk.parent.name, []).append(
+                        fk.target_fullname
+                    )
+        for column in sorted(table.columns, key=lambda column: column.name):
+            name = '%s.%s' % (table.fullname, column.name)
+            for target in sorted(unindexed.get(column.name, ())):
+                problems.append(
+                    '%r: foreign key to %r is not indexed' % (name, target)
+                )
+            if (
+                (name in filtered or column.info.get('filtered')) and
+                not _covers(key_names, [column.name])
+            ):
+                problems.append('%r: filtered column is not indexed' % name)
+    return problems
+
+
+def assert_index_coverage(base_or_metadata, filtered=()):
+    """
+    Assert every foreign key and filtered column of the classes mapped to
+    given declarative base or MetaData is covered by an index.
+    """
+    problems = find_unindexed_columns(base_or_metadata, filtered)
+    assert not problems, 'Columns without a covering index:\n  %s' % (
+        '\n  '.join(problems)
+    )
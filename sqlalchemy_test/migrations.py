@@ -0,0 +1,179 @@
+"""
+Comparison of mapped models against a database built by running the
+migrations of a project.
+
+The database is built once per migrations and URL, in-memory SQLite by
+default, and reflected once with the shared reflection cache of
+:mod:`sqlalchemy_test.reflection`. Every model is then compared with the
+reflection in the same process, so checking hundreds of tables only costs
+running the migrations once.
+"""
+import glob
+import hashlib
+import os
+
+import sqlalchemy as sa
+
+from sqlalchemy_test import mapped_classes
+from sqlalchemy_test.database import create_engine_for_url
+from sqlalchemy_test.reflection import compare_with_database, reflect
+from sqlalchemy_test.snapshot import format_diff
+
+
+_migrated_engines = {}
+
+
+class Migrations(object):
+    """
+    Base class of migration runners. Runners are called with an engine of
+    an empty database and compare equal when they run the same migrations,
+    so the migrated database is built only once.
+    """
+
+    def _key(self):
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self), self._key()))
+
+    def __call__(self, engine):
+        raise NotImplementedError
+
+
+class SQLScripts(Migrations):
+    """
+    Runs the ``*.sql`` scripts of given directory in the order of their
+    file names. Runners compare equal only while the names and contents of
+    the scripts are the same, so an edited script migrates a new database.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+
+    def _key(self):
+        digest = hashlib.sha1()
+        for filename in self.scripts():
+            digest.update(os.path.basename(filename).encode('utf-8'))
+            with open(filename, 'rb') as file_:
+                digest.update(hashlib.sha1(file_.read()).digest())
+        return (self.directory, digest.hexdigest())
+
+    def scripts(self):
+        return sorted(glob.glob(os.path.join(self.directory, '*.sql')))
+
+    def __call__(self, engine):
+        for filename in self.scripts():
+            with open(filename) as file_:
+                sql = file_.read()
+            connection = engine.raw_connection()
+            try:
+                if engine.dialect.name == 'sqlite':
+                    connection.executescript(sql)
+                else:
+                    connection.cursor().execute(sql)
+                connection.commit()
+            finally:
+                connection.close()
+
+
+class AlembicMigrations(Migrations):
+    """
+    Upgrades the database to given revision with the Alembic configuration
+    in given file. The connection is passed to the ``env.py`` of the
+    project in ``config.attributes['connection']``, which it has to use
+    instead of creating its own engine.
+    """
+
+    def __init__(self, config_file, revision='head'):
+        self.config_file = os.path.abspath(config_file)
+        self.revision = revision
+
+    def _key(self):
+        return (self.config_file, self.revision)
+
+    def __call__(self, engine):
+        from alembic import command
+        from alembic.config import Config
+
+        config = Config(self.config_file)
+        with engine.begin() as connection:
+            config.attributes['connection'] = connection
+            command.upgrade(config, self.revision)
+
+
+def _drop_all(engine):
+    metadata = sa.MetaData()
+    metadata.reflect(bind=engine)
+    metadata.drop_all(bind=engine)
+
+
+def migrated_engine(migrations, url='sqlite://'):
+    """
+    Return an engine for given URL with given migrations run. The database
+    is migrated only once per URL and migrations. Every table of the
+    database is dropped before migrating, so the URL has to point to a
+    database dedicated to the check.
+    """
+    key = (url, migrations)
+    try:
+        return _migrated_engines[key]
+    except KeyError:
+        engine = create_engine_for_url(url)
+        _drop_all(engine)
+        migrations(engine)
+        _migrated_engines[key] = engine
+        return engine
+
+
+def dispose_migrated_engines():
+    for engine in _migrated_engines.values():
+        engine.dispose()
+    _migrated_engines.clear()
+
+
+def diff_migrations(base_or_metadata, migrations, url='sqlite://',
+                    ignore_tables=('alembic_version', )):
+    """
+    Compare every class mapped to given declarative base or MetaData with
+    the database built by given migrations. Returns a dict of differences
+    keyed by model name, containing only the models that differ. Tables
+    of the database that no model maps, except `ignore_tables`, are
+    reported under 'unmapped tables'.
+    """
+    reflection = reflect(migrated_engine(migrations, url))
+    models = mapped_classes(base_or_metadata)
+    diff = {}
+    mapped_tables = set()
+    for model in models:
+        mapped_tables.update(
+            table.name for table in sa.inspect(model).tables
+        )
+        differences = compare_with_database(model, reflection)
+        if differences:
+            diff[model.__name__] = differences
+    unmapped = sorted(
+        set(reflection.tables) - mapped_tables - set(ignore_tables)
+    )
+    if unmapped:
+        diff['unmapped tables'] = [
+            '%r: table is not mapped' % table for table in unmapped
+        ]
+    return diff
+
+
+def assert_migrations_match(base_or_metadata, migrations, url='sqlite://',
+                            ignore_tables=('alembic_version', )):
+    """
+    Assert the classes mapped to given declarative base or MetaData match
+    the database built by given migrations, reporting all drift at once.
+    """
+    diff = diff_migrations(base_or_metadata, migrations, url, ignore_tables)
+    assert not diff, 'Models do not match the migrated database:\n%s' % (
+        format_diff(diff)
+    )
@@ -0,0 +1,155 @@
+"""
+Query plans of SQLAlchemy queries.
+
+A query is compiled for the dialect of the connection and run prefixed
+with the EXPLAIN statement of the database. A plan parser turns the
+returned rows into :class:`PlanStep` tuples telling which table each step
+reads and with which index. Parsers for SQLite, PostgreSQL and MySQL are
+registered in :data:`plan_parsers` by dialect name, other databases can
+register their own.
+"""
+import json
+import re
+from collections import namedtuple
+
+import sqlalchemy as sa
+
+
+PlanStep = namedtuple('PlanStep', ['table', 'index', 'full_scan', 'detail'])
+
+
+class SQLitePlanParser(object):
+    """
+    Parser of the output of SQLite's ``EXPLAIN QUERY PLAN``, such as
+    ``SEARCH user USING INDEX ix_user_age (age>?)``. Every ``SCAN`` step
+    reads all rows, also when it walks an index, only ``SEARCH`` steps
+    look rows up.
+    """
+    step_pattern = re.compile(
+        r'^(?P<operation>SCAN|SEARCH)(?: TABLE)? (?P<table>\S+)'
+    )
+    index_pattern = re.compile(
+        r'USING (?:COVERING )?INDEX (?P<index>\S+)|'
+        r'USING (?P<primary_key>(?:INTEGER )?PRIMARY KEY)'
+    )
+
+    def statement(self, sql):
+        return 'EXPLAIN QUERY PLAN ' + sql
+
+    def parse(self, rows):
+        steps = []
+        for row in rows:
+            detail = row['detail']
+            match = self.step_pattern.match(detail)
+            if match is None:
+                continue
+            index = self.index_pattern.search(detail)
+            if index is not None:
+                index = index.group('index') or index.group('primary_key')
+            steps.append(PlanStep(
+                match.group('table'),
+                index,
+                match.group('operation') == 'SCAN',
+                detail
+            ))
+        return steps
+
+
+class PostgreSQLPlanParser(object):
+    """
+    Parser of the output of PostgreSQL's ``EXPLAIN (FORMAT JSON)``.
+    """
+
+    def statement(self, sql):
+        return 'EXPLAIN (FORMAT JSON) ' + sql
+
+    def parse(self, rows):
+        steps = []
+        for row in rows:
+            plans = list(row.values())[0]
+            if not isinstance(plans, list):
+                plans = json.loads(plans)
+            for plan in plans:
+                self._walk(plan['Plan'], steps)
+        return steps
+
+    def _walk(self, node, steps):
+        if 'Relation Name' in node or 'Index Name' in node:
+            steps.append(PlanStep(
+                node.get('Relation Name'),
+                node.get('Index Name'),
+                node['Node Type'] == 'Seq Scan',
+                node['Node Type']
+            ))
+        for child in node.get('Plans', []):
+            self._walk(child, steps)
+
+
+class MySQLPlanParser(object):
+    """
+    Parser of the tabular output of MySQL's ``EXPLAIN``. The join types
+    ``ALL`` and ``index`` read every row, of the table or of an index.
+    """
+
+    def statement(self, sql):
+        return 'EXPLAIN ' + sql
+
+    def parse(self, rows):
+        return [
+            PlanStep(
+                row['table'],
+                row['key'],
+                row['type'] in ('ALL', 'index'),
+                'type=%s key=%s' % (row['type'], row['key'])
+            )
+            for row in rows
+            if row['table'] is not None
+        ]
+
+
+#: Plan parsers by dialect name.
+plan_parsers = {
+    'sqlite': SQLitePlanParser(),
+    'postgresql': PostgreSQLPlanParser(),
+    'mysql': MySQLPlanParser(),
+}
+
+
+def _explain(query, connection, parser):
+    statement = getattr(query, 'statement', query)
+    compiled = statement.compile(dialect=connection.dialect)
+    parameters = compiled.construct_params()
+    if connection.dialect.positional:
+        parameters = tuple(
+            parameters[name] for name in compiled.positiontup
+        )
+    result = getattr(connection, 'exec_driver_sql', connection.execute)(
+        parser.statement(str(compiled)), parameters
+    )
+    keys = list(result.keys())
+    return parser.parse([dict(zip(keys, row)) for row in result])
+
+
+def explain(query, bind, parser=None):
+    """
+    Return the plan of given ORM query or Core selectable as a list of
+    :class:`PlanStep` tuples. `bind` is the engine or connection the query
+    is explained with, `parser` defaults to the parser registered for its
+    dialect.
+    """
+    if parser is None:
+        try:
+            parser = plan_parsers[bind.dialect.name]
+        except KeyError:
+            raise ValueError(
+                'No plan parser registered for dialect %r.' %
+                bind.dialect.name
+            )
+    if isinstance(bind, sa.engine.Engine):
+        with bind.connect() as connection:
+            return _explain(query, connection, parser)
+    return _explain(query, bind, parser)
+
+
+def format_plan(steps):
+    return '\n'.join('  %s' % step.detail for step in steps)
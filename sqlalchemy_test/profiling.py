@@ -0,0 +1,200 @@
+"""
+Optional profiling of model test case assertions and model introspection.
+
+When enabled, the ``assert_*`` methods of :class:`ModelTestCase` and its
+subclasses, and the constructor of :class:`ModelIntrospection`, are
+replaced with timing wrappers. Nothing is wrapped otherwise, so disabled
+profiling adds no cost. Timings are aggregated by model and operation.
+Assertions called by other assertions count towards the outermost one.
+
+Enable profiling with the ``--sqlalchemy-profile`` pytest option or the
+``SQLALCHEMY_TEST_PROFILE`` environment variable.
+"""
+import functools
+import inspect
+import json
+import timeit
+
+from sqlalchemy_test import ModelIntrospection, ModelTestCase
+
+
+_profiler = None
+
+
+def _model_name(model):
+    return getattr(model, '__name__', None)
+
+
+class Profiler(object):
+    def __init__(self):
+        #: Number of calls and total duration in seconds keyed by (model
+        #: name, operation).
+        self.timings = {}
+        self._depth = 0
+        self._originals = []
+
+    def record(self, model, operation, duration):
+        timing = self.timings.setdefault((model, operation), [0, 0.0])
+        timing[0] += 1
+        timing[1] += duration
+
+    def _timed(self, function, operation, get_model, outermost=True):
+        profiler = self
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            if outermost and profiler._depth:
+                return function(self, *args, **kwargs)
+            profiler._depth += outermost
+            start = timeit.default_timer()
+            try:
+                return function(self, *args, **kwargs)
+            finally:
+                profiler._depth -= outermost
+                profiler.record(
+                    get_model(self, args), operation,
+                    timeit.default_timer() - start
+                )
+        return wrapper
+
+    def _replace(self, class_, name, value):
+        self._originals.append((class_, name, class_.__dict__.get(name)))
+        setattr(class_, name, value)
+
+    def instrument(self, class_):
+        """
+        Time the assertions defined by given test case class. Context
+        manager assertions are left alone, since timing them would time
+        the code run inside them.
+        """
+        for name, function in list(vars(class_).items()):
+            if (
+                not name.startswith('assert_') or
+                not inspect.isfunction(function) or
+                inspect.isgeneratorfunction(
+                    getattr(function, '__wrapped__', None)
+                )
+            ):
+                continue
+            self._replace(class_, name, self._timed(
+                function,
+                name,
+                lambda test_case, args: _model_name(test_case.model)
+            ))
+
+    def install(self):
+        classes = [ModelTestCase]
+        while classes:
+            class_ = classes.pop()
+            self.instrument(class_)
+            classes.extend(class_.__subclasses__())
+
+        profiler = self
+
+        def __init_subclass__(cls, **kwargs):
+            profiler.instrument(cls)
+
+        self._replace(
+            ModelTestCase, '__init_subclass__', classmethod(__init_subclass__)
+        )
+        self._replace(ModelIntrospection, '__init__', self._timed(
+            ModelIntrospection.__init__,
+            'introspection',
+            lambda introspection, args: _model_name(args[0]),
+            outermost=False
+        ))
+
+    def uninstall(self):
+        while self._originals:
+            class_, name, value = self._originals.pop()
+            if value is None:
+                delattr(class_, name)
+            else:
+                setattr(class_, name, value)
+
+    def entries(self):
+        """
+        Return the timings as dicts, the most expensive first.
+        """
+        return sorted(
+            (
+                {
+                    'model': model,
+                    'operation': operation,
+                    'calls': calls,
+                    'total': total,
+                }
+                for (model, operation), (calls, total) in self.timings.items()
+            ),
+            key=lambda entry: (-entry['total'], entry['operation'])
+        )
+
+    def totals(self, key):
+        """
+        Return the calls and total duration aggregated by given key,
+        'model' or 'operation', the most expensive first.
+        """
+        totals = {}
+        for entry in self.entries():
+            total = totals.setdefault(
+                entry[key], {key: entry[key], 'calls': 0, 'total': 0.0}
+            )
+            total['calls'] += entry['calls']
+            total['total'] += entry['total']
+        return sorted(
+            totals.values(), key=lambda total: (-total['total'], total[key])
+        )
+
+    def report(self, top=10):
+        """
+        Return the lines of a report of the `top` most expensive model and
+        operation pairs, operations and models.
+        """
+        def rows(entries, *keys):
+            return [
+                '%10.2f ms %8d  %s' % (
+                    entry['total'] * 1000, entry['calls'],
+                    ' '.join(str(entry[key]) for key in keys)
+                )
+                for entry in entries[:top]
+            ]
+
+        lines = ['%13s %8s  %s' % ('total', 'calls', 'model operation')]
+        lines.extend(rows(self.entries(), 'model', 'operation'))
+        lines.append('')
+        lines.append('%13s %8s  %s' % ('total', 'calls', 'operation'))
+        lines.extend(rows(self.totals('operation'), 'operation'))
+        lines.append('')
+        lines.append('%13s %8s  %s' % ('total', 'calls', 'model'))
+        lines.extend(rows(self.totals('model'), 'model'))
+        return lines
+
+    def dump(self, filename):
+        with open(filename, 'w') as file_:
+            json.dump({
+                'entries': self.entries(),
+                'models': self.totals('model'),
+                'operations': self.totals('operation'),
+            }, file_, indent=2, sort_keys=True)
+
+
+def enable_profiling():
+    """
+    Start profiling and return the :class:`Profiler` collecting the
+    timings.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+        _profiler.install()
+    return _profiler
+
+
+def disable_profiling():
+    """
+    Stop profiling and restore the original methods.
+    """
+    global _profiler
+    if _profiler is not None:
+        _profiler.uninstall()
+        _profiler = None
@@ -0,0 +1,339 @@
+"""
+Pytest plugin that checks mapped models against a schema snapshot without
+generated test modules.
+
+Configure the declarative base and the snapshot file in the pytest ini
+file::
+
+    [pytest]
+    sqlalchemy_base = myapp.models:Base
+    sqlalchemy_snapshot = tests/schema.json
+
+The ``sqlalchemy_engine`` and ``sqlalchemy_session`` fixtures give tests a
+database with the tables of the base created once per session (at the
+``sqlalchemy_url`` ini option, in-memory SQLite by default) and roll back
+the changes of every test.
+
+The snapshot file is collected like a test module and yields one schema
+test per model. Collection only reads the snapshot, the models are
+imported when the first test runs. Run pytest with
+``--sqlalchemy-update-snapshot`` to (re)write the snapshot from the
+current models.
+
+Run pytest with ``--sqlalchemy-profile`` to time every model assertion
+and introspection and report the most expensive ones.
+
+When the tests run in pytest-xdist workers, the models are described and
+databases other than in-memory SQLite are reflected only once, and the
+results are shared with every worker through a temporary directory.
+"""
+import os
+import shutil
+import tempfile
+from importlib import import_module
+
+import pytest
+
+from sqlalchemy_test import ModelTestCase, mapped_classes
+from sqlalchemy_test.snapshot import dump_snapshot, load_snapshot
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('sqlalchemy-test')
+    group.addoption(
+        '--sqlalchemy-base',
+        dest='sqlalchemy_base',
+        help='Declarative base or MetaData of the models, as module:name.'
+    )
+    group.addoption(
+        '--sqlalchemy-snapshot',
+        dest='sqlalchemy_snapshot',
+        help='Schema snapshot file the models are checked against.'
+    )
+    group.addoption(
+        '--sqlalchemy-update-snapshot',
+        action='store_true',
+        dest='sqlalchemy_update_snapshot',
+        default=False,
+        help='Write the schema snapshot from the current models.'
+    )
+    group.addoption(
+        '--sqlalchemy-profile',
+        action='store_true',
+        dest='sqlalchemy_profile',
+        default=False,
+        help='Time every model assertion and introspection and report the '
+             'most expensive ones. Also enabled by the '
+             'SQLALCHEMY_TEST_PROFILE environment variable.'
+    )
+    group.addoption(
+        '--sqlalchemy-profile-top',
+        type=int,
+        dest='sqlalchemy_profile_top',
+        default=10,
+        help='Number of entries of every profile report table.'
+    )
+    group.addoption(
+        '--sqlalchemy-profile-json',
+        dest='sqlalchemy_profile_json',
+        help='Write the profile as JSON into given file instead of '
+             'reporting it. Also set by the SQLALCHEMY_TEST_PROFILE_JSON '
+             'environment variable.'
+    )
+    parser.addini(
+        'sqlalchemy_base',
+        'Declarative base or MetaData of the models, as module:name.'
+    )
+    parser.addini(
+        'sqlalchemy_snapshot',
+        'Schema snapshot file the models are checked against.'
+    )
+    parser.addini(
+        'sqlalchemy_url',
+        'Database URL used by the sqlalchemy_engine fixture.',
+        default='sqlite://'
+    )
+
+
+def _base_option(config):
+    return (
+        config.getoption('sqlalchemy_base') or
+        config.getini('sqlalchemy_base')
+    )
+
+
+def pytest_configure(config):
+    base = _base_option(config)
+    snapshot = (
+        config.getoption('sqlalchemy_snapshot') or
+        config.getini('sqlalchemy_snapshot')
+    )
+    if base and snapshot:
+        config.pluginmanager.register(
+            SchemaSnapshotPlugin(config, base, snapshot),
+            'sqlalchemy_test_snapshot'
+        )
+
+    profile_json = (
+        config.getoption('sqlalchemy_profile_json') or
+        os.environ.get('SQLALCHEMY_TEST_PROFILE_JSON')
+    )
+    if (
+        config.getoption('sqlalchemy_profile') or
+        os.environ.get('SQLALCHEMY_TEST_PROFILE') or
+        profile_json
+    ):
+        config.pluginmanager.register(
+            ProfilingPlugin(
+                config.getoption('sqlalchemy_profile_top'), profile_json
+            ),
+            'sqlalchemy_test_profiling'
+        )
+
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput is not None:
+        if workerinput.get('sqlalchemy_test_cache'):
+            from sqlalchemy_test.shared import (
+                disable_shared_cache,
+                enable_shared_cache
+            )
+
+            enable_shared_cache(
+                workerinput['sqlalchemy_test_cache'],
+                workerinput.get('sqlalchemy_test_fingerprint')
+            )
+            config.add_cleanup(disable_shared_cache)
+    elif config.pluginmanager.hasplugin('xdist'):
+        config.pluginmanager.register(
+            SharedCachePlugin(config), 'sqlalchemy_test_shared_cache'
+        )
+
+
+def import_object(import_path):
+    module_name, _, name = import_path.partition(':')
+    return getattr(import_module(module_name), name)
+
+
+@pytest.fixture(scope='session')
+def sqlalchemy_engine(request):
+    """
+    Engine of the database at `sqlalchemy_url` with the tables of
+    `sqlalchemy_base` created once per session.
+    """
+    from sqlalchemy_test.database import create_test_engine
+
+    base = _base_option(request.config)
+    if not base:
+        raise pytest.UsageError(
+            'The sqlalchemy_engine fixture requires the sqlalchemy_base '
+            'option.'
+        )
+    base = import_object(base)
+    return create_test_engine(
+        getattr(base, 'metadata', base),
+        request.config.getini('sqlalchemy_url')
+    )
+
+
+@pytest.fixture
+def sqlalchemy_session(sqlalchemy_engine):
+    """
+    Session whose changes are rolled back after the test.
+    """
+    from sqlalchemy_test.database import TransactionalSession
+
+    with TransactionalSession(sqlalchemy_engine) as session:
+        yield session
+
+
+class ProfilingPlugin(object):
+    """
+    Profiles the model assertions and introspections of the session and
+    reports the `top` most expensive ones, or writes the whole profile
+    into the JSON file `filename`.
+    """
+
+    def __init__(self, top, filename=None):
+        from sqlalchemy_test.profiling import enable_profiling
+
+        self.top = top
+        self.filename = filename
+        self.profiler = enable_profiling()
+
+    def pytest_sessionfinish(self, session):
+        if self.filename:
+            self.profiler.dump(self.filename)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.filename:
+            terminalreporter.write_line(
+                'sqlalchemy-test profile written to %s' % self.filename
+            )
+            return
+        terminalreporter.write_sep('=', 'sqlalchemy-test profile')
+        for line in self.profiler.report(self.top):
+            terminalreporter.write_line(line)
+
+    def pytest_unconfigure(self, config):
+        from sqlalchemy_test.profiling import disable_profiling
+
+        disable_profiling()
+
+
+class SharedCachePlugin(object):
+    """
+    Shares model descriptions and database reflections between the
+    pytest-xdist workers. The controlling process describes the models of
+    `sqlalchemy_base` once, when the first worker starts, and hands the
+    cache directory and the schema fingerprint to every worker.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.directory = None
+        self.fingerprint = None
+
+    def prepare(self):
+        if self.directory is not None:
+            return
+        from sqlalchemy_test.shared import write_descriptions
+
+        self.directory = tempfile.mkdtemp(prefix='sqlalchemy-test-')
+        base = _base_option(self.config)
+        if base:
+            self.fingerprint = write_descriptions(
+                self.directory, import_object(base)
+            )
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        self.prepare()
+        node.workerinput['sqlalchemy_test_cache'] = self.directory
+        node.workerinput['sqlalchemy_test_fingerprint'] = self.fingerprint
+
+    def pytest_unconfigure(self, config):
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class SchemaSnapshotPlugin(object):
+    def __init__(self, config, base, snapshot):
+        self.base = base
+        self.snapshot = os.path.abspath(
+            os.path.join(str(config.rootpath), snapshot)
+        )
+        self.update = config.getoption('sqlalchemy_update_snapshot')
+        self._models = None
+
+    @property
+    def models(self):
+        if self._models is None:
+            self._models = dict(
+                (model.__name__, model)
+                for model in mapped_classes(import_object(self.base))
+            )
+        return self._models
+
+    def pytest_sessionstart(self, session):
+        if self.update:
+            dump_snapshot(import_object(self.base), self.snapshot)
+
+    def pytest_collect_file(self, file_path, parent):
+        if str(file_path) == self.snapshot:
+            return SchemaSnapshotFile.from_parent(
+                parent, path=file_path, plugin=self
+            )
+
+
+class SchemaSnapshotFile(pytest.File):
+    def __init__(self, plugin, **kwargs):
+        super(SchemaSnapshotFile, self).__init__(**kwargs)
+        self.plugin = plugin
+
+    def collect(self):
+        snapshot = load_snapshot(str(self.path))
+        for name in sorted(snapshot):
+            yield ModelSchemaItem.from_parent(
+                self, name=name, description=snapshot[name]
+            )
+        yield SnapshotCoverageItem.from_parent(
+            self, name='all_models_in_snapshot', model_names=set(snapshot)
+        )
+
+
+class SchemaItem(pytest.Item):
+    def repr_failure(self, excinfo):
+        if isinstance(excinfo.value, AssertionError):
+            return str(excinfo.value)
+        return super(SchemaItem, self).repr_failure(excinfo)
+
+    def reportinfo(self):
+        return self.path, None, '%s::%s' % (self.path.name, self.name)
+
+
+class ModelSchemaItem(SchemaItem):
+    def __init__(self, description, **kwargs):
+        super(ModelSchemaItem, self).__init__(**kwargs)
+        self.description = description
+
+    def runtest(self):
+        model = self.parent.plugin.models.get(self.name)
+        assert model is not None, (
+            'Model %r of the snapshot is not mapped.' % self.name
+        )
+        test_case = type(
+            'Test%s' % self.name, (ModelTestCase, ), {'model': model}
+        )()
+        test_case.assert_description(self.description)
+
+
+class SnapshotCoverageItem(SchemaItem):
+    def __init__(self, model_names, **kwargs):
+        super(SnapshotCoverageItem, self).__init__(**kwargs)
+        self.model_names = model_names
+
+    def runtest(self):
+        missing = sorted(set(self.parent.plugin.models) - self.model_names)
+        assert not missing, (
+            'Mapped models missing from the snapshot: %s' % ', '.join(missing)
+        )
@@ -0,0 +1,76 @@
+"""
+Recording of the SQL statements executed through an engine.
+"""
+import time
+from collections import namedtuple
+
+import sqlalchemy as sa
+
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+Query = namedtuple('Query', ['statement', 'parameters', 'duration'])
+
+
+_transaction_statements = (
+    'BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT'
+)
+
+
+class QueryRecorder(object):
+    """
+    Context manager recording every statement executed through given
+    engine or connection, with its parameters and duration in seconds.
+    Transaction control statements, such as the SAVEPOINTs of the database
+    fixtures, are not recorded.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.queries = []
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault('sqlalchemy_test_query_start', []).append(
+            _timer()
+        )
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        start = conn.info['sqlalchemy_test_query_start'].pop()
+        if statement.upper().startswith(_transaction_statements):
+            return
+        self.queries.append(Query(statement, parameters, _timer() - start))
+
+    def __enter__(self):
+        sa.event.listen(
+            self.engine, 'before_cursor_execute', self._before_cursor_execute
+        )
+        sa.event.listen(
+            self.engine, 'after_cursor_execute', self._after_cursor_execute
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        sa.event.remove(
+            self.engine, 'before_cursor_execute', self._before_cursor_execute
+        )
+        sa.event.remove(
+            self.engine, 'after_cursor_execute', self._after_cursor_execute
+        )
+
+    @property
+    def duration(self):
+        return sum(query.duration for query in self.queries)
+
+    def format(self):
+        return '\n'.join(
+            '%d. [%.2f ms] %s %r' % (
+                number, query.duration * 1000, query.statement,
+                query.parameters
+            )
+            for number, query in enumerate(self.queries, 1)
+        )
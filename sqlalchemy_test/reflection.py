@@ -0,0 +1,269 @@
+"""
+Comparison of mapped models against the schema of a live database.
+
+The schema of a database is reflected once per engine with a single
+connection and shared by every test case using that engine.
+"""
+import sqlalchemy as sa
+
+from sqlalchemy_test import (
+    _normalize_sql,
+    column_is_indexed,
+    column_is_unique,
+    introspect,
+    ModelTestCase
+)
+from sqlalchemy_test.column_types import compile_type
+from sqlalchemy_test.database import is_memory_url
+from sqlalchemy_test.shared import shared_value
+
+
+_reflection_cache = {}
+
+
+class DatabaseReflection(object):
+    """
+    Tables, columns, primary keys, foreign keys, indexes, unique and check
+    constraints of a database schema.
+    """
+
+    def __init__(self, engine, schema=None, tables=None):
+        self.dialect = engine.dialect
+        if tables is None:
+            tables = self._reflect(engine, schema)
+        self.tables = tables
+
+    def _reflect(self, engine, schema):
+        with engine.connect() as connection:
+            inspector = sa.inspect(connection)
+            table_names = inspector.get_table_names(schema=schema)
+            reflected = dict(
+                (kind, _reflect_all(inspector, kind, table_names, schema))
+                for kind in (
+                    'columns',
+                    'pk_constraint',
+                    'foreign_keys',
+                    'indexes',
+                    'unique_constraints',
+                )
+            )
+            try:
+                check_constraints = _reflect_all(
+                    inspector, 'check_constraints', table_names, schema
+                )
+            except NotImplementedError:
+                check_constraints = None
+
+        tables = {}
+        for table_name in table_names:
+            tables[table_name] = {
+                'columns': dict(
+                    (column['name'], column)
+                    for column in reflected['columns'][table_name]
+                ),
+                'primary_key': set(
+                    reflected['pk_constraint'][table_name][
+                        'constrained_columns'
+                    ]
+                ),
+                'foreign_keys': reflected['foreign_keys'][table_name],
+                'indexes': reflected['indexes'][table_name],
+                'unique_constraints': (
+                    reflected['unique_constraints'][table_name]
+                ),
+                'check_constraints': None,
+            }
+            if check_constraints is not None:
+                tables[table_name]['check_constraints'] = set(
+                    _normalize_sql(constraint['sqltext'])
+                    for constraint in check_constraints[table_name]
+                )
+        return tables
+
+    def compile_type(self, type_):
+        return compile_type(type_, self.dialect)
+
+
+def _reflect_all(inspector, kind, table_names, schema):
+    """
+    Reflect given kind of schema objects of all tables, with a single
+    inspector call where the dialect supports it.
+    """
+    get_multi = getattr(inspector, 'get_multi_%s' % kind, None)
+    if get_multi is not None:
+        return dict(
+            (table_name, value)
+            for (_, table_name), value in get_multi(schema=schema).items()
+        )
+    get = getattr(inspector, 'get_%s' % kind)
+    return dict(
+        (table_name, get(table_name, schema=schema))
+        for table_name in table_names
+    )
+
+
+def reflect(engine, schema=None):
+    """
+    Return the cached :class:`DatabaseReflection` of given engine,
+    reflecting the database on first use. With a shared cache enabled,
+    databases other than in-memory SQLite are reflected only once per test
+    run.
+    """
+    key = (engine, schema)
+    try:
+        return _reflection_cache[key]
+    except KeyError:
+        if is_memory_url(engine.url):
+            # Every process opens its own in-memory SQLite database.
+            reflection = DatabaseReflection(engine, schema=schema)
+        else:
+            # Other processes of the test run see the same database, so
+            # the first one to reflect it shares the result.
+            reflection = DatabaseReflection(
+                engine,
+                schema=schema,
+                tables=shared_value(
+                    'reflection',
+                    '%r:%s' % (engine.url, schema),
+                    lambda: DatabaseReflection(engine, schema=schema).tables
+                )
+            )
+        _reflection_cache[key] = reflection
+        return reflection
+
+
+def clear_reflection_cache():
+    _reflection_cache.clear()
+
+
+def _has_index(table, column_names, unique=False):
+    return any(
+        index['column_names'] == column_names and
+        (not unique or index['unique'])
+        for index in table['indexes']
+    )
+
+
+def _compare_foreign_key(name, column_name, fk, table):
+    # Composite foreign keys are matched by their whole constraint.
+    elements = fk.constraint.elements if fk.constraint is not None else [fk]
+    constrained_columns = [element.parent.name for element in elements]
+    referred_columns = [element.column.name for element in elements]
+    for reflected in table['foreign_keys']:
+        if (
+            reflected['constrained_columns'] == constrained_columns and
+            reflected['referred_table'] == fk.column.table.name and
+            reflected['referred_columns'] == referred_columns
+        ):
+            break
+    else:
+        return ['%r: foreign key to %r does not exist' % (
+            name, fk.target_fullname
+        )]
+
+    differences = []
+    options = reflected.get('options', {})
+    for option in ('ondelete', 'onupdate'):
+        expected = (getattr(fk, option) or '').upper()
+        actual = (options.get(option) or '').upper()
+        if expected not in ('', 'NO ACTION') and expected != actual:
+            differences.append(
+                '%r: foreign key to %r has %s %r, expected %r' % (
+                    name, fk.target_fullname, option, actual or None,
+                    expected
+                )
+            )
+    return differences
+
+
+def compare_with_database(model, reflection):
+    """
+    Compare the columns, indexes, foreign keys and constraints of given
+    model with given database reflection and return a list of human
+    readable differences.
+    """
+    differences = []
+    for name, column in introspect(model).all_columns():
+        table = reflection.tables.get(column.table.name)
+        if table is None:
+            differences.append(
+                'table %r does not exist' % column.table.name
+            )
+            continue
+        reflected = table['columns'].get(column.name)
+        if reflected is None:
+            differences.append('%r: column does not exist' % name)
+            continue
+
+        expected_type = reflection.compile_type(column.type)
+        actual_type = reflection.compile_type(reflected['type'])
+        if expected_type != actual_type:
+            differences.append('%r: type is %r, expected %r' % (
+                name, actual_type, expected_type
+            ))
+        primary_key = column.name in table['primary_key']
+        if bool(column.primary_key) != primary_key:
+            differences.append('%r: primary_key is %r, expected %r' % (
+                name, primary_key, bool(column.primary_key)
+            ))
+        if (
+            not column.primary_key and
+            bool(column.nullable) != bool(reflected['nullable'])
+        ):
+            differences.append('%r: nullable is %r, expected %r' % (
+                name, bool(reflected['nullable']), bool(column.nullable)
+            ))
+        if column_is_indexed(column) and not _has_index(
+            table, [column.name]
+        ):
+            differences.append('%r: index does not exist' % name)
+        if column_is_unique(column) and not (
+            _has_index(table, [column.name], unique=True) or
+            any(
+                constraint['column_names'] == [column.name]
+                for constraint in table['unique_constraints']
+            )
+        ):
+            differences.append('%r: unique constraint does not exist' % name)
+        foreign_keys = sorted(
+            column.foreign_keys, key=lambda fk: fk.target_fullname
+        )
+        for fk in foreign_keys:
+            differences.extend(
+                _compare_foreign_key(name, column.name, fk, table)
+            )
+        for constraint in column.constraints:
+            if (
+                hasattr(constraint, 'sqltext') and
+                table['check_constraints'] is not None and
+                _normalize_sql(constraint.sqltext) not in
+                table['check_constraints']
+            ):
+                differences.append(
+                    '%r: check constraint %r does not exist' % (
+                        name, str(constraint.sqltext)
+                    )
+                )
+    return differences
+
+
+class DatabaseModelTestCase(ModelTestCase):
+    """
+    Model test case that also checks the model against the schema of the
+    database behind `engine`. The database is reflected once per engine
+    and shared by every test case.
+    """
+    engine = None
+
+    def test_matches_database(self):
+        self.assert_matches_database()
+
+    def assert_matches_database(self, engine=None):
+        differences = compare_with_database(
+            self.model, reflect(engine or self.engine)
+        )
+        assert not differences, (
+            'Model %r does not match the database:\n  %s' % (
+                self.model.__name__, '\n  '.join(differences)
+            )
+        )
@@ -0,0 +1,227 @@
+"""
+Cache of model descriptions and database reflections shared by the
+processes of a test run, such as the workers of pytest-xdist.
+
+The controlling process describes every model once with
+:func:`write_descriptions`, into a file named after the schema fingerprint
+of the descriptions, and hands the directory and the fingerprint to the
+workers. Workers then load the descriptions with a single file read
+instead of describing every model again. Every description is stored
+with a signature of the model's tables, columns, constraints, indexes,
+defaults and relationships, and a worker whose own model has a different
+signature, for example because of columns declared conditionally,
+describes the model itself. Database
+reflections are written by the first process that reflects a database and
+loaded by the others.
+
+Mapped columns and mappers are live objects of every process and are not
+shared. Descriptions are plain data, reflections also hold the reflected
+type objects, and both are pickled.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+
+from sqlalchemy_test import (
+    _canonical_value,
+    column_is_indexed,
+    column_is_unique,
+    introspect,
+    mapped_classes
+)
+
+
+_state = {'directory': None, 'fingerprint': None, 'descriptions': None}
+
+
+def enable_shared_cache(directory, fingerprint=None):
+    """
+    Share descriptions and reflections through given directory. When
+    `fingerprint` is given, model descriptions are loaded from the file
+    written for it by :func:`write_descriptions`.
+    """
+    _state.update(
+        directory=directory, fingerprint=fingerprint, descriptions=None
+    )
+
+
+def disable_shared_cache():
+    enable_shared_cache(None)
+
+
+def shared_cache_enabled():
+    return _state['directory'] is not None
+
+
+def model_key(model):
+    return '%s.%s' % (model.__module__, model.__name__)
+
+
+def _column_signature(column):
+    return '%s %s %r %r %r %s %r %r %r %r %r' % (
+        column.name,
+        column.type.__class__.__name__,
+        getattr(column.type, 'length', None),
+        column.nullable,
+        column.primary_key,
+        ','.join(sorted(fk.target_fullname for fk in column.foreign_keys)),
+        column_is_unique(column),
+        column_is_indexed(column),
+        _canonical_value(
+            column.default.arg if column.default is not None else None
+        ),
+        _canonical_value(
+            column.server_default.arg
+            if column.server_default is not None else None
+        ),
+        sorted(
+            str(constraint.sqltext)
+            for constraint in column.constraints
+            if hasattr(constraint, 'sqltext')
+        )
+    )
+
+
+def _constraint_signatures(table):
+    signatures = [
+        'index %s %r %s' % (
+            index.name,
+            index.unique,
+            ','.join(str(expression) for expression in index.expressions)
+        )
+        for index in table.indexes
+    ]
+    for constraint in table.constraints:
+        if isinstance(constraint, sa.UniqueConstraint):
+            signatures.append('unique %s' % ','.join(
+                column.name for column in constraint.columns
+            ))
+        elif isinstance(constraint, sa.CheckConstraint):
+            signatures.append('check %s' % constraint.sqltext)
+    return sorted(signatures)
+
+
+def model_signature(model):
+    """
+    Return a hash of the tables, columns, constraints, indexes, defaults
+    and relationships of given configured model in this process. It is
+    cheaper than a description and tells whether a description written by
+    another process applies to the model.
+    """
+    mapper = sa.inspect(model)
+    parts = [model_key(model)]
+    for table in sorted(mapper.tables, key=lambda table: table.fullname):
+        parts.append(table.fullname)
+        parts.extend(_column_signature(column) for column in table.columns)
+        parts.extend(_constraint_signatures(table))
+    parts.extend(sorted(mapper.relationships.keys()))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _filename(directory, kind, key):
+    return os.path.join(directory, '%s-%s.pickle' % (
+        kind, hashlib.sha1(key.encode('utf-8')).hexdigest()
+    ))
+
+
+def _load(filename):
+    with open(filename, 'rb') as file_:
+        return pickle.load(file_)
+
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+@contextmanager
+def atomic_open(filename, mode='w'):
+    """
+    Open a temporary file next to given file for writing and replace the
+    file with it once written, so other processes never read a partial
+    file. The file gets the permissions of a newly created file.
+    """
+    fd, tmp_filename = tempfile.mkstemp(
+        dir=os.path.dirname(filename) or '.', suffix='.tmp'
+    )
+    umask = os.umask(0)
+    os.umask(umask)
+    try:
+        with os.fdopen(fd, mode) as file_:
+            yield file_
+        os.chmod(tmp_filename, 0o666 & ~umask)
+        _replace(tmp_filename, filename)
+    except Exception:
+        os.remove(tmp_filename)
+        raise
+
+
+def _dump(filename, value):
+    with atomic_open(filename, 'wb') as file_:
+        pickle.dump(value, file_, pickle.HIGHEST_PROTOCOL)
+
+
+def write_descriptions(directory, base_or_metadata):
+    """
+    Describe every class mapped to given declarative base or MetaData and
+    write the descriptions into given directory, each with the signature
+    of its model. Returns the schema fingerprint the descriptions are
+    stored under.
+    """
+    descriptions = dict(
+        (
+            model_key(model),
+            (model_signature(model), introspect(model).describe())
+        )
+        for model in mapped_classes(base_or_metadata)
+    )
+    fingerprint = hashlib.sha1(
+        json.dumps(descriptions, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    _dump(_filename(directory, 'descriptions', fingerprint), descriptions)
+    return fingerprint
+
+
+def shared_description(model):
+    """
+    Return the shared description of given model, or None when there is
+    none or it was written for a model with a different signature. The
+    descriptions are loaded once per process.
+    """
+    if _state['fingerprint'] is None:
+        return None
+    if _state['descriptions'] is None:
+        try:
+            _state['descriptions'] = _load(_filename(
+                _state['directory'], 'descriptions', _state['fingerprint']
+            ))
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            _state['descriptions'] = {}
+    try:
+        signature, description = _state['descriptions'][model_key(model)]
+    except KeyError:
+        return None
+    if signature != model_signature(model):
+        return None
+    return description
+
+
+def shared_value(kind, key, build):
+    """
+    Return the value of given kind and key from the shared cache, calling
+    `build` and storing its result when no process has stored it yet.
+    Without a shared cache the value is always built.
+    """
+    if _state['directory'] is None:
+        return build()
+    filename = _filename(_state['directory'], kind, key)
+    try:
+        return _load(filename)
+    except (IOError, OSError, EOFError, pickle.UnpicklingError):
+        pass
+    value = build()
+    _dump(filename, value)
+    return value
@@ -0,0 +1,76 @@
+import json
+
+from sqlalchemy_test import compare_descriptions, introspect, mapped_classes
+
+
+def take_snapshot(base_or_metadata):
+    """
+    Return the canonical descriptions of all classes mapped to given
+    declarative base or MetaData, keyed by class name.
+    """
+    return dict(
+        (model.__name__, introspect(model).describe())
+        for model in mapped_classes(base_or_metadata)
+    )
+
+
+def dump_snapshot(base_or_metadata, filename):
+    """
+    Write the schema snapshot of given declarative base or MetaData into
+    given file.
+    """
+    with open(filename, 'w') as file_:
+        json.dump(
+            take_snapshot(base_or_metadata),
+            file_,
+            indent=2,
+            sort_keys=True,
+            separators=(',', ': ')
+        )
+        file_.write('\n')
+
+
+def load_snapshot(filename):
+    with open(filename) as file_:
+        return json.load(file_)
+
+
+def diff_snapshot(snapshot, base_or_metadata):
+    """
+    Compare the models mapped to given declarative base or MetaData with
+    given snapshot in one pass. Returns a dict of differences keyed by
+    model name, containing only the models that differ.
+    """
+    current = take_snapshot(base_or_metadata)
+    diff = {}
+    for name in sorted(set(snapshot) | set(current)):
+        if name not in current:
+            diff[name] = ['model is not mapped']
+        elif name not in snapshot:
+            diff[name] = ['model is not in the snapshot']
+        else:
+            differences = compare_descriptions(snapshot[name], current[name])
+            if differences:
+                diff[name] = differences
+    return diff
+
+
+def format_diff(diff):
+    lines = []
+    for name in sorted(diff):
+        lines.append('%s:' % name)
+        lines.extend('  %s' % difference for difference in diff[name])
+    return '\n'.join(lines)
+
+
+def assert_snapshot(base_or_metadata, filename):
+    """
+    Assert the models mapped to given declarative base or MetaData match
+    the snapshot stored in given file, reporting every difference at once.
+    """
+    diff = diff_snapshot(load_snapshot(filename), base_or_metadata)
+    assert not diff, (
+        'Models do not match the snapshot %s:\n%s' % (
+            filename, format_diff(diff)
+        )
+    )
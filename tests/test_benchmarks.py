@@ -0,0 +1,40 @@
+import json
+
+from benchmarks.benchmark import main, make_models
+
+
+class TestBenchmarks(object):
+    def test_make_models(self):
+        base, models = make_models(3, 12)
+        assert [model.__name__ for model in models] == [
+            'Model0', 'Model1', 'Model2'
+        ]
+        assert len(models[2].__table__.columns) == 12
+        assert models[2].__table__.c.column4.references(
+            models[1].__table__.c.id
+        )
+
+    def test_results_are_written_as_json(self, tmpdir):
+        output = str(tmpdir.join('results.json'))
+        main([
+            '--models', '2', '--width', '8', '--repeat', '1',
+            '--output', output
+        ])
+        with open(output) as file_:
+            report = json.load(file_)
+        names = set(result['name'] for result in report['results'])
+        assert set([
+            'columns_cold',
+            'columns_warm',
+            'assert_has',
+            'assert_foreign_key',
+            'assert_columns',
+            'find_convention_violations',
+            'process_columns_verbose',
+            'process_columns_compact',
+            'generate_test_case',
+        ]) <= names
+        for result in report['results']:
+            assert result['models'] == 2
+            assert result['width'] == 8
+            assert result['best'] <= result['mean']
@@ -0,0 +1,103 @@
+import sqlalchemy as sa
+from pytest import raises
+from sqlalchemy.dialects import mysql, postgresql
+
+from sqlalchemy_test import ModelTestCase
+from sqlalchemy_test import TestCaseGenerator as Generator
+from sqlalchemy_test.column_types import (
+    compile_type,
+    get_dialect,
+    resolve_type,
+    type_matches
+)
+from tests import Address, CustomType, User
+
+
+class TestColumnTypes(object):
+    def test_resolve_type(self):
+        assert isinstance(resolve_type(CustomType()), sa.UnicodeText)
+        type_ = sa.Integer()
+        assert resolve_type(type_) is type_
+
+    def test_get_dialect(self):
+        dialect = get_dialect('postgresql')
+        assert dialect.name == 'postgresql'
+        assert get_dialect('postgresql') is dialect
+        assert get_dialect(dialect) is dialect
+
+    def test_compile_type(self):
+        assert compile_type(User.__table__.c.email.type, 'postgresql') == (
+            'varchar(255)'
+        )
+        assert compile_type(CustomType(), 'mysql') == 'text'
+
+    def test_compile_mutated_type(self):
+        type_ = sa.Unicode(255)
+        assert compile_type(type_, 'postgresql') == 'varchar(255)'
+        type_.length = 100
+        assert compile_type(type_, 'postgresql') == 'varchar(100)'
+
+    def test_type_decorator_matches_impl(self):
+        assert type_matches(CustomType(), CustomType)
+        assert type_matches(CustomType(), sa.UnicodeText)
+        assert not type_matches(CustomType(), sa.Integer)
+
+    def test_dialect_implementation(self):
+        assert type_matches(
+            sa.Enum('a', name='e'), postgresql.ENUM, 'postgresql'
+        )
+        assert not type_matches(sa.Boolean(), mysql.TINYINT, 'mysql')
+
+    def test_compiled_types(self):
+        assert type_matches(
+            sa.DateTime(), 'TIMESTAMP WITHOUT TIME ZONE', 'postgresql'
+        )
+        assert type_matches(sa.Unicode(255), sa.String(255), 'postgresql')
+        assert not type_matches(sa.Unicode(255), sa.String(100), 'mysql')
+
+    def test_instances_need_a_dialect(self):
+        with raises(TypeError):
+            type_matches(sa.Unicode(255), 'varchar(255)')
+
+
+class TestTypeAssertions(ModelTestCase):
+    model = User
+
+    def test_assert_type_of_type_decorator_impl(self):
+        self.model = Address
+        self.assert_type('name', sa.UnicodeText)
+        self.assert_type('name', 'TEXT', dialect='postgresql')
+
+    def test_assert_type_on_dialect(self):
+        self.assert_type('email', 'VARCHAR(255)', dialect='postgresql')
+        self.assert_type('email', sa.Unicode(255), dialect='mysql')
+        self.assert_type('created_at', 'DATETIME', dialect='mysql')
+        self.assert_type('is_active', sa.Boolean, dialect='sqlite')
+
+    def test_assert_type_failure(self):
+        with raises(AssertionError) as exc_info:
+            self.assert_type('created_at', 'datetime', dialect='postgresql')
+        assert str(exc_info.value) == (
+            "'created_at': type is 'timestamp without time zone', "
+            "expected 'datetime' on postgresql"
+        )
+        with raises(AssertionError) as exc_info:
+            self.assert_type('age', sa.Unicode)
+        assert str(exc_info.value) == (
+            "'age': type is Integer(), expected Unicode"
+        )
+
+    def test_assert_columns_with_type_decorator_impl(self):
+        self.model = Address
+        self.assert_columns({'name': {'type': sa.UnicodeText}})
+
+
+class TestTypeNames(object):
+    def test_type_names_are_cached_per_class(self):
+        generator = Generator(Address)
+        assert generator.type_name(CustomType()) == 'CustomType'
+        assert generator.type_name(CustomType()) == 'CustomType'
+        assert generator.imports.count(
+            'from tests import CustomType'
+        ) == 1
+        assert generator.type_name(sa.Integer()) == 'sa.Integer'
@@ -0,0 +1,180 @@
+import sqlalchemy as sa
+from pytest import raises
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test import (
+    compare_descriptions,
+    introspect,
+    ModelTestCase,
+    TestCaseGenerator as Generator
+)
+from tests import User
+
+
+Base = declarative_base()
+
+
+class Booking(Base):
+    __tablename__ = 'booking'
+    __table_args__ = (
+        sa.UniqueConstraint('room', 'starts_at'),
+        sa.Index('ix_booking_room_ends_at', 'room', 'ends_at', unique=True),
+        sa.CheckConstraint('starts_at < ends_at'),
+    )
+    hotel_id = sa.Column(sa.Integer, primary_key=True)
+    booking_number = sa.Column(sa.Integer, primary_key=True)
+    room = sa.Column(sa.Integer)
+    starts_at = sa.Column(sa.DateTime)
+    ends_at = sa.Column(sa.DateTime)
+
+
+class Reservation(Base):
+    __tablename__ = 'reservation'
+    __table_args__ = (
+        sa.Index('ix_reservation_guest', 'guest'),
+        sa.UniqueConstraint('code'),
+        sa.Index('ix_reservation_token', 'token', unique=True),
+    )
+    id = sa.Column(sa.Integer, primary_key=True)
+    guest = sa.Column(sa.Integer)
+    code = sa.Column(sa.Integer)
+    token = sa.Column(sa.Integer)
+
+
+class TestSingleColumnTableConstraints(ModelTestCase):
+    model = Reservation
+
+    def test_column_descriptions(self):
+        columns = introspect(Reservation).describe()['columns']
+        assert (columns['guest']['index'], columns['guest']['unique']) == (
+            True, False
+        )
+        assert (columns['code']['index'], columns['code']['unique']) == (
+            False, True
+        )
+        assert (columns['token']['index'], columns['token']['unique']) == (
+            True, True
+        )
+        assert not columns['id']['index']
+
+    def test_assertions(self):
+        self.assert_index('guest')
+        self.assert_unique('code')
+        self.assert_unique('token')
+        self.assert_columns({
+            'guest': {'index': True, 'unique': False},
+            'code': {'index': False, 'unique': True},
+        })
+        with raises(AssertionError):
+            self.assert_unique('guest')
+
+    def test_dropped_index_is_noticed(self):
+        description = introspect(Reservation).describe()
+        expected = dict(description, columns=dict(
+            description['columns'],
+            guest=dict(description['columns']['guest'], index=False)
+        ))
+        assert compare_descriptions(expected, description) == [
+            "'guest': index is True, expected False"
+        ]
+
+    def test_generated_tests(self):
+        source = '\n'.join(Generator(Reservation, compact=False).render())
+        assert "self.assert_index('guest')" in source
+        assert "self.assert_unique('code')" in source
+
+
+class TestCompositeIntrospection(object):
+    def test_table_description(self):
+        assert introspect(Booking).describe()['table'] == {
+            'primary_key': ['hotel_id', 'booking_number'],
+            'unique_constraints': [['room', 'starts_at']],
+            'indexes': {
+                'ix_booking_room_ends_at': {
+                    'columns': ['room', 'ends_at'],
+                    'unique': True,
+                },
+            },
+            'check_constraints': ['starts_at < ends_at'],
+        }
+
+    def test_type_bound_check_constraints_are_ignored(self):
+        assert introspect(User).table_check_constraints == []
+
+    def test_compare_descriptions(self):
+        description = introspect(Booking).describe()
+        expected = dict(description, table=dict(
+            description['table'], primary_key=['hotel_id']
+        ))
+        assert compare_descriptions(expected, description) == [
+            "table: primary_key is ['hotel_id', 'booking_number'], "
+            "expected ['hotel_id']"
+        ]
+
+
+class TestCompositeAssertions(ModelTestCase):
+    model = Booking
+
+    def test_assert_composite_primary_key(self):
+        self.assert_composite_primary_key(['hotel_id', 'booking_number'])
+        with raises(AssertionError):
+            self.assert_composite_primary_key(['booking_number', 'hotel_id'])
+
+    def test_assert_composite_unique(self):
+        self.assert_composite_unique(['starts_at', 'room'])
+        with raises(AssertionError):
+            self.assert_composite_unique(['room', 'ends_at'])
+
+    def test_assert_composite_index(self):
+        self.assert_composite_index(['room', 'ends_at'], unique=True)
+        with raises(AssertionError):
+            self.assert_composite_index(['room', 'ends_at'], unique=False)
+        with raises(AssertionError):
+            self.assert_composite_index(['ends_at', 'room'])
+
+    def test_assert_composite_check_constraint(self):
+        self.assert_composite_check_constraint('starts_at < ends_at')
+        self.assert_composite_check_constraint(
+            sa.CheckConstraint('starts_at < ends_at')
+        )
+        self.assert_composite_check_constraint('STARTS_AT  <  ends_at')
+        with raises(AssertionError):
+            self.assert_composite_check_constraint('room > 0')
+
+    def test_assert_table(self):
+        self.assert_table({
+            'unique_constraints': [['room', 'starts_at']],
+            'check_constraints': ['starts_at < ends_at'],
+        })
+        with raises(AssertionError):
+            self.assert_table({'indexes': {}})
+        with raises(ValueError):
+            self.assert_table({'foreign_keys': []})
+
+
+class TestCompositeGeneration(object):
+    def run_generated(self, compact):
+        source = '\n'.join(Generator(Booking, compact=compact).render())
+        namespace = {}
+        exec(compile(source, 'test_booking.py', 'exec'), namespace)
+        test_case = namespace['TestBooking']()
+        for name in dir(test_case):
+            if name.startswith('test_'):
+                getattr(test_case, name)()
+        return source
+
+    def test_verbose_test_case(self):
+        source = self.run_generated(compact=False)
+        assert 'def test_composite_primary_key(self):' in source
+        assert 'def test_room_starts_at_are_unique(self):' in source
+        assert 'def test_ix_booking_room_ends_at(self):' in source
+        assert 'def test_table_check_constraint1(self):' in source
+
+    def test_compact_test_case(self):
+        source = self.run_generated(compact=True)
+        assert "        'table': {" in source
+        assert "'primary_key': ['hotel_id', 'booking_number']," in source
+
+    def test_compact_test_case_without_table_constraints(self):
+        source = '\n'.join(Generator(User, compact=True).render())
+        assert "'table'" not in source
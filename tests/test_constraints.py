@@ -0,0 +1,90 @@
+import sqlalchemy as sa
+from pytest import raises
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test.constraints import ConstraintChecker, ConstraintTestCase
+from sqlalchemy_test.database import TransactionalSession, create_test_engine
+from tests import Address, User
+
+
+UnconstrainedBase = declarative_base()
+
+
+class UnconstrainedUser(UnconstrainedBase):
+    __tablename__ = 'user'
+    id = sa.Column(sa.Integer, primary_key=True)
+    email = sa.Column(sa.Unicode(255), unique=True, nullable=False)
+    age = sa.Column(sa.Integer)
+    address_id = sa.Column(sa.Integer, sa.ForeignKey('address.id'))
+
+
+class UnconstrainedAddress(UnconstrainedBase):
+    __tablename__ = 'address'
+    id = sa.Column(sa.Integer, primary_key=True)
+
+
+class TestUserConstraints(ConstraintTestCase):
+    model = User
+
+    def test_enforces_unique(self):
+        self.assert_enforces_unique('email')
+
+    def test_enforces_not_null(self):
+        self.assert_enforces_not_null('email')
+        self.assert_enforces_not_null('name')
+
+    def test_enforces_check(self):
+        self.assert_enforces_check('age', 10)
+
+    def test_enforces_foreign_key(self):
+        self.assert_enforces_foreign_key('address_id')
+        self.assert_enforces_foreign_key('id')
+
+    def test_enforces_declared_constraints(self):
+        self.assert_enforces_declared_constraints()
+
+    def test_unenforced_constraints_are_reported(self):
+        with raises(AssertionError) as excinfo:
+            self.assert_enforces_constraints({
+                'description': {'unique': True, 'not_null': True},
+                'unknown': {'unique': True},
+            })
+        message = str(excinfo.value)
+        assert (
+            "'description': unique constraint is not enforced" in message
+        )
+        assert (
+            "'description': not null constraint is not enforced" in message
+        )
+        assert "'unknown': column does not exist" in message
+
+    def test_valid_values(self):
+        self.valid_values = {'age': 20}
+        with raises(AssertionError):
+            self.assert_enforces_unique('age')
+
+    def test_unknown_constraint(self):
+        with raises(ValueError):
+            self.assert_enforces_constraints({'age': {'primary': True}})
+
+    def test_checks_leave_no_rows(self):
+        self.assert_enforces_declared_constraints()
+        assert self.session.query(User).count() == 0
+        assert self.session.query(Address).count() == 0
+
+
+class TestConstraintChecker(object):
+    def test_detects_missing_database_constraints(self, tmpdir):
+        # The database was created from a schema lacking the constraints
+        # of the model, as if a migration had not been written.
+        engine = create_test_engine(
+            UnconstrainedBase.metadata, 'sqlite:///%s' % tmpdir.join('db')
+        )
+        with TransactionalSession(engine) as session:
+            checker = ConstraintChecker(
+                UnconstrainedUser, session.connection()
+            )
+            assert checker.check({'age': {'check': 10}}) == [
+                "'age': check constraint is not enforced"
+            ]
+            assert checker.check(checker.declared_constraints()) == []
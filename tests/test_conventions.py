@@ -0,0 +1,125 @@
+import sqlalchemy as sa
+from pytest import raises
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test.column_types import resolve_type
+from sqlalchemy_test.conventions import (
+    assert_conventions,
+    ColumnRule,
+    ColumnTable,
+    default_rules,
+    find_convention_violations,
+    ForeignKeySuffix
+)
+from tests import Base, CustomType, User
+
+
+ConventionBase = declarative_base()
+
+
+class Author(ConventionBase):
+    __tablename__ = 'author'
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.Unicode(300))
+    nickname = sa.Column(sa.Unicode)
+    bio = sa.Column(sa.UnicodeText)
+    is_active = sa.Column(sa.Boolean)
+    is_admin = sa.Column(sa.Boolean, nullable=False)
+    is_visible = sa.Column(sa.Boolean, server_default=sa.true())
+
+
+class Book(ConventionBase):
+    __tablename__ = 'book'
+    id = sa.Column(sa.Integer, primary_key=True)
+    writer = sa.Column(sa.Integer, sa.ForeignKey(Author.id))
+    author_id = sa.Column(sa.Integer, sa.ForeignKey(Author.id))
+    published_at = sa.Column(sa.DateTime)
+    printed = sa.Column(sa.DateTime, server_default=sa.func.now())
+
+
+review = sa.Table(
+    'review',
+    ConventionBase.metadata,
+    sa.Column('book_id', sa.Integer, sa.ForeignKey(Book.id)),
+    sa.Column('body', sa.UnicodeText)
+)
+
+
+class Review(ConventionBase):
+    __table__ = review
+    __mapper_args__ = {'primary_key': [review.c.book_id]}
+
+
+class TimestampSuffix(ColumnRule):
+    fields = ('name', 'type')
+
+    def violation(self, name, type_):
+        if isinstance(type_, sa.DateTime) and not name.endswith('_at'):
+            return 'datetime column name does not end with _at'
+
+
+class TestColumnTable(object):
+    def test_fields(self):
+        columns = ColumnTable([Book.__table__])
+        assert len(columns) == 5
+        assert columns.tables == ['book']
+        assert columns.names == [
+            'book.id',
+            'book.writer',
+            'book.author_id',
+            'book.published_at',
+            'book.printed',
+        ]
+        assert columns['foreign_keys'] == [
+            (), ('author.id', ), ('author.id', ), (), ()
+        ]
+        assert columns['server_default'][3:] == [False, True]
+        assert list(columns.rows('name', 'primary_key'))[:2] == [
+            ('id', True), ('writer', False)
+        ]
+
+    def test_from_models(self):
+        columns = ColumnTable.from_models(Base)
+        assert columns.tables == ['address', 'entity', 'user']
+        assert 'user.email' in columns.names
+
+    def test_resolves_type_decorators(self):
+        assert isinstance(resolve_type(CustomType()), sa.UnicodeText)
+        columns = ColumnTable([User.__table__.metadata.tables['address']])
+        assert isinstance(columns['type'][1], sa.UnicodeText)
+
+
+class TestConventions(object):
+    def test_default_rules(self):
+        assert find_convention_violations(ConventionBase) == [
+            "'author.is_active': nullable boolean column has no server "
+            "default",
+            "'author.name': Unicode length 300 exceeds 255",
+            "'author.nickname': Unicode column has no length",
+            "'book.writer': foreign key column name does not end with '_id'",
+            "'review': table has no primary key",
+        ]
+
+    def test_joined_inheritance_primary_key_is_exempt(self):
+        assert find_convention_violations(Base) == []
+
+    def test_custom_rules(self):
+        assert find_convention_violations(
+            ConventionBase, [ForeignKeySuffix('_ref'), TimestampSuffix()]
+        ) == [
+            "'book.author_id': foreign key column name does not end with "
+            "'_ref'",
+            "'book.printed': datetime column name does not end with _at",
+            "'book.writer': foreign key column name does not end with "
+            "'_ref'",
+            "'review.book_id': foreign key column name does not end with "
+            "'_ref'",
+        ]
+
+    def test_assert_conventions(self):
+        assert_conventions(Base)
+        with raises(AssertionError) as exc_info:
+            assert_conventions(ConventionBase, default_rules[3:])
+        assert str(exc_info.value) == (
+            "Convention violations:\n  'review': table has no primary key"
+        )
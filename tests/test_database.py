@@ -0,0 +1,80 @@
+import sqlalchemy as sa
+
+from sqlalchemy_test import ModelTestCase
+from sqlalchemy_test.database import (
+    DatabaseTestCase,
+    TransactionalSession,
+    create_engine_for_url,
+    create_test_engine,
+    is_memory_url
+)
+from tests import Address, Base
+
+
+class TestDatabaseTestCase(ModelTestCase, DatabaseTestCase):
+    model = Address
+
+    def test_uses_metadata_of_model(self):
+        assert self.engine is create_test_engine(Base.metadata)
+
+    def test_session_is_usable(self):
+        self.session.add(Address(name=u'Street 1'))
+        self.session.flush()
+        assert self.session.query(Address).count() == 1
+
+
+class TestTransactionalSession(object):
+    def test_schema_is_created_once(self):
+        assert create_test_engine(Base.metadata) is (
+            create_test_engine(Base.metadata)
+        )
+
+    def test_changes_are_rolled_back(self):
+        engine = create_test_engine(Base.metadata)
+        with TransactionalSession(engine) as session:
+            session.add(Address(name=u'Street 1'))
+            session.flush()
+            assert session.query(Address).count() == 1
+        with TransactionalSession(engine) as session:
+            assert session.query(Address).count() == 0
+
+    def test_commits_are_rolled_back(self):
+        engine = create_test_engine(Base.metadata)
+        with TransactionalSession(engine) as session:
+            session.add(Address(name=u'Street 1'))
+            session.commit()
+            session.add(Address(name=u'Street 2'))
+            session.commit()
+            assert session.query(Address).count() == 2
+            session.add(Address(name=u'Street 3'))
+            session.rollback()
+            assert session.query(Address).count() == 2
+        with TransactionalSession(engine) as session:
+            assert session.query(Address).count() == 0
+
+    def test_custom_url(self, tmpdir):
+        url = 'sqlite:///%s' % tmpdir.join('test.db')
+        engine = create_test_engine(Base.metadata, url)
+        assert sa.inspect(engine).get_table_names() == [
+            'address', 'entity', 'user'
+        ]
+
+
+class TestCreateEngineForUrl(object):
+    def test_is_memory_url(self):
+        assert is_memory_url('sqlite://')
+        assert is_memory_url('sqlite:///:memory:')
+        assert is_memory_url(sa.engine.url.make_url('sqlite+pysqlite://'))
+        assert not is_memory_url('sqlite:///test.db')
+        assert not is_memory_url('postgresql://localhost/test')
+
+    def test_memory_database_is_shared_by_connections(self):
+        engine = create_engine_for_url('sqlite://')
+        engine.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        assert sa.inspect(engine).get_table_names() == ['item']
+
+    def test_foreign_keys_are_enforced(self, tmpdir):
+        engine = create_engine_for_url(
+            'sqlite:///%s' % tmpdir.join('test.db')
+        )
+        assert engine.execute('PRAGMA foreign_keys').scalar() == 1
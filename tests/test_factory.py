@@ -0,0 +1,92 @@
+import sqlalchemy as sa
+
+from sqlalchemy_test.database import DatabaseTestCase
+from sqlalchemy_test.factory import ModelFactory, RowBuilder, sample_value
+from tests import Address, Base, Entity, User
+
+
+class TestModelFactory(DatabaseTestCase):
+    metadata = Base.metadata
+
+    def setup_method(self, method):
+        DatabaseTestCase.setup_method(self, method)
+        self.factory = ModelFactory(self.session)
+
+    def test_create(self):
+        address = self.factory.create(Address)
+        assert isinstance(address, Address)
+        assert address.id is not None
+
+    def test_create_with_values(self):
+        user = self.factory.create(User, email=u'john@example.com', age=20)
+        assert user.email == u'john@example.com'
+        assert user.age == 20
+
+    def test_create_resolves_inheritance(self):
+        user = self.factory.create(User)
+        assert user.name is not None
+        assert self.session.query(Entity).count() == 1
+
+    def test_create_batch(self):
+        rows = self.factory.create_batch(User, 100)
+        assert len(rows) == 100
+        assert self.session.query(User).count() == 100
+        assert len(set(row['email'] for row in rows)) == 100
+
+    def test_create_batch_inserts_with_executemany(self):
+        statements = []
+
+        def before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            statements.append((statement.split('(')[0], executemany))
+
+        sa.event.listen(
+            self.engine, 'before_cursor_execute', before_cursor_execute
+        )
+        try:
+            self.factory.create_batch(User, 50)
+        finally:
+            sa.event.remove(
+                self.engine, 'before_cursor_execute', before_cursor_execute
+            )
+        inserts = [item for item in statements if item[0].startswith('INSERT')]
+        assert inserts == [
+            ('INSERT INTO entity ', True),
+            ('INSERT INTO user ', True),
+        ]
+
+    def test_create_batch_after_orm_insert(self):
+        self.factory.create_batch(Address, 2)
+        self.session.add(Address(id=3, name=u'orm'))
+        self.session.flush()
+        rows = self.factory.create_batch(Address, 2)
+        assert [row['id'] for row in rows] == [4, 5]
+        assert self.session.query(Address).count() == 5
+
+    def test_required_parents_can_be_shared(self):
+        builder = RowBuilder(self.session.connection())
+        parents = {}
+        first = builder.row(User.__table__, parents=parents)
+        second = builder.row(User.__table__, parents=parents)
+        assert first['id'] == second['id']
+        assert self.session.query(Entity).count() == 1
+
+    def test_created_instances_are_valid(self):
+        self.factory.create_batch(User, 10)
+        self.session.commit()
+        for user in self.session.query(User):
+            assert len(user.email) <= 255
+            assert user.status in User.STATUSES or user.status is None
+
+
+class TestSampleValue(object):
+    def test_values_fit_column_length(self):
+        column = sa.Column('email', sa.Unicode(3))
+        assert sample_value(column, 123456) == u'456'
+
+    def test_enum(self):
+        assert sample_value(User.__table__.c.status, 1) == 'status1'
+
+    def test_type_decorator(self):
+        assert sample_value(Address.__table__.c.name, 1) == u'name-1'
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+from pytest import raises
+
+import sqlalchemy_test
+from benchmarks.import_time import time_import
+from sqlalchemy_test import generator
+
+
+class TestLazyImports(object):
+    def test_package_does_not_import_generator_or_orm(self):
+        duration, modules = time_import('import sqlalchemy_test')
+        assert modules == []
+
+    def test_generator_is_imported_on_first_use(self):
+        duration, modules = time_import(
+            'from sqlalchemy_test import TestCaseGenerator'
+        )
+        assert 'sqlalchemy_test.generator' in modules
+        assert 'inflection' in modules
+
+    def test_generator_names_are_reexported(self):
+        assert sqlalchemy_test.TestCaseGenerator is generator.TestCaseGenerator
+        assert sqlalchemy_test.generate_test_cases is (
+            generator.generate_test_cases
+        )
+
+    def test_unknown_attribute(self):
+        with raises(AttributeError):
+            sqlalchemy_test.GenerateTestCase
+
+    def test_generator_names_are_imported_eagerly_before_python_37(self):
+        output = subprocess.check_output([sys.executable, '-c', (
+            'import sys, sqlalchemy, inflection\n'
+            'sys.version_info = (3, 6, 0, "final", 0)\n'
+            'import sqlalchemy_test\n'
+            'print("TestCaseGenerator" in vars(sqlalchemy_test))'
+        )])
+        assert output.strip() == b'True'
@@ -0,0 +1,109 @@
+import sqlalchemy as sa
+from pytest import raises
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test import TestCaseGenerator as Generator
+from sqlalchemy_test.indexes import (
+    assert_index_coverage,
+    covered_columns,
+    find_unindexed_columns,
+    is_covered
+)
+from tests import Base, User
+
+
+IndexedBase = declarative_base()
+
+
+class Tag(IndexedBase):
+    __tablename__ = 'tag'
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.Unicode(50), unique=True)
+
+
+class Tagging(IndexedBase):
+    __tablename__ = 'tagging'
+    __table_args__ = (
+        sa.Index('ix_tagging_tag_id_kind', 'tag_id', 'kind'),
+    )
+    id = sa.Column(sa.Integer, primary_key=True)
+    tag_id = sa.Column(sa.Integer, sa.ForeignKey(Tag.id))
+    kind = sa.Column(sa.Unicode(50), info={'filtered': True})
+
+
+CompositeBase = declarative_base()
+
+
+class Parent(CompositeBase):
+    __tablename__ = 'parent'
+    a = sa.Column(sa.Integer, primary_key=True)
+    b = sa.Column(sa.Integer, primary_key=True)
+
+
+class Child(CompositeBase):
+    __tablename__ = 'child'
+    __table_args__ = (
+        sa.ForeignKeyConstraint(['pa', 'pb'], ['parent.a', 'parent.b']),
+        sa.ForeignKeyConstraint(['qa', 'qb'], ['parent.a', 'parent.b']),
+        sa.Index('ix_child_pa_pb', 'pa', 'pb'),
+        sa.Index('ix_child_qa_id', 'qa', 'id'),
+    )
+    id = sa.Column(sa.Integer, primary_key=True)
+    pa = sa.Column(sa.Integer)
+    pb = sa.Column(sa.Integer)
+    qa = sa.Column(sa.Integer)
+    qb = sa.Column(sa.Integer)
+
+
+class TestIndexCoverage(object):
+    def test_covered_columns(self):
+        assert covered_columns(Tag.__table__) == set(['id', 'name'])
+        assert covered_columns(Tagging.__table__) == set(['id', 'tag_id'])
+
+    def test_is_covered(self):
+        table = Child.__table__
+        assert is_covered(table, ['pa', 'pb'])
+        assert is_covered(table, ['pb', 'pa'])
+        assert is_covered(table, ['qa'])
+        assert not is_covered(table, ['pb'])
+        assert not is_covered(table, ['qa', 'qb'])
+
+    def test_composite_foreign_keys(self):
+        assert find_unindexed_columns(CompositeBase) == [
+            "'child.qa': foreign key to 'parent.a' is not indexed",
+            "'child.qb': foreign key to 'parent.b' is not indexed",
+        ]
+
+    def test_unindexed_foreign_key(self):
+        assert find_unindexed_columns(Base) == [
+            "'user.address_id': foreign key to 'address.id' is not indexed"
+        ]
+
+    def test_filtered_columns(self):
+        assert find_unindexed_columns(
+            Base, filtered=['user.status', 'user.age']
+        ) == [
+            "'user.address_id': foreign key to 'address.id' is not indexed",
+            "'user.status': filtered column is not indexed",
+        ]
+
+    def test_declared_filtered_column_not_leading_composite_index(self):
+        assert find_unindexed_columns(IndexedBase) == [
+            "'tagging.kind': filtered column is not indexed"
+        ]
+
+    def test_unknown_filtered_column(self):
+        with raises(ValueError):
+            find_unindexed_columns(Base, filtered=['user.nickname'])
+
+    def test_assert_index_coverage(self):
+        with raises(AssertionError) as excinfo:
+            assert_index_coverage(Base)
+        assert "'user.address_id'" in str(excinfo.value)
+        with raises(AssertionError):
+            assert_index_coverage(IndexedBase)
+
+    def test_generator_emits_index_tests(self):
+        source = '\n'.join(Generator(User, compact=False).render())
+        assert "    def test_age_is_indexed(self):" in source
+        assert "        self.assert_index('age')" in source
@@ -0,0 +1,106 @@
+import sqlalchemy as sa
+from pytest import raises
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test import (
+    introspect,
+    ModelTestCase,
+    TestCaseGenerator as Generator
+)
+
+
+Base = declarative_base()
+
+
+class Node(Base):
+    __tablename__ = 'node'
+    id = sa.Column(sa.BigInteger, primary_key=True)
+    kind = sa.Column(sa.Unicode(20))
+    title = sa.Column(sa.Unicode(255))
+    __mapper_args__ = {'polymorphic_on': kind}
+
+
+class Document(Node):
+    __tablename__ = 'document'
+    id = sa.Column(sa.BigInteger, sa.ForeignKey(Node.id), primary_key=True)
+    __mapper_args__ = {'polymorphic_identity': 'document'}
+
+
+class Report(Document):
+    __tablename__ = 'report'
+    id = sa.Column(
+        sa.BigInteger, sa.ForeignKey(Document.id), primary_key=True
+    )
+    report_title = sa.Column('title', sa.Unicode(50), nullable=False)
+    __mapper_args__ = {'polymorphic_identity': 'report'}
+
+
+class TestInheritanceAwareColumns(object):
+    def test_unqualified_names_refer_to_most_specific_table(self):
+        introspection = introspect(Report)
+        assert introspection.column('id') is Report.__table__.c.id
+        assert introspection.column('title') is Report.__table__.c.title
+        assert introspection.column('kind') is Node.__table__.c.kind
+
+    def test_qualified_names(self):
+        introspection = introspect(Report)
+        assert introspection.column('node.id') is Node.__table__.c.id
+        assert introspection.column('id', table='document') is (
+            Document.__table__.c.id
+        )
+        assert introspection.column('title', table=Node.__table__) is (
+            Node.__table__.c.title
+        )
+        assert not introspection.has_column('report.kind')
+
+    def test_shadowed_columns(self):
+        assert sorted(introspect(Report).shadowed_columns) == [
+            'document.id', 'node.id', 'node.title'
+        ]
+        assert introspect(Node).shadowed_columns == {}
+
+    def test_description_includes_shadowed_columns(self):
+        columns = introspect(Report).describe()['columns']
+        assert columns['title']['length'] == 50
+        assert columns['node.title']['length'] == 255
+
+
+class TestReport(ModelTestCase):
+    model = Report
+
+    def test_assertions_target_table(self):
+        self.assert_has('node.title')
+        self.assert_length('title', 50)
+        self.assert_length('node.title', 255)
+        self.assert_not_nullable('title')
+        self.assert_nullable('node.title')
+        self.assert_foreign_key('document.id', sa.ForeignKey('node.id'))
+
+    def test_assert_has_lists_qualified_names(self):
+        with raises(AssertionError) as excinfo:
+            self.assert_has('report.kind')
+        assert "'node.title'" in str(excinfo.value)
+
+    def test_assert_columns(self):
+        self.assert_columns({
+            'title': {'length': 50},
+            'node.title': {'length': 255, 'nullable': True},
+        })
+        with raises(AssertionError) as excinfo:
+            self.assert_columns({'node.title': {'length': 50}})
+        assert "'node.title': length is 255, expected 50" in str(
+            excinfo.value
+        )
+
+    def test_generated_test_case_passes(self):
+        for compact in (False, True):
+            source = '\n'.join(Generator(Report, compact=compact).render())
+            namespace = {}
+            exec(compile(source, 'test_report.py', 'exec'), namespace)
+            test_case = namespace['TestReport']()
+            for name in dir(test_case):
+                if name.startswith('test_'):
+                    getattr(test_case, name)()
+        assert "self.assert_length('node.title', 255)" in '\n'.join(
+            Generator(Report, compact=False).render()
+        )
@@ -0,0 +1,152 @@
+import textwrap
+
+import sqlalchemy as sa
+from pytest import fixture, importorskip, raises
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from sqlalchemy_test.migrations import (
+    AlembicMigrations,
+    assert_migrations_match,
+    diff_migrations,
+    dispose_migrated_engines,
+    migrated_engine,
+    SQLScripts
+)
+from sqlalchemy_test.reflection import reflect
+from tests import Base
+
+
+def write_migrations(directory):
+    dialect = sqlite.dialect()
+    for number, table in enumerate(Base.metadata.sorted_tables, 1):
+        statements = [CreateTable(table)]
+        statements.extend(CreateIndex(index) for index in table.indexes)
+        directory.join('%03d_%s.sql' % (number, table.name)).write(
+            ';\n'.join(
+                str(statement.compile(dialect=dialect)).strip()
+                for statement in statements
+            ) + ';\n'
+        )
+
+
+@fixture
+def migrations(tmpdir):
+    write_migrations(tmpdir)
+    return SQLScripts(str(tmpdir))
+
+
+class TestMigrationDrift(object):
+    def test_migrations_match_models(self, migrations):
+        assert diff_migrations(Base, migrations) == {}
+        assert_migrations_match(Base, migrations)
+
+    def test_database_is_migrated_and_reflected_once(self, migrations):
+        engine = migrated_engine(migrations)
+        assert migrated_engine(SQLScripts(migrations.directory)) is engine
+        diff_migrations(Base, migrations)
+        assert reflect(engine) is reflect(engine)
+
+    def test_drift(self, tmpdir):
+        write_migrations(tmpdir)
+        tmpdir.join('004_drift.sql').write(
+            'DROP INDEX ix_user_age;\n'
+            'CREATE TABLE audit_log (id INTEGER PRIMARY KEY);\n'
+            'CREATE TABLE alembic_version (version_num VARCHAR(32));\n'
+        )
+        migrations = SQLScripts(str(tmpdir))
+        assert diff_migrations(Base, migrations) == {
+            'User': ["'age': index does not exist"],
+            'unmapped tables': ["'audit_log': table is not mapped"],
+        }
+        with raises(AssertionError) as excinfo:
+            assert_migrations_match(Base, migrations)
+        assert str(excinfo.value) == (
+            'Models do not match the migrated database:\n'
+            'User:\n'
+            "  'age': index does not exist\n"
+            'unmapped tables:\n'
+            "  'audit_log': table is not mapped"
+        )
+
+    def test_supplied_url(self, tmpdir):
+        write_migrations(tmpdir)
+        url = 'sqlite:///%s' % tmpdir.join('migrated.db')
+        assert diff_migrations(Base, SQLScripts(str(tmpdir)), url) == {}
+        assert sa.inspect(
+            migrated_engine(SQLScripts(str(tmpdir)), url)
+        ).get_table_names() == ['address', 'entity', 'user']
+
+    def test_supplied_url_is_emptied_before_migrating(self, tmpdir):
+        write_migrations(tmpdir)
+        url = 'sqlite:///%s' % tmpdir.join('migrated.db')
+        migrated_engine(SQLScripts(str(tmpdir)), url)
+        dispose_migrated_engines()
+        engine = migrated_engine(SQLScripts(str(tmpdir)), url)
+        assert sa.inspect(engine).get_table_names() == [
+            'address', 'entity', 'user'
+        ]
+
+    def test_edited_scripts_migrate_again(self, migrations, tmpdir):
+        engine = migrated_engine(migrations)
+        tmpdir.join('004_audit.sql').write(
+            'CREATE TABLE audit_log (id INTEGER PRIMARY KEY);\n'
+        )
+        edited = migrated_engine(SQLScripts(str(tmpdir)))
+        assert edited is not engine
+        assert 'audit_log' in sa.inspect(edited).get_table_names()
+
+
+ALEMBIC_ENV = """
+from alembic import context
+
+context.configure(connection=context.config.attributes['connection'])
+with context.begin_transaction():
+    context.run_migrations()
+"""
+
+ALEMBIC_REVISION = """
+from alembic import op
+
+from tests import Base
+
+revision = '001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    Base.metadata.create_all(op.get_bind())
+"""
+
+
+class TestAlembicMigrations(object):
+    @fixture
+    def config_file(self, tmpdir):
+        importorskip('alembic')
+        tmpdir.join('env.py').write(ALEMBIC_ENV)
+        tmpdir.mkdir('versions').join('001_models.py').write(
+            ALEMBIC_REVISION
+        )
+        config_file = tmpdir.join('alembic.ini')
+        config_file.write(textwrap.dedent("""
+            [alembic]
+            script_location = %s
+        """ % tmpdir))
+        return str(config_file)
+
+    def test_runners_compare_by_config_and_revision(self):
+        assert AlembicMigrations('alembic.ini') == AlembicMigrations(
+            'alembic.ini', 'head'
+        )
+        assert AlembicMigrations('alembic.ini') != AlembicMigrations(
+            'alembic.ini', '001'
+        )
+
+    def test_migrations_match_models(self, config_file):
+        migrations = AlembicMigrations(config_file)
+        assert_migrations_match(Base, migrations)
+        assert 'alembic_version' in sa.inspect(
+            migrated_engine(migrations)
+        ).get_table_names()
@@ -1,7 +1,24 @@
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
 from pytest import raises
 import sqlalchemy as sa
-from sqlalchemy_test import ModelTestCase, generate_test_case
-from tests import Address, Entity, User
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy_test import (
+    ModelTestCase,
+    clear_introspection_cache,
+    generate_test_case,
+    generate_test_cases,
+    introspect,
+    mapped_classes,
+    mapped_tables,
+    read_fingerprint,
+    write_test_case
+)
+from sqlalchemy_test import generator
+from sqlalchemy_test import TestCaseGenerator as Generator
+from tests import Address, Base, Entity, User
 
 
 class TestEntity(ModelTestCase):
@@ -77,8 +94,331 @@ class TestUser(TestEntity):
                 'age', sa.schema.CheckConstraint('age < 13')
             )
 
+    def test_assert_check_constraint_as_string(self):
+        self.assert_check_constraint('age', 'AGE  >  13')
+
+    def test_assert_columns_check_constraints_as_strings(self):
+        self.assert_columns({'age': {'check_constraints': ['age > 13']}})
+        with raises(AssertionError) as excinfo:
+            self.assert_columns({'age': {'check_constraints': ['age > 0']}})
+        assert str(excinfo.value) == (
+            "Model 'User' does not match the spec:\n"
+            "  'age': missing check constraints ['age > 0']"
+        )
+
+    def test_assert_columns(self):
+        self.assert_columns({
+            'email': {
+                'type': sa.Unicode,
+                'length': 255,
+                'nullable': False,
+                'unique': True,
+                'index': False,
+                'default': None,
+                'server_default': None,
+            },
+            'age': {
+                'type': sa.Integer,
+                'nullable': True,
+                'index': True,
+                'check_constraints': [sa.schema.CheckConstraint('age > 13')],
+            },
+            'is_active': {'default': False, 'server_default': 'FALSE'},
+            'is_confirmed': {'server_default': sa.sql.expression.false()},
+            'address_id': {
+                'foreign_keys': [
+                    sa.ForeignKey(
+                        Address.id,
+                        deferrable=True,
+                        ondelete='CASCADE',
+                        onupdate='CASCADE'
+                    )
+                ]
+            },
+            'id': {'primary_key': True},
+        })
+
+    def test_assert_columns_reports_every_mismatch(self):
+        with raises(AssertionError) as excinfo:
+            self.assert_columns({
+                'email': {'length': 100, 'nullable': True},
+                'age': {'unique': True},
+                'unknown_column': {'type': sa.Integer},
+            })
+        message = str(excinfo.value)
+        assert "'email': length is 255, expected 100" in message
+        assert "'email': nullable is False, expected True" in message
+        assert "'age': unique is False, expected True" in message
+        assert "'unknown_column': column does not exist" in message
+
+    def test_assert_columns_with_unknown_property(self):
+        with raises(ValueError):
+            self.assert_columns({'email': {'colour': 'blue'}})
+
+    def test_assert_schema(self):
+        self.assert_schema({
+            'table_name': 'user',
+            'columns': {'email': {'type': sa.Unicode, 'length': 255}}
+        })
+        with raises(AssertionError):
+            self.assert_schema({'table_name': 'users'})
+
+
+ExpressionBase = declarative_base()
+
+
+class Measurement(ExpressionBase):
+    __tablename__ = 'measurement'
+    id = sa.Column(sa.Integer, primary_key=True)
+    a = sa.Column(sa.Integer, index=True)
+    double_a = sa.orm.column_property(a * 2)
+
+
+class Sample(ExpressionBase):
+    __tablename__ = 'sample'
+    id = sa.Column(sa.Integer, primary_key=True)
+    measurement_id = sa.Column(sa.Integer, sa.ForeignKey(Measurement.id))
+
+
+Measurement.sample_count = sa.orm.column_property(
+    sa.select([sa.func.count(Sample.id)]).where(
+        Sample.measurement_id == Measurement.id
+    ).correlate_except(Sample).as_scalar()
+)
+
+
+class TestColumnProperties(ModelTestCase):
+    model = Measurement
+
+    def test_expressions_are_not_columns(self):
+        self.assert_has('a')
+        self.assert_index('a')
+        assert sorted(self.columns) == ['a', 'id']
+        assert not self.introspection.has_column('double_a')
+
+    def test_describe(self):
+        assert sorted(self.introspection.describe()['columns']) == [
+            'a', 'id'
+        ]
+        source = '\n'.join(Generator(Measurement).render())
+        assert 'double_a' not in source
+
+
+DefaultsBase = declarative_base()
+
+
+class Note(DefaultsBase):
+    __tablename__ = 'note'
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.Unicode(50), default=u"it's", server_default="it's")
+    priority = sa.Column(sa.Integer, default=3)
+    created_at = sa.Column(sa.DateTime, default=sa.func.now())
+
 
 class TestTestCaseGeneration(object):
-    def test_something(self):
-        generate_test_case(User, 'tests/')
-        generate_test_case(Address, 'tests/')
+    def test_something(self, tmpdir):
+        generate_test_case(User, str(tmpdir) + '/')
+        generate_test_case(Address, str(tmpdir) + '/')
+
+    def test_large_models_default_to_compact_form(self):
+        class SmallThresholdGenerator(Generator):
+            compact_threshold = 5
+
+        assert not Generator(User).compact
+        assert SmallThresholdGenerator(User).compact
+        assert not SmallThresholdGenerator(User, compact=False).compact
+
+    def test_compact_test_case_passes(self, tmpdir):
+        generate_test_case(User, str(tmpdir) + '/', compact=True)
+        source = tmpdir.join('test_user.py').read()
+        assert source.count('def test_') == 1
+        namespace = {}
+        exec(compile(source, 'test_user.py', 'exec'), namespace)
+        namespace['TestUser']().test_schema()
+
+    def test_defaults_render_as_literals(self, tmpdir):
+        for compact in (True, False):
+            generate_test_case(
+                Note, str(tmpdir) + '/', compact=compact, force=True
+            )
+            source = tmpdir.join('test_note.py').read()
+            assert "now()" not in source
+            namespace = {}
+            exec(compile(source, 'test_note.py', 'exec'), namespace)
+            test_case = namespace['TestNote']()
+            for name in dir(test_case):
+                if name.startswith('test_'):
+                    getattr(test_case, name)()
+
+
+class TestIntrospectionCache(object):
+    def test_introspection_is_built_once_per_model(self):
+        assert introspect(User) is introspect(User)
+        assert introspect(User) is not introspect(Address)
+
+    def test_model_test_case_uses_cached_columns(self):
+        case = TestUser()
+        assert case.columns is introspect(User).columns
+        assert case.foreign_keys is introspect(User).foreign_keys
+
+    def test_indexes_and_defaults(self):
+        introspection = introspect(User)
+        assert introspection.indexes['age']
+        assert not introspection.indexes['email']
+        assert introspection.defaults['is_active'].arg is False
+        assert introspection.server_defaults['is_active'].arg == 'FALSE'
+
+    def test_clear_cache_for_model_clears_subclasses(self):
+        user_introspection = introspect(User)
+        address_introspection = introspect(Address)
+        clear_introspection_cache(Entity)
+        assert introspect(User) is not user_introspection
+        assert introspect(Address) is address_introspection
+
+    def test_backref_of_new_mapper_invalidates_cache(self):
+        ReconfiguredBase = declarative_base()
+
+        class Mailbox(ReconfiguredBase):
+            __tablename__ = 'mailbox'
+            id = sa.Column(sa.Integer, primary_key=True)
+
+        assert 'letters' not in introspect(Mailbox).relationships
+
+        class Letter(ReconfiguredBase):
+            __tablename__ = 'letter'
+            id = sa.Column(sa.Integer, primary_key=True)
+            mailbox_id = sa.Column(sa.Integer, sa.ForeignKey(Mailbox.id))
+            mailbox = sa.orm.relationship(Mailbox, backref='letters')
+
+        sa.orm.configure_mappers()
+        assert 'letters' in introspect(Mailbox).relationships
+
+    def test_added_column_invalidates_cache(self):
+        ReconfiguredBase = declarative_base()
+
+        class Mailbox(ReconfiguredBase):
+            __tablename__ = 'mailbox'
+            id = sa.Column(sa.Integer, primary_key=True)
+
+        assert not introspect(Mailbox).has_column('size')
+        Mailbox.size = sa.Column(sa.Integer)
+        assert introspect(Mailbox).has_column('size')
+
+
+class TestWholeMetadataGeneration(object):
+    def test_mapped_classes(self):
+        assert mapped_classes(Base) == [Address, Entity, User]
+        assert mapped_classes(Base.metadata) == [Address, Entity, User]
+
+    def test_mapped_tables(self):
+        assert [table.name for table in mapped_tables(Base)] == [
+            'address', 'entity', 'user'
+        ]
+
+    def test_mapped_classes_of_classical_mapping(self):
+        metadata = sa.MetaData()
+        table = sa.Table(
+            'plain', metadata, sa.Column('id', sa.Integer, primary_key=True)
+        )
+
+        class Plain(object):
+            pass
+
+        class UnmappedPlain(Plain):
+            pass
+
+        sa.orm.mapper(Plain, table)
+        assert mapped_classes(metadata) == [Plain]
+
+    def test_generate_test_cases_in_parallel(self, tmpdir):
+        path = str(tmpdir) + '/'
+        filenames = generate_test_cases(Base, path, workers=2)
+        assert sorted(filenames) == [
+            path + 'test_address.py',
+            path + 'test_entity.py',
+            path + 'test_user.py',
+        ]
+        assert sorted(tmpdir.listdir()) == sorted(
+            tmpdir.join(name) for name in (
+                'test_address.py', 'test_entity.py', 'test_user.py'
+            )
+        )
+
+    def test_parallel_and_serial_output_match(self, tmpdir):
+        parallel = tmpdir.mkdir('parallel')
+        serial = tmpdir.mkdir('serial')
+        generate_test_cases(Base, str(parallel) + '/', workers=2)
+        generate_test_cases(Base, str(serial) + '/', workers=1)
+        for name in ('test_address.py', 'test_entity.py', 'test_user.py'):
+            assert (
+                parallel.join(name).read() == serial.join(name).read()
+            )
+
+
+class TestIncrementalGeneration(object):
+    def test_unchanged_model_is_not_rewritten(self, tmpdir):
+        path = str(tmpdir) + '/'
+        assert generate_test_case(User, path)
+        filename = tmpdir.join('test_user.py')
+        filename.write('# sqlalchemy-test schema fingerprint: stale\n')
+        assert generate_test_case(User, path)
+        content = filename.read()
+        assert not generate_test_case(User, path)
+        assert filename.read() == content
+
+    def test_fingerprint_is_stored_in_header(self, tmpdir):
+        generate_test_case(User, str(tmpdir) + '/')
+        assert read_fingerprint(str(tmpdir.join('test_user.py'))) == (
+            Generator(User).fingerprint
+        )
+
+    def test_generation_mode_changes_fingerprint(self):
+        assert (
+            Generator(User, compact=True).fingerprint !=
+            Generator(User, compact=False).fingerprint
+        )
+
+    def test_generator_version_changes_fingerprint(self, monkeypatch):
+        fingerprint = Generator(User).fingerprint
+        monkeypatch.setattr(
+            generator, 'GENERATOR_VERSION', generator.GENERATOR_VERSION + 1
+        )
+        assert Generator(User).fingerprint != fingerprint
+
+    def test_import_path_changes_fingerprint(self, monkeypatch):
+        fingerprint = Generator(User).fingerprint
+        monkeypatch.setattr(User, '__module__', 'models')
+        assert Generator(User).fingerprint != fingerprint
+
+    def test_force_rewrites_unchanged_model(self, tmpdir):
+        path = str(tmpdir) + '/'
+        generate_test_case(User, path)
+        assert generate_test_case(User, path, force=True)
+
+    def test_generate_test_cases_skips_unchanged_models(self, tmpdir):
+        path = str(tmpdir) + '/'
+        assert len(generate_test_cases(Base, path, workers=1)) == 3
+        tmpdir.join('test_address.py').write('')
+        assert generate_test_cases(Base, path, workers=1) == [
+            path + 'test_address.py'
+        ]
+
+
+class TestStreamingGeneration(object):
+    def test_render_is_lazy(self):
+        lines = Generator(User).render()
+        assert next(lines).startswith('# sqlalchemy-test schema fingerprint')
+
+    def test_render_matches_process_columns(self):
+        generator = Generator(User)
+        rendered = list(generator.render())
+        generator.process_columns()
+        assert rendered == (
+            generator.header + generator.imports + generator.lines
+        )
+
+    def test_write_test_case_to_file_like_object(self, tmpdir):
+        buffer = StringIO()
+        write_test_case(Generator(Address), buffer)
+        generate_test_case(Address, str(tmpdir) + '/')
+        assert buffer.getvalue() == tmpdir.join('test_address.py').read()
@@ -0,0 +1,130 @@
+import json
+
+import sqlalchemy as sa
+from pytest import raises
+
+from sqlalchemy_test import ModelTestCase
+from sqlalchemy_test.database import DatabaseTestCase
+from sqlalchemy_test.plans import (
+    explain,
+    MySQLPlanParser,
+    PlanStep,
+    PostgreSQLPlanParser,
+    SQLitePlanParser
+)
+from tests import User
+
+
+class TestPlanParsers(object):
+    def test_sqlite(self):
+        assert SQLitePlanParser().parse([
+            {'detail': 'SEARCH user USING INDEX ix_user_age (age=?)'},
+            {'detail': 'SCAN TABLE entity'},
+            {'detail': 'SEARCH entity USING INTEGER PRIMARY KEY (rowid=?)'},
+            {'detail': 'SCAN user USING COVERING INDEX ix_user_age'},
+            {'detail': 'USE TEMP B-TREE FOR ORDER BY'},
+        ]) == [
+            PlanStep(
+                'user', 'ix_user_age', False,
+                'SEARCH user USING INDEX ix_user_age (age=?)'
+            ),
+            PlanStep('entity', None, True, 'SCAN TABLE entity'),
+            PlanStep(
+                'entity', 'INTEGER PRIMARY KEY', False,
+                'SEARCH entity USING INTEGER PRIMARY KEY (rowid=?)'
+            ),
+            PlanStep(
+                'user', 'ix_user_age', True,
+                'SCAN user USING COVERING INDEX ix_user_age'
+            ),
+        ]
+
+    def test_postgresql(self):
+        plan = [{'Plan': {
+            'Node Type': 'Nested Loop',
+            'Plans': [
+                {
+                    'Node Type': 'Index Scan',
+                    'Relation Name': 'user',
+                    'Index Name': 'ix_user_age',
+                },
+                {'Node Type': 'Seq Scan', 'Relation Name': 'entity'},
+            ],
+        }}]
+        for value in (plan, json.dumps(plan)):
+            assert PostgreSQLPlanParser().parse([{'QUERY PLAN': value}]) == [
+                PlanStep('user', 'ix_user_age', False, 'Index Scan'),
+                PlanStep('entity', None, True, 'Seq Scan'),
+            ]
+
+    def test_mysql(self):
+        assert MySQLPlanParser().parse([
+            {'table': 'user', 'type': 'ref', 'key': 'ix_user_age'},
+            {'table': 'entity', 'type': 'ALL', 'key': None},
+            {'table': 'user', 'type': 'index', 'key': 'ix_user_age'},
+            {'table': None, 'type': None, 'key': None},
+        ]) == [
+            PlanStep('user', 'ix_user_age', False, 'type=ref key=ix_user_age'),
+            PlanStep('entity', None, True, 'type=ALL key=None'),
+            PlanStep(
+                'user', 'ix_user_age', True, 'type=index key=ix_user_age'
+            ),
+        ]
+
+
+class TestQueryPlanAssertions(ModelTestCase, DatabaseTestCase):
+    model = User
+
+    def test_explain_core_select(self):
+        steps = explain(
+            sa.select([User.__table__]).where(User.age == 20), self.engine
+        )
+        assert steps[0].index == 'ix_user_age'
+
+    def test_custom_parser(self):
+        class Parser(SQLitePlanParser):
+            def parse(self, rows):
+                return [row['detail'] for row in rows]
+
+        steps = explain(
+            self.session.query(User.age).filter(User.age == 20),
+            self.engine,
+            parser=Parser()
+        )
+        assert 'ix_user_age' in steps[0]
+
+    def test_unknown_dialect(self):
+        class Bind(object):
+            class dialect(object):
+                name = 'unknown'
+
+        with raises(ValueError):
+            explain(self.session.query(User), Bind())
+
+    def test_assert_uses_index(self):
+        self.assert_uses_index(
+            self.session.query(User).filter(User.age > 20), 'ix_user_age'
+        )
+        with raises(AssertionError) as excinfo:
+            self.assert_uses_index(
+                self.session.query(User).filter(User.status == 'status1'),
+                'ix_user_age'
+            )
+        assert 'SCAN user' in str(excinfo.value)
+
+    def test_assert_no_full_scan(self):
+        self.assert_no_full_scan(
+            self.session.query(User).filter(User.email == u'a@example.com')
+        )
+        with raises(AssertionError) as excinfo:
+            self.assert_no_full_scan(
+                self.session.query(User).filter(User.status == 'status1')
+            )
+        assert 'it scans user' in str(excinfo.value)
+
+    def test_index_scan_is_a_full_scan(self):
+        with raises(AssertionError) as excinfo:
+            self.assert_no_full_scan(
+                self.session.query(User.age).order_by(User.age)
+            )
+        assert 'SCAN user USING INDEX ix_user_age' in str(excinfo.value)
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from sqlalchemy_test.snapshot import dump_snapshot, load_snapshot
+from tests import Base
+
+pytest_plugins = 'pytester'
+
+
+@pytest.fixture
+def snapshot_dir(pytester):
+    pytester.makeini('''
+        [pytest]
+        sqlalchemy_base = tests:Base
+        sqlalchemy_snapshot = schema.json
+    ''')
+    dump_snapshot(Base, str(pytester.path / 'schema.json'))
+    return pytester
+
+
+class TestPlugin(object):
+    def test_collects_one_test_per_model(self, snapshot_dir):
+        result = snapshot_dir.runpytest('-p', 'sqlalchemy_test.pytest_plugin')
+        result.assert_outcomes(passed=4)
+
+    def test_reports_schema_differences(self, snapshot_dir):
+        filename = str(snapshot_dir.path / 'schema.json')
+        snapshot = load_snapshot(filename)
+        snapshot['User']['columns']['email']['nullable'] = True
+        del snapshot['Address']
+        with open(filename, 'w') as file_:
+            json.dump(snapshot, file_)
+
+        result = snapshot_dir.runpytest('-p', 'sqlalchemy_test.pytest_plugin')
+        result.assert_outcomes(passed=1, failed=2)
+        result.stdout.fnmatch_lines([
+            "*'email': nullable is False, expected True*",
+            '*Mapped models missing from the snapshot: Address*',
+        ])
+
+    def test_update_snapshot(self, snapshot_dir):
+        (snapshot_dir.path / 'schema.json').write_text(u'{}')
+        result = snapshot_dir.runpytest(
+            '-p', 'sqlalchemy_test.pytest_plugin',
+            '--sqlalchemy-update-snapshot'
+        )
+        result.assert_outcomes(passed=4)
+
+
+class TestSessionFixture(object):
+    def test_changes_are_rolled_back(self, pytester):
+        pytester.makeini('''
+            [pytest]
+            sqlalchemy_base = tests:Base
+        ''')
+        pytester.makepyfile('''
+            from tests import Address
+
+            def test_add(sqlalchemy_session):
+                sqlalchemy_session.add(Address(name=u'Street'))
+                sqlalchemy_session.commit()
+                assert sqlalchemy_session.query(Address).count() == 1
+
+            def test_empty(sqlalchemy_session):
+                assert sqlalchemy_session.query(Address).count() == 0
+        ''')
+        result = pytester.runpytest('-p', 'sqlalchemy_test.pytest_plugin')
+        result.assert_outcomes(passed=2)
@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+from sqlalchemy_test import (
+    clear_introspection_cache,
+    introspect,
+    ModelIntrospection,
+    ModelTestCase
+)
+from sqlalchemy_test.profiling import disable_profiling, enable_profiling
+from tests import Address, User
+
+pytest_plugins = 'pytester'
+
+
+class UserTestCase(ModelTestCase):
+    model = User
+
+    def assert_email(self):
+        self.assert_has('email')
+
+
+@pytest.fixture
+def profiler():
+    # Introspect before profiling, so only the tests that clear the cache
+    # time introspection.
+    introspect(User)
+    yield enable_profiling()
+    disable_profiling()
+
+
+class TestProfiler(object):
+    def test_times_assertions_by_model(self, profiler):
+        clear_introspection_cache(User)
+        UserTestCase().assert_email()
+        UserTestCase().assert_has('age')
+        UserTestCase().assert_schema({'columns': {'age': {'index': True}}})
+        calls = dict(
+            (key, calls) for key, (calls, total) in profiler.timings.items()
+        )
+        assert calls == {
+            ('User', 'assert_email'): 1,
+            ('User', 'assert_has'): 1,
+            ('User', 'assert_schema'): 1,
+            ('User', 'introspection'): 1,
+        }
+
+    def test_times_subclasses_defined_later(self, profiler):
+        class TestAddress(ModelTestCase):
+            model = Address
+
+            def assert_name(self):
+                self.assert_has('name')
+
+        TestAddress().assert_name()
+        assert ('Address', 'assert_name') in profiler.timings
+
+    def test_times_introspection(self, profiler):
+        clear_introspection_cache(Address)
+        UserTestCase().assert_has('email')
+        ModelTestCase.model = Address
+        try:
+            ModelTestCase().assert_has('name')
+        finally:
+            ModelTestCase.model = None
+        assert profiler.timings[('Address', 'introspection')][0] == 1
+
+    def test_context_manager_assertions_are_not_wrapped(self, profiler):
+        assert 'assert_max_queries' not in [
+            name for (model, name) in profiler.timings
+        ]
+        assert ModelTestCase.assert_max_queries.__name__ == (
+            'assert_max_queries'
+        )
+        assert not hasattr(
+            ModelTestCase.assert_max_queries, '__self__'
+        )
+
+    def test_report_and_json(self, profiler, tmpdir):
+        UserTestCase().assert_has('email')
+        UserTestCase().assert_has('age')
+        lines = profiler.report(top=1)
+        assert lines[0].split() == ['total', 'calls', 'model', 'operation']
+        assert lines[1].split()[-3:] == ['2', 'User', 'assert_has']
+
+        filename = str(tmpdir.join('profile.json'))
+        profiler.dump(filename)
+        with open(filename) as file_:
+            profile = json.load(file_)
+        assert profile['operations'][0]['operation'] == 'assert_has'
+        assert profile['models'][0] == {
+            'model': 'User', 'calls': 2,
+            'total': profile['models'][0]['total']
+        }
+
+    def test_disable_restores_methods(self):
+        original = ModelTestCase.__dict__['assert_has']
+        original_init = ModelIntrospection.__init__
+        enable_profiling()
+        assert ModelTestCase.__dict__['assert_has'] is not original
+        disable_profiling()
+        assert ModelTestCase.__dict__['assert_has'] is original
+        assert UserTestCase.__dict__['assert_email'].__name__ == (
+            'assert_email'
+        )
+        assert ModelIntrospection.__init__ is original_init
+        assert '__init_subclass__' not in ModelTestCase.__dict__
+
+
+class TestProfilingPlugin(object):
+    @pytest.fixture
+    def test_module(self, pytester):
+        pytester.makepyfile('''
+            from sqlalchemy_test import ModelTestCase
+            from tests import User
+
+            class TestUser(ModelTestCase):
+                model = User
+
+                def test_email(self):
+                    self.assert_has('email')
+        ''')
+        return pytester
+
+    def test_report(self, test_module):
+        result = test_module.runpytest(
+            '-p', 'sqlalchemy_test.pytest_plugin', '--sqlalchemy-profile'
+        )
+        result.assert_outcomes(passed=2)
+        result.stdout.fnmatch_lines([
+            '*sqlalchemy-test profile*',
+            '*1  User assert_has',
+        ])
+
+    def test_json_from_environment(self, test_module, monkeypatch):
+        filename = str(test_module.path / 'profile.json')
+        monkeypatch.setenv('SQLALCHEMY_TEST_PROFILE_JSON', filename)
+        result = test_module.runpytest('-p', 'sqlalchemy_test.pytest_plugin')
+        result.assert_outcomes(passed=2)
+        with open(filename) as file_:
+            entries = json.load(file_)['entries']
+        calls = dict(
+            ((entry['model'], entry['operation']), entry['calls'])
+            for entry in entries
+        )
+        assert calls[('User', 'assert_has')] == 1
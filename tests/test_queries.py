@@ -0,0 +1,54 @@
+from pytest import raises
+
+from sqlalchemy_test import ModelTestCase
+from sqlalchemy_test.database import DatabaseTestCase
+from sqlalchemy_test.factory import ModelFactory
+from sqlalchemy_test.queries import QueryRecorder
+from tests import Address, User
+
+
+class TestQueryAssertions(ModelTestCase, DatabaseTestCase):
+    model = User
+
+    def test_query_recorder(self):
+        with QueryRecorder(self.engine) as recorder:
+            self.session.query(User).all()
+            self.session.query(Address).all()
+        assert len(recorder.queries) == 2
+        assert recorder.queries[0].statement.startswith('SELECT')
+        assert recorder.duration >= 0
+        assert recorder.format().startswith('1. [')
+
+    def test_recorder_stops_recording_on_exit(self):
+        with QueryRecorder(self.engine) as recorder:
+            pass
+        self.session.query(User).all()
+        assert recorder.queries == []
+
+    def test_assert_max_queries(self):
+        with self.assert_max_queries(1):
+            self.session.query(User).all()
+
+    def test_assert_max_queries_reports_statements(self):
+        factory = ModelFactory(self.session)
+        for address in factory.create_batch(Address, 3):
+            factory.create_batch(User, 1, address_id=address['id'])
+        with raises(AssertionError) as excinfo:
+            with self.assert_max_queries(1):
+                for user in self.session.query(User):
+                    user.address
+        message = str(excinfo.value)
+        assert 'Expected at most 1 queries, 4 were executed' in message
+        assert 'WHERE address.id = ?' in message
+
+    def test_assert_sql_time_under(self):
+        with self.assert_sql_time_under(10000):
+            self.session.query(User).all()
+        with raises(AssertionError):
+            with self.assert_sql_time_under(0):
+                self.session.query(User).all()
+
+    def test_engine_is_required(self):
+        with raises(ValueError):
+            with ModelTestCase().assert_max_queries(1):
+                pass
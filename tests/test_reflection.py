@@ -0,0 +1,118 @@
+import sqlalchemy as sa
+from pytest import fixture, raises
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test.reflection import (
+    DatabaseModelTestCase,
+    clear_reflection_cache,
+    compare_with_database,
+    reflect
+)
+from tests import Address, Base, User
+
+
+engine = sa.create_engine('sqlite://')
+Base.metadata.create_all(engine)
+
+
+CompositeBase = declarative_base()
+
+
+class Plot(CompositeBase):
+    __tablename__ = 'plot'
+    x = sa.Column(sa.Integer, primary_key=True)
+    y = sa.Column(sa.Integer, primary_key=True)
+
+
+class Tree(CompositeBase):
+    __tablename__ = 'tree'
+    __table_args__ = (
+        sa.ForeignKeyConstraint(['a', 'b'], ['plot.x', 'plot.y']),
+    )
+    id = sa.Column(sa.Integer, primary_key=True)
+    a = sa.Column(sa.Integer)
+    b = sa.Column(sa.Integer)
+
+
+class TestUserMatchesDatabase(DatabaseModelTestCase):
+    model = User
+    engine = engine
+
+
+class TestAddressMatchesDatabase(DatabaseModelTestCase):
+    model = Address
+    engine = engine
+
+
+@fixture
+def drifted_engine():
+    drifted_engine = sa.create_engine('sqlite://')
+    with drifted_engine.begin() as connection:
+        connection.execute(
+            sa.text('CREATE TABLE address (id INTEGER PRIMARY KEY)')
+        )
+        connection.execute(
+            sa.text('CREATE TABLE entity (id BIGINT PRIMARY KEY)')
+        )
+        connection.execute(sa.text(
+            'CREATE TABLE user ('
+            'id BIGINT NOT NULL PRIMARY KEY REFERENCES entity (id), '
+            'email VARCHAR(100), '
+            'address_id INTEGER REFERENCES address (id), '
+            'age INTEGER'
+            ')'
+        ))
+    return drifted_engine
+
+
+class TestReflection(object):
+    def test_reflection_is_cached_per_engine(self):
+        assert reflect(engine) is reflect(engine)
+        clear_reflection_cache()
+        reflection = reflect(engine)
+        assert reflection is not None
+        assert reflect(engine) is reflection
+
+    def test_reflects_all_tables(self):
+        assert sorted(reflect(engine).tables) == ['address', 'entity', 'user']
+
+    def test_reports_drift(self, drifted_engine):
+        differences = compare_with_database(User, reflect(drifted_engine))
+        assert "'age': index does not exist" in differences
+        assert "'age': check constraint 'age > 13' does not exist" in (
+            differences
+        )
+        assert "'email': type is 'varchar(100)', expected 'varchar(255)'" in (
+            differences
+        )
+        assert "'email': nullable is True, expected False" in differences
+        assert "'email': unique constraint does not exist" in differences
+        assert "'status': column does not exist" in differences
+        assert "'name': column does not exist" in differences
+        assert (
+            "'address_id': foreign key to 'address.id' has ondelete None, "
+            "expected 'CASCADE'"
+        ) in differences
+
+    def test_assert_matches_database(self, drifted_engine):
+        test_case = TestUserMatchesDatabase()
+        test_case.assert_matches_database()
+        with raises(AssertionError):
+            test_case.assert_matches_database(drifted_engine)
+
+    def test_composite_foreign_key(self):
+        composite_engine = sa.create_engine('sqlite://')
+        CompositeBase.metadata.create_all(composite_engine)
+        assert compare_with_database(Tree, reflect(composite_engine)) == []
+
+    def test_missing_composite_foreign_key(self):
+        composite_engine = sa.create_engine('sqlite://')
+        with composite_engine.begin() as connection:
+            connection.execute(sa.text(
+                'CREATE TABLE tree (id INTEGER PRIMARY KEY, '
+                'a INTEGER REFERENCES plot (x), b INTEGER)'
+            ))
+        assert compare_with_database(Tree, reflect(composite_engine)) == [
+            "'a': foreign key to 'plot.x' does not exist",
+            "'b': foreign key to 'plot.y' does not exist",
+        ]
@@ -0,0 +1,134 @@
+import sqlalchemy as sa
+from pytest import raises
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test import ModelTestCase, TestCaseGenerator as Generator
+from sqlalchemy_test.database import DatabaseTestCase
+from tests import Address, User
+
+
+Base = declarative_base()
+
+
+class Author(Base):
+    __tablename__ = 'author'
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.Unicode(255))
+
+
+class Book(Base):
+    __tablename__ = 'book'
+    id = sa.Column(sa.Integer, primary_key=True)
+    author_id = sa.Column(sa.Integer, sa.ForeignKey(Author.id))
+    author = sa.orm.relationship(
+        Author,
+        backref=sa.orm.backref('books', lazy='selectin')
+    )
+
+
+class TestRelationshipAssertions(ModelTestCase):
+    model = User
+
+    def test_assert_relationship(self):
+        self.assert_relationship(
+            'address',
+            target=Address,
+            direction='MANYTOONE',
+            lazy='select',
+            uselist=False,
+            cascade='save-update, merge',
+        )
+
+    def test_assert_relationship_reports_mismatches(self):
+        with raises(AssertionError) as excinfo:
+            self.assert_relationship('address', lazy='joined', uselist=True)
+        message = str(excinfo.value)
+        assert "'address': lazy is 'select', expected 'joined'" in message
+        assert "'address': uselist is False, expected True" in message
+
+    def test_assert_relationship_missing(self):
+        with raises(AssertionError) as excinfo:
+            self.assert_relationship('addresses')
+        assert 'relationship does not exist' in str(excinfo.value)
+
+    def test_unknown_relationship_property(self):
+        with raises(ValueError):
+            self.assert_relationship('address', order_by='id')
+
+    def test_assert_schema_with_relationships(self):
+        self.assert_schema({
+            'relationships': {'address': {'target': 'Address'}}
+        })
+        with raises(AssertionError):
+            self.assert_schema({
+                'relationships': {'address': {'direction': 'ONETOMANY'}}
+            })
+
+
+class TestBackrefAssertions(ModelTestCase):
+    model = Book
+
+    def test_backref(self):
+        self.assert_relationship(
+            'author', direction='MANYTOONE', backref='books'
+        )
+
+
+class TestNPlusOneDetection(ModelTestCase, DatabaseTestCase):
+    model = Author
+
+    def test_eager_relationship_passes(self):
+        self.assert_no_n_plus_one('books')
+
+    def test_lazy_relationship_fails(self):
+        self.model = Book
+        with raises(AssertionError) as excinfo:
+            self.assert_no_n_plus_one('author')
+        assert "with lazy='select'" in str(excinfo.value)
+
+
+class TestRelationshipGeneration(object):
+    def test_verbose_relationship_test(self):
+        source = '\n'.join(Generator(User, compact=False).render())
+        assert 'from tests import Address' in source
+        assert "    def test_address_relationship(self):" in source
+        assert "            direction='MANYTOONE'," in source
+        assert "            cascade='merge, save-update'," in source
+
+    def test_compact_relationship_spec(self):
+        source = '\n'.join(Generator(Book, compact=True).render())
+        assert "        'relationships': {" in source
+        assert "                'backref': ['books']," in source
+
+    def run_query_checks(self, compact):
+        source = '\n'.join(
+            Generator(Author, compact=compact, query_checks=True).render()
+        )
+        namespace = {}
+        exec(compile(source, 'test_author.py', 'exec'), namespace)
+        test_case = namespace['TestAuthor']()
+        for name in dir(test_case):
+            if name.startswith('test_'):
+                test_case.setup_method(None)
+                try:
+                    getattr(test_case, name)()
+                finally:
+                    test_case.teardown_method(None)
+        return source
+
+    def test_verbose_query_checks(self):
+        source = self.run_query_checks(compact=False)
+        assert 'class TestAuthor(ModelTestCase, DatabaseTestCase):' in source
+        assert "        self.assert_no_n_plus_one('books')" in source
+
+    def test_compact_query_checks(self):
+        source = self.run_query_checks(compact=True)
+        assert "    def test_books_without_n_plus_one(self):" in source
+
+    def test_query_checks_are_off_by_default(self):
+        source = '\n'.join(Generator(Author).render())
+        assert 'DatabaseTestCase' not in source
+        assert 'assert_no_n_plus_one' not in source
+        assert Generator(Author).fingerprint != (
+            Generator(Author, query_checks=True).fingerprint
+        )
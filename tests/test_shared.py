@@ -0,0 +1,219 @@
+import os
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.declarative import declarative_base
+
+from sqlalchemy_test import clear_introspection_cache, introspect
+from sqlalchemy_test.pytest_plugin import SharedCachePlugin
+from sqlalchemy_test.reflection import (
+    clear_reflection_cache,
+    DatabaseReflection,
+    reflect
+)
+from sqlalchemy_test.shared import (
+    atomic_open,
+    disable_shared_cache,
+    enable_shared_cache,
+    model_signature,
+    shared_cache_enabled,
+    shared_description,
+    shared_value,
+    write_descriptions
+)
+from tests import Base, User
+
+pytest_plugins = 'pytester'
+
+
+@pytest.fixture
+def cache_dir(tmpdir):
+    yield str(tmpdir)
+    disable_shared_cache()
+    clear_introspection_cache()
+    clear_reflection_cache()
+
+
+class TestSharedCache(object):
+    def test_disabled_by_default(self):
+        assert not shared_cache_enabled()
+        assert shared_value('kind', 'key', lambda: 1) == 1
+
+    def test_descriptions_are_loaded_from_controller(self, cache_dir):
+        fingerprint = write_descriptions(cache_dir, Base)
+        expected = introspect(User).describe()
+        enable_shared_cache(cache_dir, fingerprint)
+        clear_introspection_cache()
+        description = introspect(User).describe()
+        assert description == expected
+        assert description is not expected
+
+    def test_descriptions_of_different_models_are_built(self, cache_dir):
+        ConditionalBase = declarative_base()
+
+        class Account(ConditionalBase):
+            __tablename__ = 'account'
+            id = sa.Column(sa.Integer, primary_key=True)
+
+        fingerprint = write_descriptions(cache_dir, ConditionalBase)
+        Account.balance = sa.Column(sa.Integer)
+        enable_shared_cache(cache_dir, fingerprint)
+        assert shared_description(Account) is None
+        clear_introspection_cache()
+        assert 'balance' in introspect(Account).describe()['columns']
+
+    def test_missing_descriptions_are_built(self, cache_dir):
+        enable_shared_cache(cache_dir, 'missing')
+        clear_introspection_cache()
+        assert introspect(User).describe()['table_name'] == 'user'
+
+    def test_value_is_built_once(self, cache_dir):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {'value': len(calls)}
+
+        enable_shared_cache(cache_dir)
+        assert shared_value('kind', 'key', build) == {'value': 1}
+        assert shared_value('kind', 'key', build) == {'value': 1}
+        assert shared_value('kind', 'other', build) == {'value': 2}
+        assert not [
+            name for name in os.listdir(cache_dir) if name.endswith('.tmp')
+        ]
+
+    def test_file_database_is_reflected_once(self, cache_dir, monkeypatch):
+        url = 'sqlite:///%s' % os.path.join(cache_dir, 'test.db')
+        Base.metadata.create_all(sa.create_engine(url))
+        enable_shared_cache(cache_dir)
+        tables = reflect(sa.create_engine(url)).tables
+
+        def fail(self, engine, schema):
+            raise AssertionError('database reflected twice')
+
+        monkeypatch.setattr(DatabaseReflection, '_reflect', fail)
+        clear_reflection_cache()
+        reflection = reflect(sa.create_engine(url))
+        assert sorted(reflection.tables) == sorted(tables)
+        assert reflection.tables['user']['primary_key'] == set(['id'])
+
+    def test_in_memory_database_is_not_shared(self, cache_dir):
+        enable_shared_cache(cache_dir)
+        engine = sa.create_engine('sqlite://')
+        reflect(engine)
+        assert os.listdir(cache_dir) == []
+
+
+class TestModelSignature(object):
+    def signature(self, args=(), kwargs={}, table_args=()):
+        SignatureBase = declarative_base()
+
+        class Account(SignatureBase):
+            __tablename__ = 'account'
+            __table_args__ = table_args
+            id = sa.Column(sa.Integer, primary_key=True)
+            code = sa.Column(sa.Unicode(20), *args, **kwargs)
+            name = sa.Column(sa.Unicode(20))
+
+        return model_signature(Account)
+
+    def test_same_models_have_the_same_signature(self):
+        assert self.signature() == self.signature()
+
+    @pytest.mark.parametrize(('args', 'kwargs'), [
+        ((), {'unique': True}),
+        ((), {'index': True}),
+        ((), {'default': u'a'}),
+        ((), {'server_default': u'a'}),
+        ((sa.CheckConstraint("code != ''"), ), {}),
+    ])
+    def test_column_attributes_change_signature(self, args, kwargs):
+        assert self.signature(args, kwargs) != self.signature()
+
+    @pytest.mark.parametrize('constraint', [
+        sa.UniqueConstraint('code', 'name'),
+        sa.Index('ix_account_code_name', 'code', 'name'),
+        sa.CheckConstraint('code != name'),
+    ])
+    def test_table_constraints_change_signature(self, constraint):
+        assert self.signature(table_args=(constraint, )) != (
+            self.signature()
+        )
+
+
+class TestAtomicOpen(object):
+    def test_replaces_file(self, tmpdir):
+        filename = str(tmpdir.join('file.txt'))
+        with atomic_open(filename) as file_:
+            file_.write('first')
+        with atomic_open(filename) as file_:
+            file_.write('second')
+        assert tmpdir.listdir() == [tmpdir.join('file.txt')]
+        assert tmpdir.join('file.txt').read() == 'second'
+
+    def test_failed_write_keeps_file(self, tmpdir):
+        tmpdir.join('file.txt').write('first')
+        with pytest.raises(ValueError):
+            with atomic_open(str(tmpdir.join('file.txt'))) as file_:
+                file_.write('second')
+                raise ValueError
+        assert tmpdir.listdir() == [tmpdir.join('file.txt')]
+        assert tmpdir.join('file.txt').read() == 'first'
+
+
+class FakeConfig(object):
+    def getoption(self, name):
+        return None
+
+    def getini(self, name):
+        return 'tests:Base'
+
+
+class FakeNode(object):
+    def __init__(self):
+        self.workerinput = {}
+
+
+class TestSharedCachePlugin(object):
+    def test_configures_workers(self):
+        plugin = SharedCachePlugin(FakeConfig())
+        nodes = [FakeNode(), FakeNode()]
+        for node in nodes:
+            plugin.pytest_configure_node(node)
+        assert nodes[0].workerinput == nodes[1].workerinput
+        directory = nodes[0].workerinput['sqlalchemy_test_cache']
+        assert nodes[0].workerinput['sqlalchemy_test_fingerprint']
+        assert len(os.listdir(directory)) == 1
+        plugin.pytest_unconfigure(None)
+        assert not os.path.exists(directory)
+
+    def test_worker_enables_shared_cache(self, pytester, tmpdir):
+        fingerprint = write_descriptions(str(tmpdir), Base)
+        pytester.makeini('''
+            [pytest]
+            sqlalchemy_base = tests:Base
+        ''')
+        pytester.makeconftest('''
+            import pytest
+
+            @pytest.hookimpl(tryfirst=True)
+            def pytest_configure(config):
+                config.workerinput = {
+                    'sqlalchemy_test_cache': %r,
+                    'sqlalchemy_test_fingerprint': %r,
+                }
+        ''' % (str(tmpdir), fingerprint))
+        pytester.makepyfile('''
+            from sqlalchemy_test.shared import (
+                shared_cache_enabled,
+                shared_description
+            )
+            from tests import User
+
+            def test_shared_cache():
+                assert shared_cache_enabled()
+                assert shared_description(User)['table_name'] == 'user'
+        ''')
+        result = pytester.runpytest('-p', 'sqlalchemy_test.pytest_plugin')
+        result.assert_outcomes(passed=1)
+        assert not shared_cache_enabled()
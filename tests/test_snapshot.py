@@ -0,0 +1,83 @@
+import json
+
+from pytest import raises
+
+from sqlalchemy_test.snapshot import (
+    assert_snapshot,
+    diff_snapshot,
+    dump_snapshot,
+    format_diff,
+    load_snapshot,
+    take_snapshot
+)
+from tests import Base
+
+
+def load_json(value):
+    return json.loads(json.dumps(value))
+
+
+class TestSnapshot(object):
+    def test_dump_and_load(self, tmpdir):
+        filename = str(tmpdir.join('schema.json'))
+        dump_snapshot(Base, filename)
+        assert load_snapshot(filename) == load_json(take_snapshot(Base))
+        assert sorted(load_snapshot(filename)) == ['Address', 'Entity', 'User']
+
+    def test_dump_is_canonical(self, tmpdir):
+        first = tmpdir.join('first.json')
+        second = tmpdir.join('second.json')
+        dump_snapshot(Base, str(first))
+        dump_snapshot(Base.metadata, str(second))
+        assert first.read() == second.read()
+
+    def test_foreign_key_options(self):
+        column = take_snapshot(Base)['User']['columns']['address_id']
+        assert column['foreign_keys'] == {
+            'address.id': {
+                'ondelete': 'CASCADE',
+                'onupdate': 'CASCADE',
+                'deferrable': True,
+                'initially': None,
+                'name': None,
+            }
+        }
+
+
+class TestDiffSnapshot(object):
+    def test_matching_snapshot_has_no_diff(self):
+        assert diff_snapshot(load_json(take_snapshot(Base)), Base) == {}
+
+    def test_diff_reports_every_difference(self):
+        snapshot = load_json(take_snapshot(Base))
+        user = snapshot['User']['columns']
+        user['email']['length'] = 100
+        user['address_id']['foreign_keys']['address.id']['ondelete'] = None
+        del user['age']
+        snapshot['Removed'] = snapshot.pop('Address')
+
+        diff = diff_snapshot(snapshot, Base)
+        assert diff == {
+            'Address': ['model is not in the snapshot'],
+            'Removed': ['model is not mapped'],
+            'User': [
+                "'address_id': foreign_keys: address.id: ondelete is "
+                "'CASCADE', expected None",
+                "'age': unexpected column",
+                "'email': length is 255, expected 100",
+            ],
+        }
+        assert format_diff(diff).splitlines()[:3] == [
+            'Address:',
+            '  model is not in the snapshot',
+            'Removed:',
+        ]
+
+    def test_assert_snapshot(self, tmpdir):
+        filename = str(tmpdir.join('schema.json'))
+        dump_snapshot(Base, filename)
+        assert_snapshot(Base, filename)
+
+        tmpdir.join('schema.json').write('{}')
+        with raises(AssertionError):
+            assert_snapshot(Base, filename)